@@ -0,0 +1,200 @@
+# ===================================================================
+# ARQUIVO: benchmark_dados.py
+# Mede o tempo das etapas do ETL usando os arquivos de exemplo do repositório
+# e confere a virada de ano das tabelas largas (tb_agua / tb_esgoto).
+# Execute a partir da raiz do projeto: python -m DADOS.benchmark_dados
+# ===================================================================
+import os
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from DADOS.esquemas_mysql import ESQUEMAS_TABELAS, coluna_obsoleta, tipo_coluna
+from DADOS.ferramentas_dados import (
+    COLUNA_TOTAL_ANO, _esquema_mudou, _processar_pasta, _transformar_colunas_meses, clean_column_name
+)
+
+warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+warnings.filterwarnings("ignore", category=pd.errors.PerformanceWarning)
+
+PASTA_DADOS = os.path.dirname(os.path.abspath(__file__))
+PASTA_PAINEL_2 = os.path.join(PASTA_DADOS, "Export Painel 2")
+
+
+def _cronometrar(funcao, repeticoes=3):
+    """Executa a função algumas vezes e retorna o melhor tempo (em segundos) e o último resultado."""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def benchmark_leitura_pastas(max_workers=None, repeticoes=3):
+    """
+    Compara a leitura serial e paralela de _processar_pasta para as pastas AGUA e ESGOTO do Painel 2.
+    """
+    print("\n=== LEITURA DOS ARQUIVOS DO PAINEL 2 (serial x paralelo) ===")
+    for tipo in ("AGUA", "ESGOTO"):
+        pasta = os.path.join(PASTA_PAINEL_2, tipo)
+        t_serial, dfs_serial = _cronometrar(lambda: _processar_pasta(pasta, tipo, usar_cache=False), repeticoes)
+        t_paralelo, dfs_paralelo = _cronometrar(
+            lambda: _processar_pasta(pasta, tipo, paralelo=True, max_workers=max_workers, usar_cache=False),
+            repeticoes
+        )
+
+        # Garante que os dois modos devolvem exatamente os mesmos dados, na mesma ordem
+        assert len(dfs_serial) == len(dfs_paralelo)
+        for a, b in zip(dfs_serial, dfs_paralelo):
+            assert a.equals(b)
+
+        print(f"{tipo:<8} | {len(dfs_serial):>3} arquivos | serial: {t_serial:6.2f}s | "
+              f"paralelo: {t_paralelo:6.2f}s | ganho: {t_serial / t_paralelo:4.1f}x")
+
+
+def _transformar_colunas_meses_legado(df_final):
+    """
+    Cópia da etapa de transformação original de processar_arquivos_incremento
+    (to_datetime coluna a coluna e conversão numérica coluna a coluna).
+    Serve de referência para validar a versão vetorizada. O ano do total é o mais recente
+    presente nas colunas e a coluna se chama COLUNA_TOTAL_ANO, como na versão vetorizada.
+    """
+    rename_mapping = {'Mês_Ano': 'MUNICIPIO'}
+    for col in df_final.columns:
+        try:
+            data_obj = pd.to_datetime(col, errors='coerce')
+            if pd.notna(data_obj):
+                novo_nome = data_obj.strftime('%b/%Y').lower()
+                rename_mapping[col] = novo_nome
+        except (ValueError, TypeError):
+            continue
+    df_final.rename(columns=rename_mapping, inplace=True)
+
+    cols_to_convert = [col for col in df_final.columns if '/' in str(col)]
+    for col in cols_to_convert:
+        df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
+        df_final[col] = df_final[col].fillna(0)
+        df_final[col] = df_final[col].astype(int)
+
+    anos = [int(col.split('/')[-1]) for col in cols_to_convert if str(col).split('/')[-1].isdigit()]
+    current_year = max(anos) if anos else datetime.now().year
+    target_month_cols = [col for col in df_final.columns if f'/{current_year}' in col]
+    total_col_name = COLUNA_TOTAL_ANO
+    df_final[total_col_name] = df_final[target_month_cols].sum(axis=1, skipna=True) if target_month_cols else 0
+    df_final[total_col_name] = df_final[total_col_name].astype(int)
+    return df_final
+
+
+def _conferir_igualdade(df_novo, df_legado, descricao):
+    """Verifica se as duas versões geram exatamente a mesma tabela (valores, tipos e bytes do CSV)."""
+    pd.testing.assert_frame_equal(df_novo, df_legado, check_exact=True)
+    assert df_novo.to_csv(index=False).encode('utf-8') == df_legado.to_csv(index=False).encode('utf-8')
+    print(f"[OK] {descricao}: saída idêntica à versão original.")
+
+
+def _gerar_planilha_sintetica(num_meses, num_municipios, com_textos=False, semente=0):
+    """
+    Gera uma planilha larga no formato do export do Painel 2: 'Mês_Ano' com os municípios,
+    um cabeçalho de data por mês e valores inteiros com algumas células vazias.
+    Com com_textos=True algumas células recebem '-' para forçar a conversão com errors='coerce'.
+    """
+    rng = np.random.default_rng(semente)
+    ano_atual = datetime.now().year
+    meses = [datetime(ano_atual - (num_meses - 1 - i) // 12, (i + 12 - num_meses % 12) % 12 + 1, 1)
+             for i in range(num_meses)]
+    dados = {'Mês_Ano': [f"MUNICIPIO {i}" for i in range(num_municipios)]}
+    for mes in meses:
+        coluna = rng.integers(-50, 500, size=num_municipios).astype(object)
+        coluna[rng.random(num_municipios) < 0.05] = None
+        if com_textos:
+            coluna[rng.random(num_municipios) < 0.01] = '-'
+        dados[mes] = coluna
+    df = pd.DataFrame(dados)
+    df['NOME ARQUIVO'] = 'AGUA - SINTETICO.xlsx'
+    return df
+
+
+def benchmark_transformacao_meses(num_meses=240, num_municipios=5000, repeticoes=3):
+    """
+    Valida a transformação vetorizada de meses contra a versão original nos exports de exemplo
+    e mede o ganho em uma planilha sintética larga.
+    """
+    print("\n=== TRANSFORMAÇÃO DAS COLUNAS DE MESES (original x vetorizada) ===")
+    for tipo in ("AGUA", "ESGOTO"):
+        pasta = os.path.join(PASTA_PAINEL_2, tipo)
+        df = pd.concat(_processar_pasta(pasta, tipo, usar_cache=False), ignore_index=True)
+        df = df[df['Mês_Ano'] != 'MUNICIPIO'].copy()
+        _conferir_igualdade(_transformar_colunas_meses(df.copy()), _transformar_colunas_meses_legado(df.copy()),
+                            f"exports de {tipo}")
+
+    for com_textos in (False, True):
+        df = _gerar_planilha_sintetica(num_meses, num_municipios, com_textos=com_textos)
+        descricao = f"{num_meses} meses x {num_municipios} municípios{' (com textos)' if com_textos else ''}"
+        _conferir_igualdade(_transformar_colunas_meses(df.copy()), _transformar_colunas_meses_legado(df.copy()),
+                            f"planilha sintética {descricao}")
+
+        t_legado, _ = _cronometrar(lambda: _transformar_colunas_meses_legado(df.copy()), repeticoes)
+        t_novo, _ = _cronometrar(lambda: _transformar_colunas_meses(df.copy()), repeticoes)
+        print(f"{descricao} | original: {t_legado:6.2f}s | "
+              f"vetorizada: {t_novo:6.2f}s | ganho: {t_legado / t_novo:4.1f}x")
+
+
+class _InspetorTabela:
+    """Imita o inspetor do SQLAlchemy para uma tabela já publicada com as colunas informadas."""
+
+    def __init__(self, table_name, colunas):
+        self.colunas = [{'name': col, 'type': tipo_coluna(table_name, col) or 'TEXT'} for col in ['id', *colunas]]
+        self.indices = [{'name': nome, 'column_names': cols}
+                        for nome, cols in ESQUEMAS_TABELAS[table_name]['indices'].items()]
+
+    def get_columns(self, _):
+        return self.colunas
+
+    def get_indexes(self, _):
+        return self.indices
+
+
+def _colunas_tabela_larga(ano_final, mes_final):
+    """Colunas (já limpas) da tabela larga gerada por um export de 12+ meses que termina em mes_final/ano_final."""
+    meses = pd.date_range(end=datetime(ano_final, mes_final, 1), periods=12 + mes_final, freq='MS')
+    df = pd.DataFrame({'Mês_Ano': ['MUNICIPIO 1'], **{mes.to_pydatetime(): [10] for mes in meses}})
+    df = _transformar_colunas_meses(df)
+    return [clean_column_name(col) for col in df.columns]
+
+
+def conferir_virada_de_ano(table_name='tb_agua'):
+    """
+    Simula a carga de janeiro sobre a tabela larga publicada em dezembro (o export traz o ano
+    anterior e o atual, então os meses de dois anos atrás saem e jan/<ano novo> entra): toda
+    coluna da tabela que falta no DataFrame novo precisa ser removível (senão o upload falha)
+    e a mudança deve levar a carga para a staging. Repete a conferência com a tabela criada
+    pelas versões que punham o ano no nome do total ('total_jan__atual_AAAA').
+    """
+    print("\n=== VIRADA DE ANO NA TABELA LARGA (dezembro -> janeiro) ===")
+    colunas_dezembro = _colunas_tabela_larga(2025, 12)
+    colunas_janeiro = _colunas_tabela_larga(2026, 1)
+    df_janeiro = pd.DataFrame(columns=colunas_janeiro)
+
+    tabela_antiga = [clean_column_name('TOTAL (Jan - Atual 2025)') if col == clean_column_name(COLUNA_TOTAL_ANO)
+                     else col for col in colunas_dezembro]
+    for descricao, colunas_tabela in (("tabela publicada em dezembro", colunas_dezembro),
+                                      ("tabela com o total antigo (ano no nome)", tabela_antiga)):
+        faltando = {col for col in set(colunas_tabela) - set(colunas_janeiro) if not coluna_obsoleta(table_name, col)}
+        assert not faltando, f"{descricao}: colunas que deixariam de existir no DataFrame: {faltando}"
+        assert _esquema_mudou(df_janeiro, _InspetorTabela(table_name, colunas_tabela), table_name), \
+            f"{descricao}: a coluna do mês novo deveria levar a carga para a staging"
+        novas = sorted(set(colunas_janeiro) - set(colunas_tabela))
+        removidas = sorted(set(colunas_tabela) - set(colunas_janeiro))
+        print(f"[OK] {descricao}: carga pela staging com {novas} novas e {len(removidas)} removidas "
+              f"({removidas[0]} ... {removidas[-1]}).")
+
+
+if __name__ == "__main__":
+    conferir_virada_de_ano()
+    benchmark_leitura_pastas()
+    benchmark_transformacao_meses()
@@ -0,0 +1,159 @@
+# ===================================================================
+# ARQUIVO: cache_excel.py
+# Cache em disco dos DataFrames lidos dos arquivos .xlsx exportados.
+# Evita reprocessar com o openpyxl arquivos que não mudaram desde a última execução.
+# ===================================================================
+import hashlib
+import os
+import time
+
+import pandas as pd
+
+from DADOS.sistema_log import log_print
+
+# --- Configuração do Cache ---
+PASTA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_excel")
+IDADE_MAXIMA_DIAS = 7
+TAMANHO_MAXIMO_MB = 500
+
+# Contadores da execução atual (zerados por zerar_estatisticas_cache)
+ESTATISTICAS_CACHE = {'acertos': 0, 'falhas': 0}
+
+
+def _hash_conteudo(file_path, tamanho_bloco=1024 * 1024):
+    """Calcula o SHA-256 do conteúdo do arquivo, lendo em blocos."""
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def chave_cache(file_path):
+    """
+    Gera a chave do cache a partir do caminho, tamanho, data de modificação
+    e hash do conteúdo do arquivo.
+    """
+    info = os.stat(file_path)
+    partes = [
+        os.path.abspath(file_path),
+        str(info.st_size),
+        str(info.st_mtime_ns),
+        _hash_conteudo(file_path),
+    ]
+    return hashlib.sha256('|'.join(partes).encode('utf-8')).hexdigest()
+
+
+def _caminho_entrada(chave, pasta_cache=PASTA_CACHE):
+    return os.path.join(pasta_cache, f"{chave}.pkl")
+
+
+def carregar_do_cache(file_path, pasta_cache=PASTA_CACHE, chave=None):
+    """
+    Retorna o DataFrame em cache para o arquivo, ou None se não houver entrada válida.
+    Atualiza os contadores de acertos/falhas. `chave` evita recalcular o hash do arquivo
+    quando quem chama já tem o chave_cache(file_path).
+    """
+    try:
+        caminho = _caminho_entrada(chave or chave_cache(file_path), pasta_cache)
+        if os.path.exists(caminho):
+            df = pd.read_pickle(caminho)
+            # Marca a entrada como usada recentemente (usado na remoção por tamanho)
+            os.utime(caminho, None)
+            ESTATISTICAS_CACHE['acertos'] += 1
+            return df
+    except Exception as e:
+        log_print(f"[AVISO] Falha ao ler o cache de '{file_path}': {e}")
+
+    ESTATISTICAS_CACHE['falhas'] += 1
+    return None
+
+
+def salvar_no_cache(file_path, df, pasta_cache=PASTA_CACHE, chave=None):
+    """
+    Grava o DataFrame lido de file_path no cache. A escrita é feita em um arquivo
+    temporário e depois renomeada, para nunca deixar uma entrada pela metade.
+    Numa falha de leitura do cache, passe a mesma `chave` usada em carregar_do_cache.
+    """
+    try:
+        os.makedirs(pasta_cache, exist_ok=True)
+        caminho = _caminho_entrada(chave or chave_cache(file_path), pasta_cache)
+        caminho_temp = f"{caminho}.{os.getpid()}.tmp"
+        df.to_pickle(caminho_temp)
+        os.replace(caminho_temp, caminho)
+    except Exception as e:
+        log_print(f"[AVISO] Falha ao gravar o cache de '{file_path}': {e}")
+
+
+def ler_excel_com_cache(file_path, usar_cache=True, pasta_cache=PASTA_CACHE, **kwargs):
+    """
+    Lê um arquivo .xlsx usando o cache quando possível.
+    Em caso de acerto o openpyxl não é chamado.
+    """
+    if usar_cache:
+        # O arquivo é lido por inteiro uma vez só para o hash, usado na consulta e na gravação
+        chave = chave_cache(file_path)
+        df = carregar_do_cache(file_path, pasta_cache, chave=chave)
+        if df is not None:
+            return df
+
+    df = pd.read_excel(file_path, **kwargs)
+    if usar_cache:
+        salvar_no_cache(file_path, df, pasta_cache, chave=chave)
+    return df
+
+
+def limpar_cache(idade_maxima_dias=IDADE_MAXIMA_DIAS, tamanho_maximo_mb=TAMANHO_MAXIMO_MB, pasta_cache=PASTA_CACHE):
+    """
+    Remove entradas mais antigas que idade_maxima_dias e, se a pasta ainda passar de
+    tamanho_maximo_mb, remove as entradas usadas há mais tempo até caber no limite.
+
+    Returns:
+        int: Quantidade de entradas removidas.
+    """
+    if not os.path.exists(pasta_cache):
+        return 0
+
+    agora = time.time()
+    limite_idade = idade_maxima_dias * 24 * 3600
+    limite_tamanho = tamanho_maximo_mb * 1024 * 1024
+    removidos = 0
+
+    entradas = []
+    for nome in os.listdir(pasta_cache):
+        caminho = os.path.join(pasta_cache, nome)
+        if not os.path.isfile(caminho):
+            continue
+        info = os.stat(caminho)
+        if agora - info.st_mtime > limite_idade:
+            os.remove(caminho)
+            removidos += 1
+        else:
+            entradas.append((info.st_mtime, info.st_size, caminho))
+
+    # Remoção por tamanho: as menos usadas recentemente saem primeiro
+    entradas.sort()
+    tamanho_total = sum(tamanho for _, tamanho, _ in entradas)
+    for _, tamanho, caminho in entradas:
+        if tamanho_total <= limite_tamanho:
+            break
+        os.remove(caminho)
+        tamanho_total -= tamanho
+        removidos += 1
+
+    return removidos
+
+
+def zerar_estatisticas_cache():
+    """Zera os contadores de acertos/falhas."""
+    ESTATISTICAS_CACHE['acertos'] = 0
+    ESTATISTICAS_CACHE['falhas'] = 0
+
+
+def registrar_estatisticas_cache():
+    """Registra no log a quantidade de acertos e falhas do cache nesta execução."""
+    acertos = ESTATISTICAS_CACHE['acertos']
+    falhas = ESTATISTICAS_CACHE['falhas']
+    total = acertos + falhas
+    taxa = (acertos / total * 100) if total else 0
+    log_print(f"[INFO] Cache de arquivos Excel: {acertos} acertos, {falhas} falhas ({taxa:.0f}% de acerto).")
@@ -21,13 +21,34 @@ from DADOS.ferramentas_dados import (
     processar_arquivos_incremento, 
     processar_arquivos_nla_nle,
     processar_dados_graficos,
+    converter_incremento_formato_longo,
     subir_multiplos_dfs_para_mysql # Nome da nova função robusta
 )
+from DADOS.cache_excel import limpar_cache, registrar_estatisticas_cache, zerar_estatisticas_cache
+from DADOS.sistema_log import log_print
 
 # Ignora avisos que podem poluir a saída do console
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 
+# --- CONFIGURAÇÃO DA LEITURA DOS ARQUIVOS ---
+# Lê os arquivos de cada pasta (ÁGUA/ESGOTO) simultaneamente em um pool de processos.
+# NUM_PROCESSOS_LEITURA = None usa um processo por arquivo, limitado ao número de CPUs.
+LEITURA_PARALELA = True
+NUM_PROCESSOS_LEITURA = None
+# Reaproveita os DataFrames de arquivos .xlsx que não mudaram desde a última execução.
+USAR_CACHE_EXCEL = True
+
+# --- CONFIGURAÇÃO DO UPLOAD ---
+# 'load_data' (LOAD DATA LOCAL INFILE, com fallback automático), 'executemany' ou 'to_sql'.
+ESTRATEGIA_CARGA_MYSQL = "load_data"
+TAMANHO_LOTE_MYSQL = 5000
+# Sobe as tabelas simultaneamente (threads limitadas ao tamanho do pool de conexões).
+UPLOAD_PARALELO = True
+# 'incremental' grava apenas as linhas novas/alteradas/removidas (chave natural por tabela);
+# 'completo' recarrega a tabela inteira a cada execução.
+MODO_CARGA_MYSQL = "incremental"
+
 def executar_processamento_dados(data_atualizacao_painel):
     """
     Função principal que orquestra todo o processo de ETL de dados.
@@ -35,6 +56,9 @@ def executar_processamento_dados(data_atualizacao_painel):
     Args:
         data_atualizacao_painel (str): A data/hora de atualização extraída
                                        do painel Power BI pelo Selenium.
+
+    Returns:
+        dict: Resultado do upload por dataset (veja subir_multiplos_dfs_para_mysql).
     """
     print("=============================================")
     print("=== INICIANDO PROCESSAMENTO DE DADOS (ETL) ===")
@@ -56,25 +80,41 @@ def executar_processamento_dados(data_atualizacao_painel):
 
 
     # --- 2. Processamento e Enriquecimento dos Dados ---
+    zerar_estatisticas_cache()
     print("\nProcessando arquivos de ESGOTO...")
-    df_esgoto = processar_arquivos_incremento(caminho_esgoto, 'ESGOTO', origem_dados="Power BI - Incremento Esgoto")
+    df_esgoto = processar_arquivos_incremento(
+        caminho_esgoto, 'ESGOTO', origem_dados="Power BI - Incremento Esgoto",
+        paralelo=LEITURA_PARALELA, max_workers=NUM_PROCESSOS_LEITURA, usar_cache=USAR_CACHE_EXCEL
+    )
     if not df_esgoto.empty:
         df_esgoto['data_extracao_etl'] = data_extracao_geral
         df_esgoto['data_atualizacao_painel'] = pd.to_datetime(data_atualizacao_painel)
 
     print("\nProcessando arquivos de ÁGUA...")
-    df_agua = processar_arquivos_incremento(caminho_agua, 'ÁGUA', origem_dados="Power BI - Incremento Água")
+    df_agua = processar_arquivos_incremento(
+        caminho_agua, 'ÁGUA', origem_dados="Power BI - Incremento Água",
+        paralelo=LEITURA_PARALELA, max_workers=NUM_PROCESSOS_LEITURA, usar_cache=USAR_CACHE_EXCEL
+    )
     if not df_agua.empty:
         df_agua['data_extracao_etl'] = data_extracao_geral
         df_agua['data_atualizacao_painel'] = pd.to_datetime(data_atualizacao_painel)
 
     print("\nProcessando arquivos de NLA/NLE...")
-    df_nla_nle = processar_arquivos_nla_nle(caminho_painel_1, origem_dados="Power BI - Novas Ligações")
+    df_nla_nle = processar_arquivos_nla_nle(
+        caminho_painel_1, origem_dados="Power BI - Novas Ligações", usar_cache=USAR_CACHE_EXCEL
+    )
     if not df_nla_nle.empty:
         df_nla_nle['data_extracao_etl'] = data_extracao_geral
         df_nla_nle['data_atualizacao_painel'] = pd.to_datetime(data_atualizacao_painel)
 
 
+    # Resumo do cache e remoção das entradas antigas
+    if USAR_CACHE_EXCEL:
+        registrar_estatisticas_cache()
+        removidos = limpar_cache()
+        if removidos:
+            log_print(f"[INFO] {removidos} entradas antigas removidas do cache de arquivos Excel.")
+
     print("\nProcessando arquivos de GRÁFICOS (Painel 3)...")
     df_graficos = processar_dados_graficos(caminho_graficos)
     
@@ -83,10 +123,16 @@ def executar_processamento_dados(data_atualizacao_painel):
         df_graficos['data_atualizacao_painel'] = pd.to_datetime(data_atualizacao_painel)
 
 
+    # Incrementos em formato longo (uma linha por SUP, município e mês): o dashboard soma o
+    # total do ano por consulta, sem depender das colunas 'jan/AAAA' de cada ano
+    partes_mensais = [converter_incremento_formato_longo(df) for df in (df_agua, df_esgoto) if not df.empty]
+    df_incremento_mensal = pd.concat(partes_mensais, ignore_index=True) if partes_mensais else pd.DataFrame()
+
     # Cria o dicionário com os dataframes já enriquecidos
     datasets = {
         "agua": df_agua,
         "esgoto": df_esgoto,
+        "incremento_mensal": df_incremento_mensal,
         "nla_nle": df_nla_nle,
         "dados_realizados": df_graficos
     }
@@ -94,7 +140,15 @@ def executar_processamento_dados(data_atualizacao_painel):
     # --- 3. Upload para o Banco de Dados ---
     # Esta etapa agora acontece ANTES da escrita do Excel.
     # Chamando a função correta e robusta que criamos.
-    subir_multiplos_dfs_para_mysql(datasets, tabela_prefixo="tb_", database="sandbox")
+    # As tabelas são independentes e sobem em paralelo; a falha de uma não cancela as outras.
+    resultado_upload = subir_multiplos_dfs_para_mysql(
+        datasets, tabela_prefixo="tb_", database="sandbox",
+        estrategia_carga=ESTRATEGIA_CARGA_MYSQL, tamanho_lote=TAMANHO_LOTE_MYSQL,
+        paralelo=UPLOAD_PARALELO, modo_carga=MODO_CARGA_MYSQL
+    )
+    falhas_upload = [nome for nome, resultado in resultado_upload.items() if not resultado['sucesso']]
+    if falhas_upload:
+        log_print(f"[AVISO] Upload com falha para: {', '.join(falhas_upload)}")
     
     # --- 4. Salvamento dos Resultados em Excel ---
     # COMENTADO TEMPORARIAMENTE - Atualização das abas desabilitada
@@ -126,6 +180,8 @@ def executar_processamento_dados(data_atualizacao_painel):
     print("===      PROCESSAMENTO FINALIZADO         ===")
     print("=============================================")
 
+    return resultado_upload
+
 
 if __name__ == "__main__":
     
@@ -0,0 +1,216 @@
+# ===================================================================
+# ARQUIVO: esquemas_mysql.py
+# Esquema declarado de cada tabela tb_* (tipos das colunas e índices secundários).
+# Usado por upload_df_to_mysql na criação das tabelas e a cada evolução de esquema.
+# Colunas não declaradas continuam com o tipo deduzido do pandas.
+# ===================================================================
+import re
+
+from sqlalchemy import text
+
+from DADOS.sistema_log import log_print
+
+# --- Colunas comuns a todas as tabelas do ETL ---
+_COLUNAS_METADADOS = {
+    'data_de_extracao': 'VARCHAR(32)',
+    'origem_de_dados': 'VARCHAR(255)',
+    'data_extracao_etl': 'DATETIME',
+    'data_atualizacao_painel': 'DATETIME',
+    'data_upload': 'DATETIME',
+    'chave_natural': 'BIGINT',
+    'hash_linha': 'BIGINT',
+}
+
+# --- Tabelas de incremento (ÁGUA / ESGOTO) ---
+_ESQUEMA_INCREMENTO = {
+    'colunas': {
+        'nome_arquivo': 'VARCHAR(255)',
+        'sup': 'VARCHAR(255)',
+        'tipo': 'VARCHAR(32)',
+        'municipio': 'VARCHAR(255)',
+        **_COLUNAS_METADADOS,
+    },
+    # Colunas dinâmicas: meses ('jan_2025') e o total do ano ('total_ano')
+    'padroes': [
+        (re.compile(r'^[a-z]{3}_\d{4}$'), 'INT'),
+        (re.compile(r'^total_'), 'BIGINT'),
+    ],
+    # Colunas que podem deixar de vir no export sem erro (são removidas na próxima carga):
+    # os meses que saem da janela do Power BI (ano anterior + ano atual) na virada do ano
+    # e o total com o ano no nome, gerado por versões anteriores
+    'obsoletas': [re.compile(r'^[a-z]{3}_\d{4}$'), re.compile(r'^total_jan__atual_\d{4}$')],
+    'indices': {
+        'ix_sup': ['sup'],
+        'ix_data_extracao_etl': ['data_extracao_etl'],
+    },
+}
+
+ESQUEMAS_TABELAS = {
+    'tb_agua': _ESQUEMA_INCREMENTO,
+    'tb_esgoto': _ESQUEMA_INCREMENTO,
+    # Incrementos em formato longo: um ano novo são linhas novas, sem ALTER TABLE
+    'tb_incremento_mensal': {
+        'colunas': {
+            'sup': 'VARCHAR(255)',
+            'tipo': 'VARCHAR(32)',
+            'municipio': 'VARCHAR(255)',
+            'mes': 'DATE',
+            'ano': 'SMALLINT',
+            'quantidade': 'INT',
+            **_COLUNAS_METADADOS,
+        },
+        'padroes': [],
+        'indices': {
+            # Cobre o total do ano por SUP (filtro por tipo e intervalo de meses, soma sem ler a tabela)
+            'ix_tipo_mes_sup_quantidade': ['tipo', 'mes', 'sup', 'quantidade'],
+            'ix_data_extracao_etl': ['data_extracao_etl'],
+        },
+    },
+    'tb_nla_nle': {
+        'colunas': {
+            'ds_cd_superintendencia': 'VARCHAR(255)',
+            'tipo_ligacao': 'VARCHAR(64)',
+            'mes': 'DATE',
+            'ano': 'SMALLINT',
+            'quantidade': 'INT',
+            **_COLUNAS_METADADOS,
+        },
+        'padroes': [],
+        # Texto 'MM/AA' substituído pela chave cronológica `mes`
+        'obsoletas': [re.compile(r'^ano_e_mes$')],
+        'indices': {
+            # Cobre o ranking de Novas Ligações (filtro, agrupamento e soma sem ler a tabela)
+            'ix_sup_tipo_quantidade': ['ds_cd_superintendencia', 'tipo_ligacao', 'quantidade'],
+            # Cobre as somas por período (intervalo de meses) sem ler a tabela
+            'ix_mes_sup_tipo_quantidade': ['mes', 'ds_cd_superintendencia', 'tipo_ligacao', 'quantidade'],
+            'ix_data_extracao_etl': ['data_extracao_etl'],
+        },
+    },
+    'tb_dados_realizados': {
+        'colunas': {
+            'superintendencia': 'VARCHAR(255)',
+            'grafico': 'VARCHAR(255)',
+            'mes_ano': 'VARCHAR(32)',
+            'mes': 'DATE',
+            'ano': 'SMALLINT',
+            'dados_extraidos_painel_3': 'BIGINT',
+            'calculo': 'DOUBLE',
+            'tipo': 'VARCHAR(32)',
+            **_COLUNAS_METADADOS,
+        },
+        'padroes': [],
+        'indices': {
+            # Partições (SUP, gráfico) já em ordem cronológica para o acumulado do ano
+            'ix_sup_grafico_mes': ['superintendencia', 'grafico', 'mes'],
+            'ix_data_extracao_etl': ['data_extracao_etl'],
+        },
+    },
+}
+
+# Sinônimos devolvidos pelo inspetor do SQLAlchemy para os tipos declarados
+_SINONIMOS_TIPOS = {'INTEGER': 'INT'}
+
+
+def tipo_coluna(table_name, col_name):
+    """
+    Retorna o tipo MySQL declarado para a coluna em ESQUEMAS_TABELAS (nome exato ou padrão),
+    ou None se a coluna não faz parte do esquema declarado.
+    """
+    esquema = ESQUEMAS_TABELAS.get(table_name)
+    if not esquema:
+        return None
+    if col_name in esquema['colunas']:
+        return esquema['colunas'][col_name]
+    for padrao, tipo in esquema['padroes']:
+        if padrao.match(col_name):
+            return tipo
+    return None
+
+
+def coluna_obsoleta(table_name, col_name):
+    """True se a coluna não é mais gerada pelo ETL e pode ser removida da tabela na próxima carga."""
+    esquema = ESQUEMAS_TABELAS.get(table_name, {})
+    return any(padrao.match(col_name) for padrao in esquema.get('obsoletas', ()))
+
+
+def montar_create_table(table_name, df, tipo_padrao, nome_fisico=None):
+    """
+    Monta o CREATE TABLE da tabela a partir das colunas do DataFrame, com `id`
+    AUTO_INCREMENT, os tipos declarados e os índices secundários do esquema.
+    tipo_padrao(dtype) dá o tipo das colunas fora do esquema declarado e nome_fisico
+    permite criar a estrutura de `table_name` com outro nome (a staging).
+    """
+    definicoes = ["`id` INT AUTO_INCREMENT PRIMARY KEY"]
+    for col_name in df.columns:
+        tipo = tipo_coluna(table_name, col_name) or tipo_padrao(df[col_name].dtype)
+        definicoes.append(f"`{col_name}` {tipo} NULL")
+
+    esquema = ESQUEMAS_TABELAS.get(table_name, {})
+    for nome_indice, colunas in esquema.get('indices', {}).items():
+        if set(colunas).issubset(df.columns):
+            definicoes.append(f"INDEX `{nome_indice}` ({', '.join(f'`{c}`' for c in colunas)})")
+
+    corpo = ",\n    ".join(definicoes)
+    return f"CREATE TABLE `{nome_fisico or table_name}` (\n    {corpo}\n) DEFAULT CHARSET=utf8mb4;"
+
+
+def _normalizar_tipo(tipo):
+    tipo = re.sub(r'\s+', '', str(tipo).upper())
+    tipo = re.sub(r'COLLATE.*$|CHARSET.*$', '', tipo)
+    base = tipo.split('(')[0]
+    return _SINONIMOS_TIPOS.get(base, base) + tipo[len(base):]
+
+
+def alteracoes_esquema(inspector, table_name, nome_fisico=None):
+    """
+    Lista as alterações (cláusulas de ALTER TABLE) que ajustariam a tabela física ao esquema
+    declarado de table_name: tipos de coluna divergentes (ex.: TEXT criado por versões
+    anteriores), índices que faltam e índices declarados cujas colunas mudaram.
+    Lista vazia se a tabela já está de acordo (ou não tem esquema declarado).
+    """
+    if table_name not in ESQUEMAS_TABELAS:
+        return []
+    nome_fisico = nome_fisico or table_name
+    esquema = ESQUEMAS_TABELAS[table_name]
+
+    colunas_atuais = {col['name']: col['type'] for col in inspector.get_columns(nome_fisico)}
+    indices_atuais = {indice['name']: indice['column_names'] for indice in inspector.get_indexes(nome_fisico)}
+
+    alteracoes = []
+    for col_name, tipo_atual in colunas_atuais.items():
+        tipo_declarado = tipo_coluna(table_name, col_name)
+        if tipo_declarado and _normalizar_tipo(tipo_atual) != _normalizar_tipo(tipo_declarado):
+            alteracoes.append(f"MODIFY COLUMN `{col_name}` {tipo_declarado} NULL")
+    for nome_indice, colunas in esquema['indices'].items():
+        if indices_atuais.get(nome_indice) == colunas or not set(colunas).issubset(colunas_atuais):
+            continue
+        if nome_indice in indices_atuais:
+            # Mesmo nome, colunas antigas (ex.: ix_sup_grafico_mes passou de mes_ano para mes)
+            alteracoes.append(f"DROP INDEX `{nome_indice}`")
+        alteracoes.append(f"ADD INDEX `{nome_indice}` ({', '.join(f'`{c}`' for c in colunas)})")
+    return alteracoes
+
+
+def reconciliar_esquema(engine, inspector, table_name, nome_fisico=None):
+    """
+    Aplica em um único ALTER TABLE as alterações de alteracoes_esquema. Deve ser usada na
+    staging (vazia): a tabela publicada nunca sofre ALTER enquanto o dashboard a consulta.
+    Falhas são registradas e não interrompem a carga.
+
+    Returns:
+        bool: True se algum ALTER foi executado (o inspetor precisa ser invalidado).
+    """
+    nome_fisico = nome_fisico or table_name
+    alteracoes = alteracoes_esquema(inspector, table_name, nome_fisico)
+    if not alteracoes:
+        return False
+
+    try:
+        with engine.connect() as connection:
+            # Um único ALTER TABLE: a tabela é reconstruída uma vez só
+            connection.execute(text(f"ALTER TABLE `{nome_fisico}` {', '.join(alteracoes)};"))
+            connection.commit()
+        log_print(f"  [ESQUEMA] `{nome_fisico}` ajustada ao esquema declarado: {len(alteracoes)} alteração(ões).")
+    except Exception as e:
+        log_print(f"  [AVISO] Não foi possível ajustar o esquema de `{nome_fisico}`: {e}")
+    return True
@@ -7,10 +7,19 @@ import unicodedata
 import os
 import locale
 import re
-from datetime import datetime
+import csv
+import time
+import tempfile
+import numpy as np
+from datetime import datetime, date
+from functools import lru_cache
 from sqlalchemy import create_engine, text , inspect
 import urllib.parse
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from DADOS.sistema_log    import log_print
+from DADOS.esquemas_mysql import alteracoes_esquema, coluna_obsoleta, montar_create_table, reconciliar_esquema, tipo_coluna
+from DADOS.cache_excel import carregar_do_cache, chave_cache, salvar_no_cache, ler_excel_com_cache
 
 # --- Configuração de Localidade ---
 try:
@@ -49,37 +58,193 @@ def get_mysql_type_from_pandas(dtype):
         return 'TEXT'
 
 
-def _processar_pasta(folder_path, tipo_dado):
+def _ler_arquivo_excel(file_path):
+    """
+    Lê um único arquivo .xlsx e anexa a coluna 'NOME ARQUIVO'.
+    Fica no nível do módulo para poder ser enviada aos processos do pool.
+    """
+    df = pd.read_excel(file_path, header=0)
+    df['NOME ARQUIVO'] = os.path.basename(file_path)
+    return df
+
+
+def _processar_pasta(folder_path, tipo_dado, paralelo=False, max_workers=None, usar_cache=True):
     """
     Função auxiliar genérica para ler todos os arquivos .xlsx de uma pasta.
+
+    Args:
+        folder_path (str): Pasta com os arquivos exportados.
+        tipo_dado (str): Tipo de dado (usado apenas nas mensagens).
+        paralelo (bool): Se True, lê os arquivos simultaneamente em um pool de processos.
+        max_workers (int): Número de processos do pool (padrão: um por arquivo, limitado aos CPUs).
+        usar_cache (bool): Se True, reaproveita os DataFrames de arquivos que não mudaram.
+
+    Returns:
+        list: Lista de DataFrames, na mesma ordem de os.listdir, com a coluna 'NOME ARQUIVO'.
     """
     all_data_frames = []
     if not os.path.exists(folder_path):
         print(f"[AVISO] O diretório não existe: {folder_path}")
         log_print(f"[AVISO] O diretório não existe: {folder_path}")
         return all_data_frames
-        
-    for filename in os.listdir(folder_path):
-        if filename.endswith('.xlsx') and not filename.startswith('~'):
-            file_path = os.path.join(folder_path, filename)
-            df = pd.read_excel(file_path, header=0)
-            df['NOME ARQUIVO'] = filename
-            all_data_frames.append(df)
-    
+
+    arquivos = [
+        os.path.join(folder_path, filename)
+        for filename in os.listdir(folder_path)
+        if filename.endswith('.xlsx') and not filename.startswith('~')
+    ]
+
+    # Consulta o cache antes de abrir qualquer arquivo com o openpyxl. O hash de cada arquivo
+    # é calculado uma vez e reaproveitado ao gravar os que não estavam no cache.
+    chaves = {file_path: chave_cache(file_path) for file_path in arquivos} if usar_cache else {}
+    all_data_frames = [
+        carregar_do_cache(file_path, chave=chaves[file_path]) if usar_cache else None for file_path in arquivos
+    ]
+    pendentes = [file_path for file_path, df in zip(arquivos, all_data_frames) if df is None]
+
+    if paralelo and len(pendentes) > 1:
+        workers = min(max_workers or os.cpu_count() or 1, len(pendentes))
+        log_print(f"[INFO] Lendo {len(pendentes)} arquivos de '{tipo_dado}' em paralelo ({workers} processos)...")
+        # O map preserva a ordem dos arquivos, mantendo o resultado idêntico ao modo serial.
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            lidos = list(executor.map(_ler_arquivo_excel, pendentes))
+    else:
+        lidos = [_ler_arquivo_excel(file_path) for file_path in pendentes]
+
+    lidos_por_arquivo = dict(zip(pendentes, lidos))
+    for i, file_path in enumerate(arquivos):
+        if all_data_frames[i] is None:
+            all_data_frames[i] = lidos_por_arquivo[file_path]
+            if usar_cache:
+                salvar_no_cache(file_path, all_data_frames[i], chave=chaves[file_path])
+
     if not all_data_frames:
         print(f"AVISO: Nenhum arquivo do tipo '{tipo_dado}' encontrado em {folder_path}.")
         log_print(f"AVISO: Nenhum arquivo do tipo '{tipo_dado}' encontrado em {folder_path}.")
         
     return all_data_frames
 
+# ===================================================================
+# DETECÇÃO E CONVERSÃO DAS COLUNAS DE MESES (VETORIZADA)
+# ===================================================================
+# Padrões de cabeçalho reconhecidos sem passar pelo dateutil.
+# Qualquer outro nome de coluna continua sendo testado com pd.to_datetime.
+_PADROES_COLUNA_MES = [
+    re.compile(r'^(?P<ano>\d{4})-(?P<mes>\d{1,2})(?:-(?P<dia>\d{1,2}))?(?:[ T]\d{2}:\d{2}(?::\d{2})?)?$'),
+    re.compile(r'^(?P<mes>\d{1,2})/(?P<ano>\d{4})$'),
+]
+
+
+@lru_cache(maxsize=None)
+def _formatar_coluna_mes(ano, mes):
+    """Formata o nome padronizado da coluna de mês (ex: 'jan/2025')."""
+    return datetime(ano, mes, 1).strftime('%b/%Y').lower()
+
+
+# Abreviações de mês geradas por _formatar_coluna_mes (locale em português ou em inglês)
+_MESES_ABREVIADOS = {
+    'jan': 1, 'fev': 2, 'feb': 2, 'mar': 3, 'abr': 4, 'apr': 4, 'mai': 5, 'may': 5, 'jun': 6,
+    'jul': 7, 'ago': 8, 'aug': 8, 'set': 9, 'sep': 9, 'out': 10, 'oct': 10, 'nov': 11, 'dez': 12, 'dec': 12,
+}
+
+
+@lru_cache(maxsize=None)
+def _data_coluna_mes(col):
+    """Primeiro dia do mês de uma coluna já padronizada ('jan/2025'), ou None."""
+    try:
+        mes, ano = str(col).split('/')
+        return pd.Timestamp(int(ano), _MESES_ABREVIADOS[mes.strip('.').lower()], 1)
+    except (ValueError, KeyError):
+        return None
+
+
+def _nome_coluna_mes(col):
+    """
+    Retorna o nome padronizado ('mês/ano') para uma coluna de data, ou None se
+    a coluna não representar uma data.
+    """
+    # Cabeçalhos já lidos como data pelo openpyxl (caso mais comum nos exports)
+    if isinstance(col, (datetime, date)) and not pd.isna(col):
+        return _formatar_coluna_mes(col.year, col.month)
+
+    if isinstance(col, str):
+        for padrao in _PADROES_COLUNA_MES:
+            encontrado = padrao.match(col.strip())
+            if encontrado:
+                try:
+                    ano, mes = int(encontrado['ano']), int(encontrado['mes'])
+                    dia = int(encontrado['dia']) if encontrado.groupdict().get('dia') else 1
+                    datetime(ano, mes, dia)
+                    return _formatar_coluna_mes(ano, mes)
+                except ValueError:
+                    break
+
+    # Demais casos: mantém a inferência do dateutil usada originalmente
+    try:
+        data_obj = pd.to_datetime(col, errors='coerce')
+        if pd.notna(data_obj):
+            return data_obj.strftime('%b/%Y').lower()
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+# Total de janeiro até o último mês publicado do ano mais recente. O nome não leva o ano:
+# na virada do ano a coluna continua a mesma nas tabelas largas (tb_agua / tb_esgoto).
+COLUNA_TOTAL_ANO = 'TOTAL ANO'
+
+
+def _transformar_colunas_meses(df_final):
+    """
+    Renomeia as colunas de data para 'mês/ano', converte todas as colunas de mês
+    para inteiro em uma única operação e acrescenta a coluna COLUNA_TOTAL_ANO.
+    """
+    # Renomeia as colunas de data para um formato padronizado (ex: 'jan/2025')
+    rename_mapping = {'Mês_Ano': 'MUNICIPIO'}
+    for col in df_final.columns:
+        novo_nome = _nome_coluna_mes(col)
+        if novo_nome is not None:
+            rename_mapping[col] = novo_nome
+    df_final.rename(columns=rename_mapping, inplace=True)
+
+    # Converte todas as colunas de meses para inteiro de uma vez (matriz 2-D)
+    cols_to_convert = [col for col in df_final.columns if '/' in str(col)]
+    valores = df_final[cols_to_convert].to_numpy()
+    if valores.dtype.kind not in 'iuf':
+        try:
+            # Caso comum: apenas números e células vazias, convertidos direto pelo NumPy
+            valores = valores.astype(np.float64)
+        except (ValueError, TypeError):
+            # Há textos nas células: usa a conversão do pandas com errors='coerce'
+            valores = pd.to_numeric(valores.ravel(), errors='coerce').reshape(valores.shape)
+    if valores.dtype.kind == 'f':
+        valores = np.nan_to_num(valores, nan=0.0, copy=False)
+    valores = valores.astype(int, copy=False)
+    df_final[cols_to_convert] = valores
+
+    # Calcula o total do ano mais recente presente nos dados, direto sobre a matriz. O ano vem
+    # das colunas e não do relógio: em janeiro, até o primeiro mês do ano novo ser publicado,
+    # o total continua sendo o do ano anterior.
+    anos = [data.year for data in map(_data_coluna_mes, cols_to_convert) if data is not None]
+    current_year = max(anos) if anos else datetime.now().year
+    posicoes_ano = [i for i, col in enumerate(cols_to_convert) if f'/{current_year}' in str(col)]
+    df_final[COLUNA_TOTAL_ANO] = valores[:, posicoes_ano].sum(axis=1) if posicoes_ano else 0
+    df_final[COLUNA_TOTAL_ANO] = df_final[COLUNA_TOTAL_ANO].astype(int)
+
+    return df_final
+
+
 # ===================================================================
 # FUNÇÃO DE PROCESSAMENTO DE INCREMENTO (COM LÓGICA DINÂMICA)
 # ===================================================================
-def processar_arquivos_incremento(folder_path, tipo, origem_dados=None):
+def processar_arquivos_incremento(folder_path, tipo, origem_dados=None, paralelo=False, max_workers=None, usar_cache=True):
     """
     Função genérica para processar arquivos de ÁGUA ou ESGOTO com ordenação de colunas dinâmica.
+    Com paralelo=True a leitura dos arquivos é feita por um pool de max_workers processos.
     """
-    all_data_frames = _processar_pasta(folder_path, tipo)
+    all_data_frames = _processar_pasta(
+        folder_path, tipo, paralelo=paralelo, max_workers=max_workers, usar_cache=usar_cache
+    )
     if not all_data_frames:
         return pd.DataFrame()
 
@@ -92,34 +257,8 @@ def processar_arquivos_incremento(folder_path, tipo, origem_dados=None):
         
     df_final = df_final[df_final['Mês_Ano'] != 'MUNICIPIO'].copy()
 
-    # Renomeia as colunas de data para um formato padronizado (ex: 'jan/2025')
-    rename_mapping = {'Mês_Ano': 'MUNICIPIO'}
-    for col in df_final.columns:
-        try:
-            # Tenta converter o nome da coluna para data.
-            # A biblioteca 'dateutil' do pandas é poderosa para inferir formatos.
-            data_obj = pd.to_datetime(col, errors='coerce')
-            if pd.notna(data_obj):
-                # Formata para 'MêsAbreviado/Ano' em minúsculas (ex: 'jan/2025')
-                novo_nome = data_obj.strftime('%b/%Y').lower()
-                rename_mapping[col] = novo_nome
-        except (ValueError, TypeError):
-            continue
-    df_final.rename(columns=rename_mapping, inplace=True)
-
-    # Converte colunas de meses para tipo numérico (inteiro)
-    cols_to_convert = [col for col in df_final.columns if '/' in str(col)]
-    for col in cols_to_convert:
-        df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
-        df_final[col] = df_final[col].fillna(0)
-        df_final[col] = df_final[col].astype(int)
-
-    # Calcula o total para o ano corrente de forma dinâmica
-    current_year = datetime.now().year
-    target_month_cols = [col for col in df_final.columns if f'/{current_year}' in col]
-    total_col_name = f'TOTAL (Jan - Atual {current_year})'
-    df_final[total_col_name] = df_final[target_month_cols].sum(axis=1, skipna=True) if target_month_cols else 0
-    df_final[total_col_name] = df_final[total_col_name].astype(int)
+    # Renomeia as colunas de data, converte os meses para inteiro e calcula o total do ano corrente
+    df_final = _transformar_colunas_meses(df_final)
 
     # Adiciona colunas de metadados
     df_final['TIPO'] = tipo.upper()
@@ -163,7 +302,31 @@ def processar_arquivos_incremento(folder_path, tipo, origem_dados=None):
     
     return df_final
 
-def processar_arquivos_nla_nle(file_path, origem_dados=None):
+def converter_incremento_formato_longo(df_incremento):
+    """
+    Converte a tabela de incremento (uma coluna por mês, ex.: 'jan/2025') para o formato longo:
+    uma linha por SUP, município e mês, com MES (primeiro dia do mês), ANO e QUANTIDADE.
+    Um ano novo vira linhas novas, e não colunas novas. As colunas de total e o nome do
+    arquivo ficam de fora; as de metadados são mantidas.
+    """
+    if df_incremento.empty:
+        return pd.DataFrame()
+
+    datas_meses = {col: _data_coluna_mes(col) for col in df_incremento.columns if '/' in str(col)}
+    datas_meses = {col: data for col, data in datas_meses.items() if data is not None}
+    colunas_fixas = [
+        col for col in df_incremento.columns
+        if col not in datas_meses and col != 'NOME ARQUIVO' and not str(col).startswith('TOTAL')
+    ]
+    df_longo = df_incremento.melt(
+        id_vars=colunas_fixas, value_vars=list(datas_meses), var_name='MES', value_name='QUANTIDADE'
+    )
+    df_longo['MES'] = pd.to_datetime(df_longo['MES'].map(datas_meses))
+    df_longo['ANO'] = df_longo['MES'].dt.year
+    return df_longo
+
+
+def processar_arquivos_nla_nle(file_path, origem_dados=None, usar_cache=True):
     """
     Lê e processa o arquivo Excel de NLA/NLE a partir de um caminho de arquivo direto.
     Adiciona colunas de metadados: DATA DE EXTRAÇÃO, ORIGEM DE DADOS, ATUALIZADO EM.
@@ -173,20 +336,22 @@ def processar_arquivos_nla_nle(file_path, origem_dados=None):
         log_print(f"[AVISO] O arquivo não existe: {file_path}")
         return pd.DataFrame()
 
-    df_final = pd.read_excel(file_path)
+    df_final = ler_excel_com_cache(file_path, usar_cache=usar_cache)
     
     if 'Ano e Mes' in df_final.columns:
-        df_final['Ano e Mes'] = df_final['Ano e Mes'].astype(str).str.strip()
-        df_final['Ano e Mes'] = df_final['Ano e Mes'].str.slice(4, 6) + '/' + df_final['Ano e Mes'].str.slice(2, 4)
+        # 'Ano e Mes' vem como AAAAMM: vira a chave cronológica MES (primeiro dia do mês,
+        # coluna DATE no MySQL) e ANO, para os filtros por período usarem o índice em `mes`
+        ano_e_mes = df_final.pop('Ano e Mes').astype(str).str.strip().str.slice(0, 6)
+        df_final['MES'] = pd.to_datetime(ano_e_mes, format='%Y%m', errors='coerce')
+        df_final['ANO'] = df_final['MES'].dt.year.astype('Int16')
+    else:
+        print("AVISO: Coluna 'Ano e Mes' não encontrada no arquivo NLA/NLE.")
+        log_print("AVISO: Coluna 'Ano e Mes' não encontrada no arquivo NLA/NLE.")
     
     # Verifica e processa a coluna de tipo de ligação
     if 'TIPO LIGACAO' in df_final.columns:
         df_final.rename(columns={'TIPO LIGACAO': 'TIPO_LIGACAO'}, inplace=True)
 
-    else:
-        print("AVISO: Coluna 'Ano e Mes' não encontrada no arquivo NLA/NLE.")
-        log_print("AVISO: Coluna 'Ano e Mes' não encontrada no arquivo NLA/NLE.")
-
     # Adiciona colunas de metadados
     df_final['DATA DE EXTRAÇÃO'] = datetime.now().strftime('%d/%m/%Y %H:%M')
     df_final['ORIGEM DE DADOS'] = origem_dados if origem_dados else "PAINEL NLA/NLE"
@@ -197,13 +362,13 @@ def processar_arquivos_nla_nle(file_path, origem_dados=None):
 
 def processar_dados_graficos(caminho_do_arquivo):
     """
-    Processa os dados do painel 3, calculando incrementos e realizado 2025.
+    Processa os dados do painel 3, calculando incrementos e o realizado do ano.
     
     Args:
         caminho_do_arquivo (str): Caminho para o arquivo CSV
         
     Returns:
-        tuple: (DataFrame processado, DataFrame com realizado 2025)
+        DataFrame: Dados processados, com a chave do mês (Mes) e o ano (Ano)
     """
     
     # Dicionário para traduzir os meses
@@ -243,6 +408,11 @@ def processar_dados_graficos(caminho_do_arquivo):
         
         # Converter para datetime usando inferência automática
         df['Mes_Ano'] = pd.to_datetime(temp_mes_ano, format='mixed', dayfirst=False)
+
+        # Chave cronológica do mês (primeiro dia, coluna DATE no MySQL) e ano, usadas
+        # pelas consultas do dashboard para ordenar e filtrar sem depender do texto
+        df['Mes'] = df['Mes_Ano'].dt.to_period('M').dt.to_timestamp()
+        df['Ano'] = df['Mes_Ano'].dt.year
         
         # Agora converter de volta para o formato desejado "março 2025"
         df['Mes_Ano'] = df['Mes_Ano'].dt.strftime('%B %Y')
@@ -256,19 +426,12 @@ def processar_dados_graficos(caminho_do_arquivo):
         # Criar coluna CALCULO: último valor - valor anterior
         df['CALCULO'] = df.groupby('Grafico')['dados_extraidos_painel_3'].diff()
         
-        # --- 4. CÁLCULO REALIZADO 2025 ---
-        # Filtrar apenas dados de 2025
-        df_2025 = df[df['Mes_Ano'].str.contains('2025')].copy()
-        
-        # Calcular soma acumulada da coluna CALCULO de janeiro até o mês atual para cada Superintendencia e Grafico
-        df_2025['REALIZADO_2025'] = df_2025.groupby(['Superintendencia', 'Grafico'])['CALCULO'].cumsum()
-        
         # Adiciona colunas de metadados
         df['TIPO'] = 'PAINEL_3'
         df['DATA DE EXTRAÇÃO'] = datetime.now().strftime('%d/%m/%Y %H:%M')
         df['ORIGEM DE DADOS'] = 'PAINEL 3'
 
-         # --- 5. SALVAMENTO DO ARQUIVO ---
+         # --- 4. SALVAMENTO DO ARQUIVO ---
         try:
             caminho_salvamento =  r"C:\Users\lcastro.eficien\Desktop\PAINEL ACOMPANHAMENTO\DADOS\Export Painel 3\resultado_com_calculos.xlsx"
             df.to_excel(caminho_salvamento, index=False)
@@ -288,60 +451,375 @@ def processar_dados_graficos(caminho_do_arquivo):
         print(f"[ERRO] Ocorreu um erro durante o processo: {e}")
         return pd.DataFrame()
 
-def exibir_realizado_2025(df_2025):
+
+# ===================================================================
+# POOL DE CONEXÕES COMPARTILHADO
+# ===================================================================
+# Configuração do pool usada por obter_engine (pode ser sobrescrita na chamada)
+CONFIG_POOL_MYSQL = {
+    'pool_size': 5,
+    'max_overflow': 5,
+    'pool_pre_ping': True,
+    'pool_recycle': 3600,
+}
+
+# Engines e inspetores reaproveitados durante toda a execução
+_ENGINES = {}
+_INSPETORES = {}
+_TRAVA_POOL = threading.Lock()
+
+
+def obter_engine(mysql_config, **config_pool):
     """
-    Exibe o resultado do realizado 2025 em formato de tabela.
-    
-    Args:
-        df_2025 (DataFrame): DataFrame com os dados de 2025
+    Retorna o engine do SQLAlchemy para o banco de mysql_config, criando-o apenas
+    na primeira chamada. As demais tabelas reaproveitam as conexões do pool.
     """
-    if df_2025 is None or df_2025.empty:
-        print("[ERRO] Não há dados de 2025 para exibir.")
-        return
-    
-    # Mostrar o resultado do realizado 2025
-    print("\n📊 REALIZADO 2025 (Soma da coluna CALCULO de janeiro até o mês atual):")
-    print("=" * 80)
-    
-    # Agrupar por Superintendencia e Grafico para mostrar o último valor (mês mais recente)
-    realizado_2025 = df_2025.groupby(['Superintendencia', 'Grafico'])['REALIZADO_2025'].last().reset_index()
-    
-    # Ordenar por Superintendencia e Grafico para melhor visualização
-    realizado_2025 = realizado_2025.sort_values(['Superintendencia', 'Grafico'])
-    
-    # Exibir o resultado formatado
-    for _, row in realizado_2025.iterrows():
-        print(f"{row['Superintendencia']:<35} | {row['Grafico']:<40} | {row['REALIZADO_2025']:>10,.0f}")
-    
-    print("=" * 80)
+    chave = (mysql_config['host'], mysql_config['user'], mysql_config['database'])
+    with _TRAVA_POOL:
+        if chave in _ENGINES:
+            return _ENGINES[chave]
+        db_connection_str = (
+            f"mysql+pymysql://{mysql_config['user']}:{mysql_config['password']}@"
+            f"{mysql_config['host']}/{mysql_config['database']}?charset=utf8mb4"
+        )
+        opcoes = {**CONFIG_POOL_MYSQL, **config_pool}
+        # local_infile habilita o LOAD DATA LOCAL INFILE no cliente pymysql
+        _ENGINES[chave] = create_engine(db_connection_str, connect_args={'local_infile': True}, **opcoes)
+        return _ENGINES[chave]
+
+
+def obter_inspetor(engine):
+    """Retorna um inspetor de esquema em cache para o engine (a reflexão é feita uma única vez)."""
+    with _TRAVA_POOL:
+        if engine not in _INSPETORES:
+            _INSPETORES[engine] = inspect(engine)
+        return _INSPETORES[engine]
+
+
+def invalidar_inspetor(engine):
+    """Descarta o inspetor em cache. Deve ser chamada após qualquer CREATE/ALTER/RENAME."""
+    with _TRAVA_POOL:
+        _INSPETORES.pop(engine, None)
+
+
+def descartar_engines():
+    """Fecha todas as conexões do pool. Chamada ao final do upload."""
+    with _TRAVA_POOL:
+        for engine in _ENGINES.values():
+            engine.dispose()
+        _ENGINES.clear()
+        _INSPETORES.clear()
+
+
+# ===================================================================
+# CARGA EM MASSA (LOAD DATA LOCAL INFILE / EXECUTEMANY)
+# ===================================================================
+ESTRATEGIAS_CARGA = ('load_data', 'executemany', 'to_sql')
+
+
+def _escapar_texto_load_data(valor):
+    """Escapa os caracteres especiais do formato de LOAD DATA (ESCAPED BY '\\')."""
+    if isinstance(valor, str):
+        return (valor.replace('\\', '\\\\').replace('\t', '\\t')
+                .replace('\n', '\\n').replace('\r', '\\r'))
+    return valor
+
+
+def _gravar_tsv_load_data(df, caminho_arquivo):
+    """
+    Grava o DataFrame em um arquivo TSV no formato padrão do LOAD DATA do MySQL:
+    campos separados por TAB, NULL como \\N e datas no formato 'AAAA-MM-DD HH:MM:SS'.
+    """
+    df_tsv = df.copy()
+    for col in df_tsv.columns:
+        if pd.api.types.is_bool_dtype(df_tsv[col]):
+            df_tsv[col] = df_tsv[col].astype(int)
+        elif pd.api.types.is_object_dtype(df_tsv[col]) or pd.api.types.is_string_dtype(df_tsv[col]):
+            df_tsv[col] = df_tsv[col].map(_escapar_texto_load_data)
+
+    # Como os textos já foram escapados, o csv não precisa escapar nem colocar aspas em nada
+    df_tsv.to_csv(
+        caminho_arquivo, sep='\t', na_rep='\\N', header=False, index=False,
+        quoting=csv.QUOTE_NONE, quotechar='\x00', lineterminator='\n',
+        date_format='%Y-%m-%d %H:%M:%S', encoding='utf-8'
+    )
+
+
+def _carregar_via_load_data(df, engine, table_name):
+    """Carrega o DataFrame na tabela com LOAD DATA LOCAL INFILE a partir de um TSV temporário."""
+    colunas = ', '.join(f"`{col}`" for col in df.columns)
+    fd, caminho_tsv = tempfile.mkstemp(suffix='.tsv', prefix=f'{table_name}_')
+    os.close(fd)
+    try:
+        _gravar_tsv_load_data(df, caminho_tsv)
+        conexao = engine.raw_connection()
+        try:
+            with conexao.cursor() as cursor:
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE `{table_name}` CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({colunas})",
+                    (caminho_tsv.replace('\\', '/'),)
+                )
+            conexao.commit()
+        except Exception:
+            conexao.rollback()
+            raise
+        finally:
+            conexao.close()
+    finally:
+        os.remove(caminho_tsv)
+
+
+def _linhas_python(df):
+    """Converte as linhas do DataFrame em tuplas de tipos nativos do Python (o pymysql não conhece os tipos do NumPy)."""
+    df_obj = df.astype(object).where(pd.notna(df), None)
+    return list(df_obj.itertuples(index=False, name=None))
+
+
+def _carregar_via_executemany(df, engine, table_name, tamanho_lote=5000):
+    """
+    Carrega o DataFrame com INSERTs de múltiplas linhas (cursor.executemany),
+    em lotes de tamanho_lote linhas.
+    """
+    colunas = ', '.join(f"`{col}`" for col in df.columns)
+    marcadores = ', '.join(['%s'] * len(df.columns))
+    query = f"INSERT INTO `{table_name}` ({colunas}) VALUES ({marcadores})"
+
+    linhas = _linhas_python(df)
+
+    conexao = engine.raw_connection()
+    try:
+        with conexao.cursor() as cursor:
+            for inicio in range(0, len(linhas), tamanho_lote):
+                cursor.executemany(query, linhas[inicio:inicio + tamanho_lote])
+        conexao.commit()
+    except Exception:
+        conexao.rollback()
+        raise
+    finally:
+        conexao.close()
+
+
+def inserir_dados_mysql(df, engine, table_name, estrategia='load_data', tamanho_lote=5000):
+    """
+    Insere as linhas do DataFrame em uma tabela já existente, usando a estratégia escolhida:
+        - 'load_data': LOAD DATA LOCAL INFILE (cai para 'executemany' se o servidor não permitir);
+        - 'executemany': INSERTs de múltiplas linhas em lotes de tamanho_lote;
+        - 'to_sql': df.to_sql(if_exists='append'), comportamento original.
+    Registra no log a taxa de linhas por segundo.
+    """
+    if estrategia not in ESTRATEGIAS_CARGA:
+        raise ValueError(f"Estratégia de carga desconhecida: '{estrategia}'. Use uma de {ESTRATEGIAS_CARGA}.")
+
+    inicio = time.perf_counter()
+    estrategia_usada = estrategia
+    if estrategia == 'load_data':
+        try:
+            _carregar_via_load_data(df, engine, table_name)
+        except Exception as e:
+            print(f"  [AVISO] LOAD DATA LOCAL INFILE indisponível para `{table_name}` ({e}). Usando INSERTs em lote.")
+            log_print(f"  [AVISO] LOAD DATA LOCAL INFILE indisponível para `{table_name}` ({e}). Usando INSERTs em lote.")
+            estrategia_usada = 'executemany'
+            _carregar_via_executemany(df, engine, table_name, tamanho_lote)
+    elif estrategia == 'executemany':
+        _carregar_via_executemany(df, engine, table_name, tamanho_lote)
+    else:
+        df.to_sql(table_name, engine, if_exists='append', index=False, chunksize=tamanho_lote)
+
+    duracao = time.perf_counter() - inicio
+    taxa = len(df) / duracao if duracao > 0 else 0
+    log_print(f"  [DESEMPENHO] `{table_name}`: {len(df)} linhas em {duracao:.2f}s "
+              f"({taxa:,.0f} linhas/s) via {estrategia_usada}.")
+    return taxa
 
 
+# ===================================================================
+# PUBLICAÇÃO POR TROCA DE TABELAS (STAGING -> PRODUÇÃO)
+# ===================================================================
+SUFIXO_STAGING = "__staging"
+SUFIXO_ANTERIOR = "__prev"
 
 
+def publicar_tabela_staging(engine, table_name, tabela_existe=True):
+    """
+    Publica `<tabela>__staging` como `<tabela>` com um único RENAME TABLE atômico.
+    A versão publicada anteriormente é mantida como `<tabela>__prev` por uma geração.
+    """
+    tabela_staging = f"{table_name}{SUFIXO_STAGING}"
+    tabela_anterior = f"{table_name}{SUFIXO_ANTERIOR}"
+    with engine.connect() as connection:
+        if tabela_existe:
+            connection.execute(text(f"DROP TABLE IF EXISTS `{tabela_anterior}`;"))
+            connection.execute(text(
+                f"RENAME TABLE `{table_name}` TO `{tabela_anterior}`, `{tabela_staging}` TO `{table_name}`;"
+            ))
+        else:
+            connection.execute(text(f"RENAME TABLE `{tabela_staging}` TO `{table_name}`;"))
+        connection.commit()
+    invalidar_inspetor(engine)
+    log_print(f"  [INFO] `{tabela_staging}` publicada como `{table_name}`.")
+
+
+# ===================================================================
+# CARGA INCREMENTAL (UPSERT POR CHAVE NATURAL)
+# ===================================================================
+# Chave natural de cada tabela (nomes de coluna já limpos por clean_column_name)
+CHAVES_NATURAIS = {
+    'tb_agua': ['sup', 'municipio'],
+    'tb_esgoto': ['sup', 'municipio'],
+    'tb_nla_nle': ['ds_cd_superintendencia', 'tipo_ligacao', 'mes'],
+    'tb_dados_realizados': ['superintendencia', 'grafico', 'mes_ano'],
+    'tb_incremento_mensal': ['tipo', 'sup', 'municipio', 'mes'],
+}
+
+# Colunas que mudam a cada execução e não devem marcar a linha como alterada
+COLUNAS_VOLATEIS = {'data_de_extracao', 'data_extracao_etl', 'data_atualizacao_painel'}
+
+COLUNA_CHAVE_NATURAL = 'chave_natural'
+COLUNA_HASH_LINHA = 'hash_linha'
+
+
+def adicionar_impressoes_digitais(df, chaves, colunas_volateis=()):
+    """
+    Acrescenta ao DataFrame as colunas 'chave_natural' (hash das colunas da chave) e
+    'hash_linha' (hash das demais colunas, sem as voláteis).
+    Linhas repetidas na chave recebem um número de ocorrência para que a chave seja única.
+    """
+    ocorrencia = df.groupby(chaves, dropna=False, sort=False).cumcount()
+    base_chave = df[chaves].astype(str).assign(_ocorrencia=ocorrencia.values)
+    colunas_valor = [col for col in df.columns if col not in set(colunas_volateis) | set(chaves)]
+
+    # Os hashes de 64 bits são guardados como BIGINT (com sinal) no MySQL
+    df[COLUNA_CHAVE_NATURAL] = pd.util.hash_pandas_object(base_chave, index=False).values.view(np.int64)
+    df[COLUNA_HASH_LINHA] = pd.util.hash_pandas_object(df[colunas_valor], index=False).values.view(np.int64)
+    return df
+
+
+def _garantir_indice_chave_natural(engine, table_name):
+    """Cria o índice único em `chave_natural` (necessário para o ON DUPLICATE KEY UPDATE)."""
+    with engine.connect() as connection:
+        existe = connection.execute(
+            text(f"SHOW INDEX FROM `{table_name}` WHERE Key_name = 'ux_{COLUNA_CHAVE_NATURAL}';")
+        ).fetchone()
+        if not existe:
+            connection.execute(text(
+                f"ALTER TABLE `{table_name}` ADD UNIQUE INDEX `ux_{COLUNA_CHAVE_NATURAL}` (`{COLUNA_CHAVE_NATURAL}`);"
+            ))
+            connection.commit()
+    invalidar_inspetor(engine)
+
+
+def carregar_incremental_mysql(df, engine, table_name, tamanho_lote=5000):
+    """
+    Compara as impressões digitais do DataFrame com as gravadas na tabela e grava
+    somente a diferença, em uma única transação:
+        - linhas novas ou alteradas: INSERT ... ON DUPLICATE KEY UPDATE;
+        - linhas que deixaram de existir: DELETE pela chave natural.
+
+    Returns:
+        dict: Quantidade de linhas inseridas/atualizadas, removidas e inalteradas.
+    """
+    armazenados = pd.read_sql(
+        text(f"SELECT `{COLUNA_CHAVE_NATURAL}`, `{COLUNA_HASH_LINHA}` FROM `{table_name}`;"), engine
+    )
+    hash_por_chave = dict(zip(armazenados[COLUNA_CHAVE_NATURAL].tolist(), armazenados[COLUNA_HASH_LINHA].tolist()))
+
+    chaves_df = df[COLUNA_CHAVE_NATURAL].tolist()
+    alteradas = [hash_por_chave.get(chave) != hash_linha
+                 for chave, hash_linha in zip(chaves_df, df[COLUNA_HASH_LINHA].tolist())]
+    df_upsert = df[alteradas]
+    chaves_removidas = list(set(hash_por_chave) - set(chaves_df))
+
+    colunas = ', '.join(f"`{col}`" for col in df.columns)
+    marcadores = ', '.join(['%s'] * len(df.columns))
+    atualizacoes = ', '.join(f"`{col}` = VALUES(`{col}`)" for col in df.columns)
+    query_upsert = (f"INSERT INTO `{table_name}` ({colunas}) VALUES ({marcadores}) "
+                    f"ON DUPLICATE KEY UPDATE {atualizacoes}")
+
+    conexao = engine.raw_connection()
+    try:
+        with conexao.cursor() as cursor:
+            linhas = _linhas_python(df_upsert)
+            for inicio in range(0, len(linhas), tamanho_lote):
+                cursor.executemany(query_upsert, linhas[inicio:inicio + tamanho_lote])
+            for inicio in range(0, len(chaves_removidas), tamanho_lote):
+                lote = chaves_removidas[inicio:inicio + tamanho_lote]
+                cursor.execute(
+                    f"DELETE FROM `{table_name}` WHERE `{COLUNA_CHAVE_NATURAL}` IN ({', '.join(['%s'] * len(lote))})",
+                    lote
+                )
+        conexao.commit()
+    except Exception:
+        conexao.rollback()
+        raise
+    finally:
+        conexao.close()
+
+    contagem = {
+        'upsert': len(df_upsert),
+        'removidas': len(chaves_removidas),
+        'inalteradas': len(df) - len(df_upsert),
+    }
+    log_print(f"  [INCREMENTAL] `{table_name}`: {contagem['upsert']} inseridas/atualizadas, "
+              f"{contagem['removidas']} removidas, {contagem['inalteradas']} inalteradas.")
+    return contagem
 
 
 # ===================================================================
 # LÓGICA DE UPLOAD GENÉRICA (LÓGICA PRINCIPAL ATUALIZADA)
 # ===================================================================
-def upload_df_to_mysql(df_to_upload, mysql_config, date_column, table_name):
+def _esquema_mudou(df, inspector, table_name):
+    """
+    True se a tabela publicada precisa de alguma alteração de esquema para receber o DataFrame
+    (colunas novas ou removidas, tipos ou índices diferentes do esquema declarado).
+    """
+    existing_columns = {col['name'] for col in inspector.get_columns(table_name)} - {'id'}
+    return existing_columns != set(df.columns) or bool(alteracoes_esquema(inspector, table_name))
+
+
+def _upload_incremental(df, engine, table_name, tamanho_lote, inicio_conexao):
+    """
+    Caminho incremental de upload_df_to_mysql, usado só quando o esquema da tabela publicada
+    não mudou: grava apenas a diferença com carregar_incremental_mysql, sem nenhum ALTER.
+    """
+    print(f"  Carga incremental em `{table_name}` (chave natural: {CHAVES_NATURAIS[table_name]})...")
+    tempo_conexao = time.perf_counter() - inicio_conexao
+
+    inicio_carga = time.perf_counter()
+    carregar_incremental_mysql(df, engine, table_name, tamanho_lote)
+    tempo_carga = time.perf_counter() - inicio_carga
+    print(f"  Tabela `{table_name}` atualizada com sucesso (incremental).")
+    log_print(f"  [DESEMPENHO] `{table_name}`: conexão/esquema {tempo_conexao:.2f}s | carga {tempo_carga:.2f}s.")
+    return True
+
+
+def upload_df_to_mysql(df_to_upload, mysql_config, date_column, table_name, estrategia_carga='load_data', tamanho_lote=5000,
+                       modo_carga='completo'):
     """
     Faz o upload de um DataFrame para uma tabela específica no MySQL.
     Esta função foi ATUALIZADA para lidar com a adição de novas colunas
-    em tabelas existentes.
+    em tabelas existentes. A inserção das linhas usa a estratégia de
+    inserir_dados_mysql ('load_data', 'executemany' ou 'to_sql').
+    Os dados são carregados em `<tabela>__staging` e publicados com RENAME TABLE.
+
+    Com modo_carga='incremental' e uma chave natural definida em CHAVES_NATURAIS,
+    apenas as linhas novas, alteradas ou removidas são gravadas (a primeira carga
+    ainda é completa, já criando as colunas de impressão digital). Quando o esquema
+    muda, a carga volta a ser completa pela staging, e a tabela publicada não sofre ALTER.
+
+    Returns:
+        bool: True se a tabela foi publicada, False em caso de erro.
     """
     print(f"\nIniciando o upload do DataFrame para a tabela: `{table_name}`...")
 
-    # Conexão com o banco
-    db_connection_str = (
-        f"mysql+pymysql://{mysql_config['user']}:{mysql_config['password']}@"
-        f"{mysql_config['host']}/{mysql_config['database']}?charset=utf8mb4"
-    )
+    # Conexão com o banco (engine e inspetor compartilhados entre as tabelas)
+    inicio_conexao = time.perf_counter()
     try:
-        engine = create_engine(db_connection_str)
-        inspector = inspect(engine)
+        engine = obter_engine(mysql_config)
+        inspector = obter_inspetor(engine)
     except Exception as e:
         print(f"Erro ao conectar ao MySQL: {e}")
-        return
+        return False
 
     try:
         df = df_to_upload.copy()
@@ -351,14 +829,48 @@ def upload_df_to_mysql(df_to_upload, mysql_config, date_column, table_name):
         if date_column not in df.columns:
             df[date_column] = datetime.now()
 
-        # Se a tabela não existe, cria com PK
+        # Impressões digitais para a carga incremental
+        chaves = CHAVES_NATURAIS.get(table_name) if modo_carga == 'incremental' else None
+        if chaves and not set(chaves).issubset(df.columns):
+            print(f"  [AVISO] Chave natural {chaves} ausente em `{table_name}`. Usando carga completa.")
+            log_print(f"  [AVISO] Chave natural {chaves} ausente em `{table_name}`. Usando carga completa.")
+            chaves = None
+        if chaves:
+            df = adicionar_impressoes_digitais(df, chaves, COLUNAS_VOLATEIS | {date_column})
+
+        if chaves and inspector.has_table(table_name) and \
+                COLUNA_CHAVE_NATURAL in [col['name'] for col in inspector.get_columns(table_name)]:
+            if not _esquema_mudou(df, inspector, table_name):
+                return _upload_incremental(df, engine, table_name, tamanho_lote, inicio_conexao)
+            # Mudança de esquema (ex.: a coluna de um mês novo): carga completa pela staging,
+            # já com as impressões digitais, para a tabela publicada não sofrer ALTER
+            print(f"  O esquema de `{table_name}` mudou. Usando carga completa pela staging.")
+            log_print(f"  [INFO] O esquema de `{table_name}` mudou. Usando carga completa pela staging.")
+
+        # Toda carga é feita em uma tabela de staging e publicada com RENAME TABLE,
+        # para que o dashboard nunca veja a tabela vazia ou pela metade.
+        tabela_staging = f"{table_name}{SUFIXO_STAGING}"
+        with engine.connect() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS `{tabela_staging}`;"))
+            connection.commit()
+
+        # Se a tabela não existe, cria a staging com PK a partir do esquema do DataFrame
         if not inspector.has_table(table_name):
             print(f"  A tabela `{table_name}` não existe. Criando e inserindo dados...")
-            df.to_sql(table_name, engine, if_exists='replace', index=False)
+            # Cria a tabela vazia (tipos e índices do esquema declarado) e depois carrega as linhas em massa
             with engine.connect() as connection:
-                query = text(f"ALTER TABLE `{table_name}` ADD COLUMN `id` INT AUTO_INCREMENT PRIMARY KEY FIRST;")
-                connection.execute(query)
+                connection.execute(text(montar_create_table(
+                    table_name, df, get_mysql_type_from_pandas, nome_fisico=tabela_staging
+                )))
                 connection.commit()
+            invalidar_inspetor(engine)
+            tempo_conexao = time.perf_counter() - inicio_conexao
+
+            inicio_carga = time.perf_counter()
+            inserir_dados_mysql(df, engine, tabela_staging, estrategia_carga, tamanho_lote)
+            if chaves:
+                _garantir_indice_chave_natural(engine, tabela_staging)
+            publicar_tabela_staging(engine, table_name, tabela_existe=False)
             print(f"  Tabela `{table_name}` criada e dados inseridos com sucesso.")
 
         # Se a tabela já existe
@@ -380,53 +892,378 @@ def upload_df_to_mysql(df_to_upload, mysql_config, date_column, table_name):
             # Verifica se há colunas na tabela do banco que não existem no DataFrame
             colunas_faltando_df = set(existing_columns) - set(df_columns)
 
+            # Colunas que podem deixar de existir (meses fora da janela do export, o total
+            # antigo com o ano no nome) são removidas da staging
+            colunas_obsoletas = {col for col in colunas_faltando_df if coluna_obsoleta(table_name, col)}
+            colunas_faltando_df -= colunas_obsoletas
+
             # Se faltam colunas no DataFrame que são obrigatórias no banco, isso é um erro.
             if colunas_faltando_df:
                 print(f"  [ERRO] Esquema incompatível para a tabela `{table_name}`.")
                 print(f"  Colunas que existem no banco mas faltam no DataFrame: {colunas_faltando_df}")
-                return # Interrompe a execução para esta tabela
+                return False # Interrompe a execução para esta tabela
 
-            # Se existem colunas novas no DataFrame, vamos adicioná-las à tabela do banco
+            # A staging nasce com a mesma estrutura da tabela publicada
+            with engine.connect() as connection:
+                connection.execute(text(f"CREATE TABLE `{tabela_staging}` LIKE `{table_name}`;"))
+                for col_name in colunas_obsoletas:
+                    connection.execute(text(f"ALTER TABLE `{tabela_staging}` DROP COLUMN `{col_name}`;"))
+                    print(f"    Coluna obsoleta `{col_name}` removida.")
+                connection.commit()
+
+            # Se existem colunas novas no DataFrame, elas são adicionadas na staging
+            # (a tabela publicada não sofre ALTER enquanto o dashboard a consulta)
             if colunas_extras_df:
                 print(f"  Detectadas novas colunas no DataFrame: {colunas_extras_df}. Adicionando à tabela...")
                 with engine.connect() as connection:
                     for col_name in colunas_extras_df:
-                        # Mapeia o tipo do pandas para o tipo do MySQL
-                        mysql_type = get_mysql_type_from_pandas(df[col_name].dtype)
+                        # Tipo declarado em esquemas_mysql ou, se não houver, mapeado do pandas
+                        mysql_type = tipo_coluna(table_name, col_name) or get_mysql_type_from_pandas(df[col_name].dtype)
                         
                         # Cria e executa a query para adicionar a nova coluna
-                        query = text(f"ALTER TABLE `{table_name}` ADD COLUMN `{col_name}` {mysql_type};")
+                        query = text(f"ALTER TABLE `{tabela_staging}` ADD COLUMN `{col_name}` {mysql_type};")
                         connection.execute(query)
                         print(f"    Coluna `{col_name}` (tipo {mysql_type}) adicionada com sucesso.")
                     connection.commit()
+                invalidar_inspetor(engine)
+
+            # Tipos e índices do esquema declarado (o ALTER na staging vazia é instantâneo)
+            if reconciliar_esquema(engine, obter_inspetor(engine), table_name, nome_fisico=tabela_staging):
+                invalidar_inspetor(engine)
             
             # ===================================================================
             # FIM DA NOVA LÓGICA
             # ===================================================================
 
-            print(f"  Esquema verificado/atualizado. Apagando dados antigos (TRUNCATE) e inserindo os novos.")
-            with engine.connect() as connection:
-                connection.execute(text(f"TRUNCATE TABLE `{table_name}`;"))
-                connection.commit()
-            
-            df.to_sql(table_name, engine, if_exists='append', index=False)
+            print(f"  Esquema verificado/atualizado. Carregando `{tabela_staging}` e trocando as tabelas (RENAME).")
+            tempo_conexao = time.perf_counter() - inicio_conexao
+
+            inicio_carga = time.perf_counter()
+            inserir_dados_mysql(df, engine, tabela_staging, estrategia_carga, tamanho_lote)
+            if chaves:
+                _garantir_indice_chave_natural(engine, tabela_staging)
+            publicar_tabela_staging(engine, table_name, tabela_existe=True)
             print(f"  Tabela `{table_name}` atualizada com sucesso.")
 
+        tempo_carga = time.perf_counter() - inicio_carga
+        log_print(f"  [DESEMPENHO] `{table_name}`: conexão/esquema {tempo_conexao:.2f}s | carga {tempo_carga:.2f}s.")
+        return True
+
     except Exception as e:
         print(f"  [ERRO] Erro inesperado ao processar o DataFrame para a tabela `{table_name}`: {e}")
+        return False
+
+
+# ===================================================================
+# TABELAS DE RESUMO DO DASHBOARD
+# ===================================================================
+# Agregações que o dashboard (WEB/banco/database.py) lê prontas, em vez de
+# somar as tabelas brutas a cada acesso. São recriadas ao final de cada upload
+# e publicadas pela mesma troca staging -> produção das tabelas de dados.
+# Incrementos de ÁGUA / ESGOTO em formato longo (veja converter_incremento_formato_longo)
+TABELA_INCREMENTO_MENSAL = 'tb_incremento_mensal'
+
+# Metas dos gráficos: uma tabela por ano (tb_meta_2025, tb_meta_2026, ...)
+_PADRAO_TABELA_METAS = re.compile(r'^tb_meta_(?P<ano>\d{4})$')
+
+# Gráfico de tb_dados_realizados e coluna de tb_meta_<ano> de cada categoria dos gráficos
+CATEGORIAS_GRAFICOS = {
+    'AGUA_FORMAL': ('Incremento de Água - Urbano', 'meta_formal_agua'),
+    'AGUA_INFORMAL': ('Incremento de Água - Rural + Informal', 'meta_informal_agua'),
+    'ESGOTO_FORMAL': ('Incremento de Esgoto - Urbano', 'meta_formal_esgoto'),
+    'ESGOTO_INFORMAL': ('Incremento de Esgoto Rural + Informal', 'meta_informal_esgoto'),
+}
+
+RESUMOS_DASHBOARD = {
+    'tb_resumo_ranking_incrementos': """
+        dataset VARCHAR(64) NOT NULL,
+        ano SMALLINT NOT NULL,
+        posicao INT NOT NULL,
+        sup VARCHAR(255),
+        total BIGINT NOT NULL,
+        PRIMARY KEY (dataset, ano, posicao)
+    """,
+    'tb_resumo_ranking_nla_nle': """
+        posicao INT NOT NULL,
+        superintendencia VARCHAR(255),
+        total_agua BIGINT NOT NULL,
+        total_esgoto BIGINT NOT NULL,
+        total_geral BIGINT NOT NULL,
+        PRIMARY KEY (posicao)
+    """,
+    'tb_resumo_graficos': """
+        ano SMALLINT NOT NULL,
+        superintendencia VARCHAR(255) NOT NULL,
+        categoria VARCHAR(32) NOT NULL,
+        meta BIGINT NOT NULL,
+        realizado DOUBLE NOT NULL,
+        PRIMARY KEY (ano, superintendencia, categoria)
+    """,
+}
+
+
+def _sql_resumo_ranking_incrementos(inspector):
+    """
+    Monta o INSERT ... SELECT do ranking por SUP do total de cada ano (janeiro até o último
+    mês publicado), para cada tipo de incremento (ÁGUA / ESGOTO) de tb_incremento_mensal.
+    Todos os anos ficam no resumo; o dashboard escolhe o ano pela coluna `ano`.
+    """
+    if not inspector.has_table(TABELA_INCREMENTO_MENSAL):
+        return []
+    return [f"""
+        INSERT INTO `{{destino}}` (dataset, ano, posicao, sup, total)
+        SELECT tipo, ano,
+               ROW_NUMBER() OVER (PARTITION BY tipo, ano ORDER BY SUM(quantidade) DESC), sup,
+               COALESCE(SUM(quantidade), 0)
+        FROM `{TABELA_INCREMENTO_MENSAL}`
+        GROUP BY tipo, ano, sup
+    """]
+
+
+def _sql_resumo_ranking_nla_nle(inspector):
+    """Monta o INSERT ... SELECT do ranking geral de Novas Ligações por superintendência."""
+    if not inspector.has_table('tb_nla_nle'):
+        return []
+    return ["""
+        INSERT INTO `{destino}` (posicao, superintendencia, total_agua, total_esgoto, total_geral)
+        SELECT
+            ROW_NUMBER() OVER (ORDER BY SUM(quantidade) DESC),
+            ds_cd_superintendencia,
+            SUM(CASE WHEN tipo_ligacao = 'Ligação Nova Água' THEN quantidade ELSE 0 END),
+            SUM(CASE WHEN tipo_ligacao = 'Ligação Nova Esgoto' THEN quantidade ELSE 0 END),
+            SUM(quantidade)
+        FROM tb_nla_nle
+        WHERE ds_cd_superintendencia IS NOT NULL AND ds_cd_superintendencia != ''
+        GROUP BY ds_cd_superintendencia
+    """]
+
+
+def _sql_resumo_graficos(inspector):
+    """
+    Monta um INSERT ... SELECT de meta x realizado acumulado por superintendência e categoria
+    para cada ano com tabela de metas (tb_meta_<ano>). Só entram as superintendências com metas.
+    """
+    anos = sorted(
+        int(encontrado['ano'])
+        for encontrado in map(_PADRAO_TABELA_METAS.match, inspector.get_table_names())
+        if encontrado
+    )
+    colunas_realizado = set()
+    if inspector.has_table('tb_dados_realizados'):
+        colunas_realizado = {c['name'] for c in inspector.get_columns('tb_dados_realizados')}
+
+    comandos = []
+    for ano in anos:
+        metas = " UNION ALL ".join(
+            f"SELECT sup, '{categoria}' AS categoria, '{grafico}' AS grafico, COALESCE({coluna_meta}, 0) AS meta "
+            f"FROM tb_meta_{ano} WHERE sup IS NOT NULL"
+            for categoria, (grafico, coluna_meta) in CATEGORIAS_GRAFICOS.items()
+        )
+        realizado = "SELECT NULL AS superintendencia, NULL AS grafico, 0 AS realizado FROM DUAL WHERE FALSE"
+        if colunas_realizado:
+            # Cargas anteriores à coluna `mes` só têm o texto 'março 2025'
+            filtro_ano = (
+                f"mes >= '{ano}-01-01' AND mes < '{ano + 1}-01-01'"
+                if 'mes' in colunas_realizado else f"mes_ano LIKE '%{ano}%'"
+            )
+            realizado = f"""
+                SELECT superintendencia, grafico, SUM(calculo) AS realizado
+                FROM tb_dados_realizados
+                WHERE {filtro_ano}
+                GROUP BY superintendencia, grafico
+            """
+        comandos.append(f"""
+            INSERT INTO `{{destino}}` (ano, superintendencia, categoria, meta, realizado)
+            SELECT {ano}, m.sup, m.categoria, m.meta, COALESCE(r.realizado, 0)
+            FROM ({metas}) m
+            LEFT JOIN ({realizado}) r ON r.superintendencia = m.sup AND r.grafico = m.grafico
+            ON DUPLICATE KEY UPDATE meta = VALUES(meta), realizado = VALUES(realizado)
+        """)
+    return comandos
+
+
+_CONSULTAS_RESUMO = {
+    'tb_resumo_ranking_incrementos': _sql_resumo_ranking_incrementos,
+    'tb_resumo_ranking_nla_nle': _sql_resumo_ranking_nla_nle,
+    'tb_resumo_graficos': _sql_resumo_graficos,
+}
+
+
+def publicar_resumos_dashboard(engine):
+    """
+    Recria as tabelas de resumo do dashboard a partir das tabelas já publicadas.
+    Cada resumo é montado em `<tabela>__staging` e publicado com RENAME TABLE;
+    a falha de um resumo não impede os demais.
+
+    Returns:
+        dict: {tabela_resumo: bool} indicando o sucesso de cada resumo.
+    """
+    resultados = {}
+    for tabela, colunas_ddl in RESUMOS_DASHBOARD.items():
+        inicio = time.perf_counter()
+        tabela_staging = f"{tabela}{SUFIXO_STAGING}"
+        try:
+            inspector = obter_inspetor(engine)
+            comandos = _CONSULTAS_RESUMO[tabela](inspector)
+            tabela_existe = inspector.has_table(tabela)
+            with engine.begin() as connection:
+                connection.execute(text(f"DROP TABLE IF EXISTS `{tabela_staging}`;"))
+                connection.execute(text(f"CREATE TABLE `{tabela_staging}` ({colunas_ddl}) DEFAULT CHARSET=utf8mb4;"))
+                for comando in comandos:
+                    connection.execute(text(comando.format(destino=tabela_staging)))
+                linhas = connection.execute(text(f"SELECT COUNT(*) FROM `{tabela_staging}`;")).scalar()
+            publicar_tabela_staging(engine, tabela, tabela_existe=tabela_existe)
+            log_print(f"[RESUMO] {tabela:<30} | {linhas:>5} linhas | {time.perf_counter() - inicio:6.2f}s | OK")
+            resultados[tabela] = True
+        except Exception as e:
+            log_print(f"[RESUMO] {tabela:<30} | FALHA ({e})")
+            resultados[tabela] = False
+    return resultados
+
+
+# ===================================================================
+# METADADOS DAS EXECUÇÕES DO ETL
+# ===================================================================
+# Uma linha por tabela com a última carga bem-sucedida. O dashboard lê as datas de
+# atualização, a versão dos dados (MAX(atualizado_em)) e o ano exibido por padrão
+# (ano_mais_recente) daqui em uma única consulta, sem varrer as tabelas de dados.
+# É gravada por último, depois dos resumos.
+TABELA_METADADOS_CARGA = 'tb_metadados_carga'
+
+
+def _maior_data(df, coluna):
+    """Maior valor da coluna de data do DataFrame como datetime (None se ausente/vazia)."""
+    if coluna not in df.columns or df.empty:
+        return None
+    valor = pd.to_datetime(df[coluna], errors='coerce').max()
+    return None if pd.isna(valor) else valor.to_pydatetime()
+
+
+def _maior_ano(df):
+    """
+    Ano do mês mais recente do DataFrame: pela coluna `mes` (formato longo) ou pelas
+    colunas 'jan/2025' (formato largo). None se o DataFrame não tiver meses.
+    """
+    coluna_mes = next((col for col in df.columns if str(col).lower() == 'mes'), None)
+    if coluna_mes is not None:
+        maior = _maior_data(df, coluna_mes)
+        return None if maior is None else maior.year
+    return max((data.year for data in map(_data_coluna_mes, df.columns) if data is not None), default=None)
+
+
+def registrar_metadados_carga(engine, df_dict, resultados, id_execucao):
+    """
+    Grava em tb_metadados_carga a execução de cada tabela enviada com sucesso
+    (datas de extração/atualização do painel, ano mais recente com dados, quantidade
+    de linhas e id da execução).
+    """
+    linhas_metadados = []
+    for nome_base, resultado in resultados.items():
+        if not resultado['sucesso']:
+            continue
+        df = df_dict[nome_base]
+        linhas_metadados.append({
+            'tabela': resultado['tabela'],
+            'id_execucao': id_execucao,
+            'data_extracao_etl': _maior_data(df, 'data_extracao_etl'),
+            'data_atualizacao_painel': _maior_data(df, 'data_atualizacao_painel'),
+            'ano_mais_recente': _maior_ano(df),
+            'linhas': len(df),
+        })
+    if not linhas_metadados:
+        return
+
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS `{TABELA_METADADOS_CARGA}` (
+                    tabela VARCHAR(64) NOT NULL PRIMARY KEY,
+                    id_execucao VARCHAR(32) NOT NULL,
+                    data_extracao_etl DATETIME NULL,
+                    data_atualizacao_painel DATETIME NULL,
+                    ano_mais_recente SMALLINT NULL,
+                    linhas INT NOT NULL,
+                    atualizado_em DATETIME(6) NOT NULL
+                ) DEFAULT CHARSET=utf8mb4;
+            """))
+            # Tabela criada antes da coluna do ano
+            colunas = {c['name'] for c in inspect(connection).get_columns(TABELA_METADADOS_CARGA)}
+            if 'ano_mais_recente' not in colunas:
+                connection.execute(text(
+                    f"ALTER TABLE `{TABELA_METADADOS_CARGA}` "
+                    f"ADD COLUMN ano_mais_recente SMALLINT NULL AFTER data_atualizacao_painel;"
+                ))
+            connection.execute(text(f"""
+                INSERT INTO `{TABELA_METADADOS_CARGA}`
+                    (tabela, id_execucao, data_extracao_etl, data_atualizacao_painel, ano_mais_recente, linhas,
+                     atualizado_em)
+                VALUES (:tabela, :id_execucao, :data_extracao_etl, :data_atualizacao_painel, :ano_mais_recente,
+                        :linhas, NOW(6))
+                ON DUPLICATE KEY UPDATE
+                    id_execucao = VALUES(id_execucao),
+                    data_extracao_etl = VALUES(data_extracao_etl),
+                    data_atualizacao_painel = VALUES(data_atualizacao_painel),
+                    ano_mais_recente = VALUES(ano_mais_recente),
+                    linhas = VALUES(linhas),
+                    atualizado_em = VALUES(atualizado_em)
+            """), linhas_metadados)
+        log_print(f"[INFO] Metadados da execução {id_execucao} gravados para {len(linhas_metadados)} tabela(s).")
+    except Exception as e:
+        log_print(f"[ERRO] Falha ao gravar os metadados da execução em `{TABELA_METADADOS_CARGA}`: {e}")
 
 
 # ===================================================================
 # FUNÇÃO "ORQUESTRADORA" (Versão Refatorada)
 # ===================================================================
-def subir_multiplos_dfs_para_mysql(df_dict, tabela_prefixo="tb_", database="sandbox", date_column="data_upload"):
+def _subir_tabela(df, mysql_config, date_column, tabela, estrategia_carga, tamanho_lote, modo_carga):
+    """
+    Sobe um DataFrame e devolve o resultado da tabela (sucesso, linhas, duração e erro).
+    Nunca propaga exceções, para que a falha de uma tabela não interrompa as demais.
+    """
+    inicio = time.perf_counter()
+    resultado = {'tabela': tabela, 'sucesso': False, 'linhas': len(df), 'duracao': 0.0, 'erro': None}
+    try:
+        resultado['sucesso'] = upload_df_to_mysql(
+            df_to_upload=df,
+            mysql_config=mysql_config,
+            date_column=date_column,
+            table_name=tabela,
+            estrategia_carga=estrategia_carga,
+            tamanho_lote=tamanho_lote,
+            modo_carga=modo_carga
+        )
+        if not resultado['sucesso']:
+            resultado['erro'] = "Falha no upload (veja o log da tabela)."
+    except Exception as e:
+        resultado['erro'] = str(e)
+    resultado['duracao'] = time.perf_counter() - inicio
+    return resultado
+
+
+def subir_multiplos_dfs_para_mysql(df_dict, tabela_prefixo="tb_", database="sandbox", date_column="data_upload",
+                                   estrategia_carga="load_data", tamanho_lote=5000, paralelo=True,
+                                   modo_carga="completo", publicar_resumos=True, id_execucao=None):
     """
     Orquestra o upload de múltiplos DataFrames para o MySQL, chamando a função genérica
     para cada um.
+
+    Args:
+        estrategia_carga (str): 'load_data' (padrão), 'executemany' ou 'to_sql'.
+        tamanho_lote (int): Linhas por lote nos INSERTs em massa.
+        paralelo (bool): Se True, sobe as tabelas simultaneamente em um pool de threads
+                         do tamanho do pool de conexões.
+        modo_carga (str): 'completo' (recarrega a tabela) ou 'incremental' (upsert por chave natural).
+        publicar_resumos (bool): Se True, recria as tabelas de resumo do dashboard ao final.
+        id_execucao (str): Identificador gravado em tb_metadados_carga (padrão: data/hora atual).
+
+    Returns:
+        dict: Resultado por dataset ({'tabela', 'sucesso', 'linhas', 'duracao', 'erro'}).
     """
     print("=====================================================")
     print("=== INICIANDO PROCESSO DE UPLOAD DE DATAFRAMES... ===")
     print("=====================================================")
+    if id_execucao is None:
+        id_execucao = datetime.now().strftime('%Y%m%d%H%M%S')
 
     # Centraliza a configuração do banco
     mysql_config = {
@@ -436,18 +1273,47 @@ def subir_multiplos_dfs_para_mysql(df_dict, tabela_prefixo="tb_", database="sand
         'database': database
     }
 
-    # Itera sobre o dicionário de DataFrames
-    for nome_base, df in df_dict.items():
+    tarefas = {}
+    for nome_base in df_dict:
         # Limpa o nome para criar um nome de tabela válido
         nome_tabela_limpo = re.sub(r'\s+', '_', nome_base.strip().lower())
         nome_tabela_limpo = ''.join(e for e in nome_tabela_limpo if e.isalnum() or e == '_')
-        
-        tabela = f"{tabela_prefixo}{nome_tabela_limpo}"
-        
-        # Chama a função genérica e robusta para fazer o trabalho
-        upload_df_to_mysql(
-            df_to_upload=df,
-            mysql_config=mysql_config,
-            date_column=date_column,
-            table_name=tabela
-        )
\ No newline at end of file
+        tarefas[nome_base] = f"{tabela_prefixo}{nome_tabela_limpo}"
+
+    resultados = {}
+    try:
+        if paralelo and len(tarefas) > 1:
+            workers = min(CONFIG_POOL_MYSQL['pool_size'], len(tarefas))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futuros = {
+                    nome_base: executor.submit(
+                        _subir_tabela, df_dict[nome_base], mysql_config, date_column, tabela,
+                        estrategia_carga, tamanho_lote, modo_carga
+                    )
+                    for nome_base, tabela in tarefas.items()
+                }
+                for nome_base, futuro in futuros.items():
+                    resultados[nome_base] = futuro.result()
+        else:
+            for nome_base, tabela in tarefas.items():
+                resultados[nome_base] = _subir_tabela(
+                    df_dict[nome_base], mysql_config, date_column, tabela, estrategia_carga, tamanho_lote,
+                    modo_carga
+                )
+
+        if any(resultado['sucesso'] for resultado in resultados.values()):
+            engine = obter_engine(mysql_config)
+            if publicar_resumos:
+                publicar_resumos_dashboard(engine)
+            registrar_metadados_carga(engine, df_dict, resultados, id_execucao)
+    finally:
+        # Fecha as conexões do pool ao final da execução
+        descartar_engines()
+
+    # Resumo do upload
+    for nome_base, resultado in resultados.items():
+        status = "OK" if resultado['sucesso'] else f"FALHA ({resultado['erro']})"
+        log_print(f"[UPLOAD] {resultado['tabela']:<22} | {resultado['linhas']:>7} linhas | "
+                  f"{resultado['duracao']:6.2f}s | {status}")
+
+    return resultados
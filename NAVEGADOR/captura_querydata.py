@@ -0,0 +1,131 @@
+# ===================================================================
+# ARQUIVO: captura_querydata.py
+# Captura, pelo Chrome DevTools (log de desempenho do ChromeDriver), as respostas
+# 'querydata' que o Power BI recebe ao desenhar os visuais, e as transforma em
+# linhas com o decodificador DSR. Substitui, no Painel 3, o caminho
+# "Mostrar como uma tabela" + rolagem + leitura célula a célula.
+# ===================================================================
+import base64
+import json
+import os
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from DADOS.sistema_log import log_print
+from NAVEGADOR.decodificador_dsr import decodificar_querydata
+
+# Trecho da URL das consultas dos visuais (wabi-*.analysis.windows.net/.../querydata)
+TRECHO_URL_QUERYDATA = "querydata"
+
+MESES_PT = (
+    'janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho',
+    'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro'
+)
+
+
+def habilitar_captura_rede(chrome_options):
+    """Liga o log de desempenho do ChromeDriver, que repassa os eventos 'Network.*' do DevTools."""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return chrome_options
+
+
+def iniciar_captura_querydata(driver, pasta_gravacao=None):
+    """
+    Prepara a captura para este navegador.
+
+    Args:
+        pasta_gravacao (str, opcional): Se informada, grava cada resposta bruta em JSON
+            (para criar novas fixtures do decodificador).
+
+    Returns:
+        dict: Estado da captura, usado pelas demais funções.
+    """
+    driver.execute_cdp_cmd('Network.enable', {})
+    if pasta_gravacao:
+        os.makedirs(pasta_gravacao, exist_ok=True)
+    return {'driver': driver, 'pendentes': {}, 'concluidas': [], 'pasta_gravacao': pasta_gravacao}
+
+
+def _ler_eventos_rede(captura):
+    """Esvazia o log de desempenho, anotando as requisições querydata e as que já terminaram."""
+    for entrada in captura['driver'].get_log('performance'):
+        mensagem = json.loads(entrada['message'])['message']
+        metodo, parametros = mensagem.get('method'), mensagem.get('params', {})
+        if metodo == 'Network.responseReceived' and TRECHO_URL_QUERYDATA in parametros['response']['url']:
+            captura['pendentes'][parametros['requestId']] = parametros['response']['url']
+        elif metodo == 'Network.loadingFinished' and parametros.get('requestId') in captura['pendentes']:
+            captura['pendentes'].pop(parametros['requestId'])
+            captura['concluidas'].append(parametros['requestId'])
+
+
+def descartar_respostas(captura):
+    """Ignora as respostas recebidas até agora (ex.: as da limpeza de filtros)."""
+    _ler_eventos_rede(captura)
+    captura['concluidas'].clear()
+
+
+def coletar_respostas_querydata(captura):
+    """
+    Lê o corpo das respostas querydata concluídas desde a última coleta.
+
+    Returns:
+        list: As respostas (dicts do JSON), na ordem em que chegaram.
+    """
+    _ler_eventos_rede(captura)
+    respostas = []
+    for request_id in captura['concluidas']:
+        try:
+            corpo = captura['driver'].execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except WebDriverException as e:
+            # O Chrome descarta o corpo de respostas antigas; a próxima renderização consulta de novo
+            log_print(f"[AVISO] Corpo da resposta querydata {request_id} indisponível: {e.msg}")
+            continue
+        texto = base64.b64decode(corpo['body']).decode('utf-8') if corpo.get('base64Encoded') else corpo['body']
+        resposta = json.loads(texto)
+        respostas.append(resposta)
+
+        if captura['pasta_gravacao']:
+            nome = f"querydata_{time.strftime('%Y%m%d_%H%M%S')}_{len(os.listdir(captura['pasta_gravacao']))}.json"
+            with open(os.path.join(captura['pasta_gravacao'], nome), 'w', encoding='utf-8') as f:
+                json.dump(resposta, f, ensure_ascii=False, indent=1)
+    captura['concluidas'].clear()
+    return respostas
+
+
+def tabelas_por_medida(respostas, medidas):
+    """
+    Separa as tabelas decodificadas pela medida que cada uma contém.
+    Quando a mesma medida aparece mais de uma vez, vale a última (a do estado atual dos filtros).
+
+    Args:
+        medidas (iterable): Nomes das medidas procuradas (nome da coluna no modelo do relatório).
+
+    Returns:
+        dict: {medida: tabela} só com as medidas encontradas.
+    """
+    encontradas = {}
+    for resposta in respostas:
+        for tabela in decodificar_querydata(resposta):
+            for medida in medidas:
+                if medida in tabela['colunas']:
+                    encontradas[medida] = tabela
+    return encontradas
+
+
+def formatar_como_tabela(valor):
+    """
+    Formata um valor como o Power BI mostra em "Mostrar como uma tabela",
+    para o CSV continuar igual ao do caminho antigo (datas 'março de 2025', milhar com ponto).
+    """
+    if valor is None:
+        return ''
+    if hasattr(valor, 'month'):
+        return f"{MESES_PT[valor.month - 1]} de {valor.year}"
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    if isinstance(valor, int):
+        return f"{valor:,}".replace(',', '.')
+    if isinstance(valor, float):
+        return f"{valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+    return str(valor)
@@ -0,0 +1,168 @@
+# ===================================================================
+# ARQUIVO: decodificador_dsr.py
+# Decodifica as respostas 'querydata' do Power BI (o JSON que o relatório recebe
+# para desenhar cada visual) em tabelas de colunas e linhas.
+# Os dados vêm no formato DSR comprimido:
+#   - a primeira linha de cada grupo traz o esquema 'S' (colunas G0, G1, M0...;
+#     'DN' indica que o valor é um índice no dicionário 'ValueDicts');
+#   - 'C' traz só os valores que mudaram, na ordem das colunas;
+#   - 'R' é a máscara de bits das colunas repetidas da linha anterior;
+#   - 'Ø' é a máscara de bits das colunas nulas;
+#   - 'M' traz os níveis filhos de uma hierarquia (ex.: ano -> mês).
+# Não depende do Selenium: as respostas gravadas em fixtures_querydata/ são
+# conferidas offline com:  python -m NAVEGADOR.decodificador_dsr
+# ===================================================================
+import json
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+
+PASTA_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures_querydata")
+
+# Tipos de valor do esquema 'S' que precisam de conversão
+TIPO_DECIMAL = 2
+TIPO_DOUBLE = 3
+TIPO_INTEIRO = 4
+TIPO_DATA_HORA = 7
+
+_EPOCA = datetime(1970, 1, 1)
+_PADRAO_AGREGACAO = re.compile(r"^\w+\((.*)\)$")
+
+
+def _nome_coluna(item_select):
+    """'Sum(fIncremento.Incremento Água Urbano)' -> 'Incremento Água Urbano'."""
+    if item_select.get('DisplayName'):
+        return item_select['DisplayName']
+    nome = item_select.get('Name') or item_select['Value']
+    agregacao = _PADRAO_AGREGACAO.match(nome)
+    if agregacao:
+        nome = agregacao.group(1)
+    return nome.split('.', 1)[-1]
+
+
+def _converter_valor(valor, tipo):
+    """Converte o valor bruto conforme o tipo da coluna (datas em milissegundos desde 1970)."""
+    if valor is None:
+        return None
+    if tipo == TIPO_DATA_HORA and isinstance(valor, (int, float)):
+        return _EPOCA + timedelta(milliseconds=valor)
+    if tipo in (TIPO_DECIMAL, TIPO_DOUBLE) and isinstance(valor, str):
+        return float(valor.rstrip('DM'))
+    if tipo == TIPO_INTEIRO and isinstance(valor, str):
+        return int(valor.rstrip('L'))
+    return valor
+
+
+def _decodificar_grupo(nome_grupo, linhas_dsr, dicionarios, esquemas, valores_pai, ordem_colunas, saida):
+    """
+    Decodifica uma lista de linhas DSR (um 'DMn'), acumulando em `saida` as linhas
+    folha como dicionários {coluna: valor}, já somadas aos valores do nível pai.
+    O esquema de cada nível vem só no primeiro grupo e vale para os grupos irmãos
+    seguintes, por isso fica guardado em `esquemas`.
+    """
+    esquema = esquemas.get(nome_grupo, [])
+    anteriores = {}
+    for linha in linhas_dsr:
+        if 'S' in linha:
+            esquema = esquemas[nome_grupo] = linha['S']
+            for coluna in esquema:
+                if coluna['N'] not in ordem_colunas:
+                    ordem_colunas.append(coluna['N'])
+
+        repetidas = linha.get('R', 0)
+        nulas = linha.get('Ø', 0)
+        comprimidos = iter(linha.get('C', ()))
+        valores = dict(valores_pai)
+        for i, coluna in enumerate(esquema):
+            nome = coluna['N']
+            if repetidas >> i & 1:
+                valores[nome] = anteriores.get(nome)
+                continue
+            if nulas >> i & 1:
+                valor = None
+            elif 'C' in linha:
+                valor = next(comprimidos)
+            else:
+                # Linhas de uma coluna só trazem o valor pela chave (ex.: {"G0": 1704067200000})
+                valor = linha.get(nome)
+            if 'DN' in coluna and isinstance(valor, int):
+                valor = dicionarios[coluna['DN']][valor]
+            valores[nome] = _converter_valor(valor, coluna.get('T'))
+        anteriores = valores
+
+        filhos = [item for membro in linha.get('M', ()) for item in membro.items()]
+        if filhos:
+            for nome_filho, grupo_filho in filhos:
+                _decodificar_grupo(nome_filho, grupo_filho, dicionarios, esquemas, valores, ordem_colunas, saida)
+        else:
+            saida.append(valores)
+
+
+def decodificar_querydata(resposta):
+    """
+    Decodifica uma resposta 'querydata' (dict já carregado do JSON).
+
+    Returns:
+        list: Uma tabela por conjunto de dados da resposta, no formato
+              {'colunas': [nomes], 'linhas': [[valores]], 'completo': bool}.
+              'completo' é False quando o Power BI devolveu só uma janela dos dados.
+    """
+    tabelas = []
+    for resultado in resposta.get('results', ()):
+        dados = resultado.get('result', {}).get('data')
+        if not dados or 'dsr' not in dados:
+            continue
+        nomes = {item['Value']: _nome_coluna(item) for item in dados.get('descriptor', {}).get('Select', ())}
+
+        for conjunto in dados['dsr'].get('DS', ()):
+            dicionarios = conjunto.get('ValueDicts', {})
+            esquemas = {}
+            ordem_colunas = []
+            linhas = []
+            for hierarquia in conjunto.get('PH', ()):
+                for nome_grupo, grupo in hierarquia.items():
+                    _decodificar_grupo(nome_grupo, grupo, dicionarios, esquemas, {}, ordem_colunas, linhas)
+
+            tabelas.append({
+                'colunas': [nomes.get(coluna, coluna) for coluna in ordem_colunas],
+                'linhas': [[linha.get(coluna) for coluna in ordem_colunas] for linha in linhas],
+                'completo': conjunto.get('IC', True),
+            })
+    return tabelas
+
+
+# ===================================================================
+# CONFERÊNCIA DAS FIXTURES
+# ===================================================================
+def _serializavel(tabelas):
+    """Datas em ISO, para comparar com os arquivos .esperado.json."""
+    return [
+        {**tabela, 'linhas': [[v.isoformat() if isinstance(v, datetime) else v for v in linha]
+                              for linha in tabela['linhas']]}
+        for tabela in tabelas
+    ]
+
+
+def conferir_fixtures(pasta=PASTA_FIXTURES):
+    """Decodifica cada resposta gravada e compara com o resultado esperado ao lado dela."""
+    tudo_certo = True
+    for arquivo in sorted(os.listdir(pasta)):
+        if not arquivo.endswith('.json') or arquivo.endswith('.esperado.json'):
+            continue
+        with open(os.path.join(pasta, arquivo), encoding='utf-8') as f:
+            obtido = _serializavel(decodificar_querydata(json.load(f)))
+        with open(os.path.join(pasta, arquivo.replace('.json', '.esperado.json')), encoding='utf-8') as f:
+            esperado = json.load(f)
+
+        if obtido == esperado:
+            print(f"[SUCESSO] {arquivo}: {sum(len(t['linhas']) for t in obtido)} linhas conferidas.")
+        else:
+            tudo_certo = False
+            print(f"[ERRO] {arquivo}: resultado diferente do esperado.")
+            print(json.dumps(obtido, ensure_ascii=False, indent=1))
+    return tudo_certo
+
+
+if __name__ == '__main__':
+    sys.exit(0 if conferir_fixtures() else 1)
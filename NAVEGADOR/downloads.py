@@ -0,0 +1,144 @@
+# ===================================================================
+# ARQUIVO: downloads.py
+# Downloads das exportações do Power BI numa pasta exclusiva de cada navegador
+# (a pasta principal ou a de cada trabalhador), em vez de ~/Downloads.
+# A conclusão é detectada por eventos do sistema de arquivos (watchdog: inotify no
+# Linux, ReadDirectoryChangesW no Windows): o Chrome grava em '.crdownload' e só
+# cria o nome final quando termina. O arquivo exato que apareceu é devolvido para
+# ser movido, sem procurar "o .xlsx mais recente" nem depender do nome do arquivo.
+# ===================================================================
+import os
+import queue
+import shutil
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from DADOS.sistema_log import log_print
+from NAVEGADOR.esperas import registrar_espera
+
+# watchdog é opcional: sem o pacote, a pasta é verificada por varredura a cada INTERVALO_VARREDURA
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+PASTA_DOWNLOADS_PRINCIPAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "downloads")
+
+# Arquivos de download ainda em andamento
+EXTENSOES_TEMPORARIAS = ('.crdownload', '.tmp', '.part')
+
+INTERVALO_VARREDURA = 0.1
+# Com eventos, a pasta também é relida a cada INTERVALO_RELEITURA (caso um evento se perca)
+INTERVALO_RELEITURA = 1.0
+
+
+def preparar_pasta_downloads(pasta):
+    """Cria a pasta de downloads vazia (remove sobras de uma execução anterior)."""
+    shutil.rmtree(pasta, ignore_errors=True)
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+
+def configurar_pasta_downloads(driver, pasta):
+    """
+    Direciona os downloads do navegador para a pasta pelo DevTools (Browser.setDownloadBehavior),
+    o que vale também no modo headless. As preferências do perfil (configurar_perfil) já apontam
+    para a mesma pasta; se o comando falhar, elas continuam valendo.
+    """
+    try:
+        driver.execute_cdp_cmd('Browser.setDownloadBehavior', {
+            'behavior': 'allow', 'downloadPath': os.path.abspath(pasta)
+        })
+    except WebDriverException as e:
+        print(f"[AVISO] Não foi possível configurar a pasta de downloads pelo DevTools: {e.msg}")
+        log_print(f"[AVISO] Não foi possível configurar a pasta de downloads pelo DevTools: {e.msg}")
+
+
+class _EventosPasta(FileSystemEventHandler):
+    """Avisa a espera sempre que um arquivo é criado ou renomeado na pasta."""
+
+    def __init__(self, fila):
+        self.fila = fila
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.fila.put(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.fila.put(event.dest_path)
+
+
+def iniciar_espera_download(pasta):
+    """
+    Começa a observar a pasta. Deve ser chamada ANTES do clique de exportação,
+    para que um download rápido não termine antes da observação começar.
+
+    Returns:
+        dict: Estado da espera, usado por esperar_download / encerrar_espera_download.
+    """
+    espera = {'pasta': pasta, 'antes': set(os.listdir(pasta)), 'fila': queue.Queue(), 'observador': None}
+    if Observer is not None:
+        observador = Observer()
+        observador.schedule(_EventosPasta(espera['fila']), pasta, recursive=False)
+        observador.start()
+        espera['observador'] = observador
+    return espera
+
+
+def encerrar_espera_download(espera):
+    """Para a observação da pasta (também usada quando a exportação falha antes do download)."""
+    if espera['observador'] is not None:
+        espera['observador'].stop()
+        espera['observador'].join()
+        espera['observador'] = None
+
+
+def _arquivo_concluido(espera):
+    """Primeiro arquivo novo e completo na pasta, ou None."""
+    for nome in os.listdir(espera['pasta']):
+        if nome in espera['antes'] or nome.endswith(EXTENSOES_TEMPORARIAS):
+            continue
+        caminho = os.path.join(espera['pasta'], nome)
+        try:
+            if os.path.getsize(caminho) > 0:
+                return caminho
+        except OSError:
+            # Renomeado ou removido entre a listagem e a consulta
+            continue
+    return None
+
+
+def esperar_download(espera, timeout=120):
+    """
+    Espera o download iniciado depois de iniciar_espera_download terminar.
+
+    Returns:
+        str: Caminho do arquivo baixado, ou None se o tempo limite esgotou.
+    """
+    print(f"\n[INFO] Aguardando o download em: {espera['pasta']}")
+    inicio = time.perf_counter()
+    try:
+        while time.perf_counter() - inicio < timeout:
+            caminho = _arquivo_concluido(espera)
+            if caminho:
+                registrar_espera('download', time.perf_counter() - inicio)
+                print(f"[SUCESSO] Download de '{os.path.basename(caminho)}' concluído.")
+                return caminho
+
+            if espera['observador'] is not None:
+                try:
+                    espera['fila'].get(timeout=INTERVALO_RELEITURA)
+                except queue.Empty:
+                    pass
+            else:
+                time.sleep(INTERVALO_VARREDURA)
+
+        registrar_espera('download', time.perf_counter() - inicio, sucesso=False)
+        print(f"[ERRO] O download não foi concluído dentro do tempo limite de {timeout} segundos.")
+        return None
+    finally:
+        encerrar_espera_download(espera)
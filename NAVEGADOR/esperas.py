@@ -0,0 +1,215 @@
+# ===================================================================
+# ARQUIVO: esperas.py
+# Esperas por condição de prontidão do Power BI, no lugar dos time.sleep fixos.
+# Cada etapa segue assim que o painel está de fato pronto:
+#   - o spinner 'pbi-svg-loading' e os indicadores de carregamento dos visuais sumiram;
+#   - o DOM ficou sem mutações por um intervalo curto (MutationObserver injetado).
+# Cada etapa tem seu tempo limite, e o tempo gasto esperando é acumulado por etapa
+# para o relatório de espera x trabalho exibido ao final da extração.
+# ===================================================================
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from DADOS.sistema_log import log_print
+
+# --- Tempo limite (s) de cada etapa ---
+TIMEOUTS_ESPERA = {
+    'abrir_painel': 90,
+    'navegar_pagina': 60,
+    'limpar_filtros': 30,
+    'aplicar_filtro': 30,
+    'revelar_botao': 3,
+    'rolar_tabela': 3,
+    'voltar_relatorio': 30,
+}
+TIMEOUT_PADRAO = 30
+
+# Tempo (s) sem nenhuma mutação no DOM para considerar o painel estável
+QUIETUDE_PADRAO = 0.75
+QUIETUDE_ROLAGEM = 0.25
+
+# Intervalo entre as verificações das condições
+INTERVALO_VERIFICACAO = 0.1
+
+# Indicadores de carregamento do Power BI (basta um visível para o painel estar ocupado)
+SELETORES_CARREGANDO = (
+    '#pbi-svg-loading',
+    '.powerbi-spinner',
+    'visual-container [aria-busy="true"]',
+)
+
+# Telas que indicam que a página do painel abriu (ou que a sessão expirou)
+SELETOR_TELA_LOGIN = "input#email, input[type='email'], input[type='password']"
+SELETOR_RELATORIO = "exploration-host, #pvExplorationHost, visual-container"
+
+# Instala (uma vez por página) o observador de mutações e devolve o estado do painel.
+# arguments[0]: seletores de carregamento; arguments[1]: se true, reinicia a contagem
+# de inatividade (marca o instante da ação que acabou de ser feita).
+_JS_ESTADO_PAINEL = """
+const seletores = arguments[0];
+if (!window.__esperasObservador) {
+    window.__esperasUltimaMutacao = performance.now();
+    window.__esperasObservador = new MutationObserver(() => {
+        window.__esperasUltimaMutacao = performance.now();
+    });
+    window.__esperasObservador.observe(document.documentElement, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+}
+if (arguments[1]) {
+    window.__esperasUltimaMutacao = performance.now();
+}
+function visivel(el) {
+    if (!el.getClientRects().length) return false;
+    const estilo = getComputedStyle(el);
+    return estilo.visibility !== 'hidden' && estilo.display !== 'none' && estilo.opacity !== '0';
+}
+let carregando = false;
+for (const seletor of seletores) {
+    for (const el of document.querySelectorAll(seletor)) {
+        if (visivel(el)) { carregando = true; break; }
+    }
+    if (carregando) break;
+}
+return {carregando: carregando, ociosoMs: performance.now() - window.__esperasUltimaMutacao};
+"""
+
+# etapa -> {'esperas', 'segundos', 'maximo', 'esgotadas'}
+_RELATORIO_ESPERAS = {}
+# Vários navegadores em paralelo (trabalhadores.py) registram no mesmo relatório
+_TRAVA_RELATORIO = threading.Lock()
+_INICIO_RELATORIO = {'instante': time.perf_counter()}
+
+
+# ===================================================================
+# RELATÓRIO DE ESPERA X TRABALHO
+# ===================================================================
+def iniciar_relatorio_esperas():
+    """Zera o relatório e marca o início da extração."""
+    _RELATORIO_ESPERAS.clear()
+    _INICIO_RELATORIO['instante'] = time.perf_counter()
+
+
+def registrar_espera(etapa, segundos, sucesso=True):
+    """Acumula o tempo de uma espera na etapa (sucesso=False: o tempo limite esgotou)."""
+    with _TRAVA_RELATORIO:
+        dados = _RELATORIO_ESPERAS.setdefault(etapa, {'esperas': 0, 'segundos': 0.0, 'maximo': 0.0, 'esgotadas': 0})
+        dados['esperas'] += 1
+        dados['segundos'] += segundos
+        dados['maximo'] = max(dados['maximo'], segundos)
+        if not sucesso:
+            dados['esgotadas'] += 1
+
+
+def exibir_relatorio_esperas():
+    """
+    Mostra (e registra no log) o tempo de espera por etapa e a proporção espera x trabalho.
+    Com navegadores em paralelo, o tempo de espera é a soma dos navegadores e pode passar do tempo total.
+    """
+    tempo_total = time.perf_counter() - _INICIO_RELATORIO['instante']
+    tempo_espera = sum(dados['segundos'] for dados in _RELATORIO_ESPERAS.values())
+
+    log_print("--- TEMPO DE ESPERA POR ETAPA ---")
+    log_print(f"{'etapa':<18} | {'esperas':>7} | {'total (s)':>9} | {'máx (s)':>7} | {'esgotadas':>9}")
+    for etapa, dados in sorted(_RELATORIO_ESPERAS.items(), key=lambda item: -item[1]['segundos']):
+        log_print(f"{etapa:<18} | {dados['esperas']:>7} | {dados['segundos']:>9.1f} | "
+                  f"{dados['maximo']:>7.1f} | {dados['esgotadas']:>9}")
+    if tempo_total > 0:
+        log_print(f"Tempo total: {tempo_total:.1f}s | esperando: {tempo_espera:.1f}s "
+                  f"({tempo_espera / tempo_total:.0%}) | trabalhando: {tempo_total - tempo_espera:.1f}s")
+
+
+# ===================================================================
+# CONDIÇÕES DE PRONTIDÃO
+# ===================================================================
+def _esperar(driver, etapa, condicao, timeout=None, avisar=True):
+    """
+    Espera a condição (função do driver que retorna o resultado ou False) com o tempo
+    limite da etapa e registra o tempo gasto. Retorna o resultado, ou None se esgotou.
+    """
+    timeout = timeout or TIMEOUTS_ESPERA.get(etapa, TIMEOUT_PADRAO)
+    inicio = time.perf_counter()
+    try:
+        resultado = WebDriverWait(
+            driver, timeout, poll_frequency=INTERVALO_VERIFICACAO, ignored_exceptions=(WebDriverException,)
+        ).until(condicao)
+        registrar_espera(etapa, time.perf_counter() - inicio)
+        return resultado
+    except TimeoutException:
+        registrar_espera(etapa, time.perf_counter() - inicio, sucesso=False)
+        if not avisar:
+            return None
+        print(f"[AVISO] Etapa '{etapa}': painel não ficou pronto em {timeout}s. Prosseguindo.")
+        log_print(f"[AVISO] Etapa '{etapa}': painel não ficou pronto em {timeout}s. Prosseguindo.")
+        return None
+
+
+def _marcar_acao(driver, seletores):
+    """Instala o observador (se preciso) e zera a contagem de inatividade do DOM."""
+    try:
+        driver.execute_script(_JS_ESTADO_PAINEL, seletores, True)
+    except WebDriverException:
+        # Página ainda trocando de documento: o observador é instalado na primeira verificação
+        pass
+
+
+def esperar_painel_pronto(driver, etapa, timeout=None, quietude=QUIETUDE_PADRAO):
+    """
+    Espera, depois de uma ação (abrir a página, aplicar filtro, voltar ao relatório...),
+    o Power BI terminar de carregar: nenhum indicador de carregamento visível e o DOM
+    parado por `quietude` segundos. A contagem de inatividade começa no momento da chamada.
+
+    Returns:
+        bool: True se o painel ficou pronto, False se o tempo limite da etapa esgotou.
+    """
+    _marcar_acao(driver, list(SELETORES_CARREGANDO))
+
+    def _pronto(d):
+        estado = d.execute_script(_JS_ESTADO_PAINEL, list(SELETORES_CARREGANDO), False)
+        return not estado['carregando'] and estado['ociosoMs'] >= quietude * 1000
+
+    return _esperar(driver, etapa, _pronto, timeout) is not None
+
+
+def esperar_dom_estavel(driver, etapa, timeout=None, quietude=QUIETUDE_ROLAGEM):
+    """Espera só a inatividade do DOM (ex.: novas linhas de uma tabela após a rolagem)."""
+    _marcar_acao(driver, [])
+    condicao = lambda d: d.execute_script(_JS_ESTADO_PAINEL, [], False)['ociosoMs'] >= quietude * 1000
+    return _esperar(driver, etapa, condicao, timeout) is not None
+
+
+def esperar_elemento_visivel(driver, etapa, localizar, timeout=None):
+    """
+    Espera um elemento ficar visível (ex.: o botão revelado pelo hover).
+    `localizar` é uma função do driver que retorna o elemento (ou None). Não aparecer
+    não é tratado como falha (ex.: o botão de limpar só existe se houver seleção).
+
+    Returns:
+        O WebElement visível, ou None se não apareceu no tempo limite.
+    """
+    def _visivel(d):
+        elemento = localizar(d)
+        return elemento if elemento is not None and elemento.is_displayed() else False
+
+    return _esperar(driver, etapa, _visivel, timeout, avisar=False)
+
+
+def esperar_abertura_painel(driver, timeout=None):
+    """
+    Espera a página aberta com driver.get mostrar o relatório ou a tela de login.
+
+    Returns:
+        str: 'login', 'painel' ou None (nenhum dos dois no tempo limite).
+    """
+    def _tela(d):
+        return d.execute_script(
+            "if (document.querySelector(arguments[0])) return 'login';"
+            "if (document.querySelector(arguments[1])) return 'painel';"
+            "return false;",
+            SELETOR_TELA_LOGIN, SELETOR_RELATORIO
+        )
+
+    return _esperar(driver, 'abrir_painel', _tela, timeout)
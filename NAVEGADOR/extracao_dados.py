@@ -8,16 +8,58 @@ import csv
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
 from NAVEGADOR.selenium_utils import *
+from NAVEGADOR.esperas import esperar_abertura_painel, esperar_painel_pronto, esperar_elemento_visivel
+from NAVEGADOR.downloads import (
+    PASTA_DOWNLOADS_PRINCIPAL, iniciar_espera_download, esperar_download, encerrar_espera_download
+)
+from NAVEGADOR.captura_querydata import (
+    iniciar_captura_querydata, descartar_respostas, coletar_respostas_querydata, tabelas_por_medida,
+    formatar_como_tabela
+)
 import os
 from DADOS.sistema_log import log_print
 
+# Superintendências filtradas nos Painéis 2 e 3 (nomes do filtro 'DIRETORIA REGIONAL')
+SUPERINTENDENCIAS_PAINEIS_2_E_3 = [
+    "BAIXADA SANTISTA E VALE DO RIBEIRA",
+    "BAIXO E ALTO PARANAPANEMA",
+    "CAPIVAI, JUNDIAÍ, PARDO E GRANDE",
+    "CENTRO",
+    "LESTE",
+    "MÉDIO E BAIXO TIETÊ",
+    "NORTE",
+    "OESTE",
+    "SUL",
+    "VALE DO PARAÍBA E LITORAL NORTE"
+]
+
+CAMINHO_CSV_PAINEL_3 = r"C:\Users\lcastro.eficien\Desktop\PAINEL ACOMPANHAMENTO\DADOS\Export Painel 3\dados_extraidos.csv"
+
+# --- Painel 3: modos de extração ---
+# 'querydata': lê as respostas que o Power BI recebe ao desenhar os gráficos (DevTools),
+#              sem abrir "Mostrar como uma tabela" nem rolar. Exige o navegador com captura
+#              de rede (iniciar_sessao_existente(capturar_rede=True)).
+# 'tabela':    caminho antigo, lendo a tabela do visual célula a célula.
+MODO_PAINEL_3_QUERYDATA = 'querydata'
+MODO_PAINEL_3_TABELA = 'tabela'
+
+# Medida (nome da coluna no modelo do relatório, a mesma do cabeçalho em
+# "Mostrar como uma tabela") de cada gráfico do Painel 3
+MEDIDAS_GRAFICOS_PAINEL_3 = {
+    "Incremento de Água - Urbano": "Incremento Água Urbano",
+    "Incremento de Água - Rural + Informal": "Incremento Água Rural + Informal",
+    "Incremento de Esgoto - Urbano": "Incremento Esgoto Urbano",
+    "Incremento de Esgoto Rural + Informal": "Incremento Esgoto Rural + Informal",
+}
+
 def iniciar_exportacao_painel_1(
     driver,
     url_painel,
     xpath_container_visual,
     xpath_tres_pontos,
     xpath_exportar_botao,
-    lista_superintendencias
+    lista_superintendencias,
+    pasta_downloads=PASTA_DOWNLOADS_PRINCIPAL
 ):
     """
     Navega para a URL, passa o mouse sobre um visual para revelar o menu,
@@ -27,10 +69,10 @@ def iniciar_exportacao_painel_1(
         print(f"[INFO] Navegando para: {url_painel}")
         log_print(f"[INFO] Navegando para: {url_painel}")
         driver.get(url_painel)
-        time.sleep(15)
 
         # --- VERIFICAÇÃO PROATIVA DE LOGIN ---
-        if encontrar_elemento(driver, By.XPATH, "//input[@id='email' or @type='email']", timeout=3) or encontrar_elemento(driver, By.XPATH, "//div[text()='Insira a senha']", timeout=3):
+        # Segue assim que a página mostrar o relatório ou a tela de login
+        if esperar_abertura_painel(driver) == 'login':
             print("[ALERTA] Tela de login detectada. A sessão expirou.")
             log_print("[ALERTA] Tela de login detectada. A sessão expirou.")
             return "LOGIN_REQUIRED"
@@ -40,7 +82,7 @@ def iniciar_exportacao_painel_1(
         # ESPERAR O CARREGAMENTO DO PAINEL
         print("[INFO] Aguardando o carregamento do painel...") 
         log_print("[INFO] Aguardando o carregamento do painel...")
-        esperar_carregamento_invisivel(driver,timeout=60)
+        esperar_painel_pronto(driver, 'abrir_painel')
 
         # --- LIMPAR FILTROS ANTERIORES ---
         if not limpar_todos_os_filtros(driver):
@@ -56,7 +98,7 @@ def iniciar_exportacao_painel_1(
 
         print("[INFO] Aguardando o painel atualizar com os filtros...")
         log_print("[INFO] Aguardando o painel atualizar com os filtros...")
-        time.sleep(5)
+        esperar_painel_pronto(driver, 'aplicar_filtro')
 
         # --- HOVER PARA REVELAR O MENU ---
         print("\n--- INICIANDO PROCESSO DE EXPORTAÇÃO ---")
@@ -68,33 +110,33 @@ def iniciar_exportacao_painel_1(
 
         actions = ActionChains(driver)
         actions.move_to_element(container_visual).perform()
-        time.sleep(1)
 
         # --- CLICAR NOS MENUS DE EXPORTAÇÃO ---
+        # encontrar_e_clicar espera cada botão ficar clicável (revelado pelo hover / menu aberto)
         if not encontrar_e_clicar(driver, By.XPATH, xpath_tres_pontos, timeout=10):
             return False
-        time.sleep(1)
 
         if not encontrar_e_clicar(driver, By.XPATH, "//button[@title='Exportar dados']", timeout=10):
             return False
 
+        # A pasta passa a ser observada antes do clique, para não perder um download rápido
+        espera_download = iniciar_espera_download(pasta_downloads)
         if not encontrar_e_clicar(driver, By.XPATH, xpath_exportar_botao, timeout=10):
+            encerrar_espera_download(espera_download)
             return False
 
         print("[SUCESSO] Clique de exportação realizado.")
         log_print("[SUCESSO] Clique de exportação realizado.")
 
         # --- AGUARDAR DOWNLOAD ---
-        pasta_downloads = os.path.join(os.path.expanduser('~'), 'Downloads')
-        nome_arquivo_download = "Exportar Base de Dados (Limitado a 150 mil linhas).xlsx"
-
-        if not esperar_download_concluir(pasta_downloads, nome_arquivo_download):
+        arquivo_baixado = esperar_download(espera_download)
+        if not arquivo_baixado:
             print("[ERRO FATAL] Falha ao concluir o download do arquivo.")
             log_print("[ERRO FATAL] Falha ao concluir o download do arquivo.")
             return False
 
         # --- RENOMEAR E MOVER O ARQUIVO ---
-        if not renomear_e_mover_arquivo_exportado(None, "DADOS PAINEL 1", pasta_downloads):
+        if not renomear_e_mover_arquivo_exportado(None, "DADOS PAINEL 1", pasta_downloads, arquivo_baixado):
             print("[ERRO FATAL] Falha ao renomear ou mover o arquivo exportado.")
             log_print("[ERRO FATAL] Falha ao renomear ou mover o arquivo exportado.")
             return False
@@ -108,245 +150,380 @@ def iniciar_exportacao_painel_1(
         log_print(f"[ERRO] Ocorreu um erro inesperado no processo de exportação: {e}")
         return False
 
+def preparar_pagina_painel_2(driver, url_painel, pagina):
+    """
+    Abre o Painel 2, navega até a página e limpa os filtros.
+
+    Returns:
+        True se a página está pronta, "LOGIN_REQUIRED" se a sessão expirou, False em caso de falha.
+    """
+    driver.get(url_painel)
+
+    # --- VERIFICAÇÃO PROATIVA DE LOGIN ---
+    if esperar_abertura_painel(driver) == 'login':
+        print("[ALERTA] Tela de login detectada. A sessão expirou.")
+        log_print("[ALERTA] Tela de login detectada. A sessão expirou.")
+        return "LOGIN_REQUIRED"
+    print("[INFO] Sessão ativa. Prosseguindo com a exportação.")
+    log_print("[INFO] Sessão ativa. Prosseguindo com a exportação.")
+
+    esperar_painel_pronto(driver, 'abrir_painel')
+
+    # NAVEGAÇÃO INTERNA DO PAINEL
+    if not navegar_para_pagina_especifica(driver, pagina):
+        return False
+
+    # LIMPEZA DE FILTROS
+    if not limpar_filtro_diretoria(driver):
+        return False
+    if not limpar_filtro_municipio(driver):
+        return False
+    return True
+
+
+def exportar_superintendencia_painel_2(
+    driver,
+    xpath_container_visual,
+    xpath_tres_pontos,
+    xpath_botao_exportar_dados,
+    pagina,
+    superintendencia,
+    pasta_downloads
+):
+    """
+    Aplica o filtro da superintendência na página já aberta, exporta o visual e
+    move o arquivo baixado para a pasta do Painel 2.
+
+    Returns:
+        bool: True se o arquivo foi exportado e movido.
+    """
+    print(f"[INFO] Iniciando exportação para a Superintendência: {superintendencia}")
+    log_print(f"[INFO] Iniciando exportação para a Superintendência: {superintendencia}")
+
+    if not aplicar_filtro_diretoria_regional(driver, superintendencia):
+        print(f"[ERRO] Falha ao aplicar filtro para a Superintendência: {superintendencia}")
+        log_print(f"[ERRO] Falha ao aplicar filtro para a Superintendência: {superintendencia}")
+        return False
+
+    esperar_painel_pronto(driver, 'aplicar_filtro')  # Aguarda atualização do painel
+
+    # --- HOVER PARA REVELAR O MENU ---
+    container_visual = encontrar_elemento(driver, By.XPATH, xpath_container_visual, timeout=30)
+    if not container_visual:
+        print("[ERRO] Não foi possível encontrar o container do visual para fazer o hover.")
+        log_print("[ERRO] Não foi possível encontrar o container do visual para fazer o hover.")
+        return False
+
+    actions = ActionChains(driver)
+    actions.move_to_element(container_visual).perform()
+
+    # --- CLICAR NOS MENUS DE EXPORTAÇÃO ---
+    # encontrar_e_clicar espera cada botão ficar clicável (revelado pelo hover / menu aberto)
+    if not encontrar_e_clicar(driver, By.XPATH, xpath_tres_pontos, timeout=10):
+        print("[ERRO] Não foi possível clicar nos três pontos.")
+        log_print("[ERRO] Não foi possível clicar nos três pontos.")
+        return False
+
+    if not encontrar_e_clicar(driver, By.XPATH, "//button[@title='Exportar dados']", timeout=10):
+        print("[ERRO] Não foi possível clicar no botão de exportação de dados.")
+        log_print("[ERRO] Não foi possível clicar no botão de exportação de dados.")
+        return False
+
+    # A pasta passa a ser observada antes do clique; só conta o arquivo que aparecer depois dele
+    espera_download = iniciar_espera_download(pasta_downloads)
+    if not encontrar_e_clicar(driver, By.XPATH, xpath_botao_exportar_dados, timeout=10):
+        encerrar_espera_download(espera_download)
+        print("[ERRO] Não foi possível clicar no botão de exportação.")
+        log_print("[ERRO] Não foi possível clicar no botão de exportação.")
+        return False
+
+    # --- AGUARDAR DOWNLOAD ---
+    arquivo_baixado = esperar_download(espera_download)
+    if not arquivo_baixado:
+        print("[ERRO FATAL] Falha ao concluir o download do arquivo.")
+        log_print("[ERRO FATAL] Falha ao concluir o download do arquivo.")
+        return False
+
+    # --- RENOMEAR E MOVER O ARQUIVO ---
+    if not renomear_e_mover_arquivo_exportado(pagina, superintendencia, pasta_downloads, arquivo_baixado):
+        print("[ERRO FATAL] Falha ao renomear ou mover o arquivo exportado.")
+        log_print("[ERRO FATAL] Falha ao renomear ou mover o arquivo exportado.")
+        return False
+    return True
+
+
 def iniciar_exportacao_painel_2(
     driver,
     url_painel,
     xpath_container_visual,
     xpath_tres_pontos,
     xpath_botao_exportar_dados,
-    pagina
+    pagina,
+    pasta_downloads=PASTA_DOWNLOADS_PRINCIPAL
 ):
     """
     Exporta dados do Painel 2 para cada superintendência, aplicando filtros e baixando os arquivos.
+
+    Returns:
+        True se todas as superintendências foram exportadas, "LOGIN_REQUIRED" ou False.
     """
     try:
-        driver.get(url_painel)
-        time.sleep(5)
+        preparada = preparar_pagina_painel_2(driver, url_painel, pagina)
+        if preparada is not True:
+            return preparada
 
-        # --- VERIFICAÇÃO PROATIVA DE LOGIN ---
-        if encontrar_elemento(driver, By.XPATH, "//input[@id='email' or @type='email']", timeout=3):
-            print("[ALERTA] Tela de login detectada. A sessão expirou.")
-            log_print("[ALERTA] Tela de login detectada. A sessão expirou.")
-            return "LOGIN_REQUIRED"
-        print("[INFO] Sessão ativa. Prosseguindo com a exportação.")
-        log_print("[INFO] Sessão ativa. Prosseguindo com a exportação.")
+        # Para cada superintendência, aplica o filtro e exporta
+        sucesso = True
+        for superintendencia in SUPERINTENDENCIAS_PAINEIS_2_E_3:
+            if not exportar_superintendencia_painel_2(
+                driver, xpath_container_visual, xpath_tres_pontos, xpath_botao_exportar_dados,
+                pagina, superintendencia, pasta_downloads
+            ):
+                sucesso = False
+        return sucesso
 
-        esperar_carregamento_invisivel(driver,timeout=60)
+    except Exception as e:
+        print(f"[ERRO] Ocorreu um erro ao acessar o Painel 2: {e}")
+        log_print(f"[ERRO] Ocorreu um erro ao acessar o Painel 2: {e}")
+        return False
 
-        # NAVEGAÇÃO INTERNA DO PAINEL
-        if not navegar_para_pagina_especifica(driver, pagina):
-            return False
 
-        # LIMPEZA DE FILTROS
-        if not limpar_filtro_diretoria(driver):
-            return False
-        if not limpar_filtro_municipio(driver):
-            return False
+def _extrair_graficos_querydata(captura, superintendencia, nomes_dos_graficos):
+    """
+    Monta as linhas dos gráficos a partir das respostas querydata recebidas
+    depois de aplicar o filtro da superintendência.
 
-        lista_superintendencias = [
-            "BAIXADA SANTISTA E VALE DO RIBEIRA",
-            "BAIXO E ALTO PARANAPANEMA",
-            "CAPIVAI, JUNDIAÍ, PARDO E GRANDE",
-            "CENTRO",
-            "LESTE",
-            "MÉDIO E BAIXO TIETÊ",
-            "NORTE",
-            "OESTE",
-            "SUL",
-            "VALE DO PARAÍBA E LITORAL NORTE"
-        ]
+    Returns:
+        tuple: (cabecalho ou None se nenhum gráfico veio, linhas do CSV,
+                nomes dos gráficos cuja resposta não foi capturada).
+    """
+    tabelas = tabelas_por_medida(coletar_respostas_querydata(captura), MEDIDAS_GRAFICOS_PAINEL_3.values())
+
+    cabecalho = None
+    linhas = []
+    faltando = []
+    for nome_grafico in nomes_dos_graficos:
+        tabela = tabelas.get(MEDIDAS_GRAFICOS_PAINEL_3[nome_grafico])
+        if tabela is None:
+            print(f"      [AVISO] Resposta do gráfico '{nome_grafico}' não capturada para esta superintendência.")
+            log_print(f"      [AVISO] Resposta do gráfico '{nome_grafico}' não capturada para esta superintendência.")
+            faltando.append(nome_grafico)
+            continue
+        if not tabela['completo']:
+            print(f"      [AVISO] O Power BI devolveu só parte dos dados do gráfico '{nome_grafico}'.")
+            log_print(f"      [AVISO] O Power BI devolveu só parte dos dados do gráfico '{nome_grafico}'.")
+
+        if cabecalho is None:
+            cabecalho = ['Superintendencia', 'Gráfico'] + tabela['colunas']
+        linhas.extend(
+            [superintendencia, nome_grafico] + [formatar_como_tabela(valor) for valor in linha]
+            for linha in tabela['linhas']
+        )
+
+        print(f"     [INFO] {nome_grafico}: {len(tabela['linhas'])} linhas de dados extraídas.")
+        log_print(f"     [INFO] {nome_grafico}: {len(tabela['linhas'])} linhas de dados extraídas.")
+    return cabecalho, linhas, faltando
+
+
+def _extrair_graficos_como_tabela(driver, xpath_mostrar_como_tabela, superintendencia, nomes_dos_graficos):
+    """
+    Abre cada gráfico em "Mostrar como uma tabela", lê as linhas com rolagem e volta ao relatório.
 
-        # Para cada superintendência, aplica o filtro e exporta
-        for superintendencia in lista_superintendencias:
-            print(f"[INFO] Iniciando exportação para a Superintendência: {superintendencia}")
-            log_print(f"[INFO] Iniciando exportação para a Superintendência: {superintendencia}")
+    Returns:
+        tuple: (cabecalho ou None se nenhum gráfico foi lido, linhas do CSV).
+    """
+    wait = WebDriverWait(driver, 20) # Espera no máximo 20 segundos
+    cabecalho = None
+    linhas = []
+    for nome_grafico in nomes_dos_graficos:
+        print(f"  [INFO] Processando gráfico: {nome_grafico}")
+        log_print(f"  [INFO] Processando gráfico: {nome_grafico}")
+        try:
+            # --- ETAPA 3: ESPERA INTELIGENTE PELO GRÁFICO ---
+            xpath_container = gerar_xpath_container_grafico(nome_grafico)
+            
+            # O Selenium vai esperar ATÉ 30 segundos o elemento aparecer
+            container_grafico = wait.until(EC.presence_of_element_located((By.XPATH, xpath_container)))
+            
+            # --- ETAPA 4: INTERAÇÃO RELATIVA (HOVER E CLIQUE) ---
+            area_hover = container_grafico.find_element(By.XPATH, ".//visual-modern")
+            ActionChains(driver).move_to_element(area_hover).perform()
+
+            # O botão de opções só aparece depois do hover
+            botao_opcoes = esperar_elemento_visivel(
+                driver, 'revelar_botao',
+                lambda d: container_grafico.find_element(By.XPATH, ".//button[@data-testid='visual-more-options-btn']")
+            )
+            if botao_opcoes is None:
+                print("      [ERRO] Botão de opções do gráfico não apareceu após o hover.")
+                log_print("      [ERRO] Botão de opções do gráfico não apareceu após o hover.")
+                continue
+            botao_opcoes.click()
 
-            if not aplicar_filtro_diretoria_regional(driver, superintendencia):
-                print(f"[ERRO] Falha ao aplicar filtro para a Superintendência: {superintendencia}")
-                log_print(f"[ERRO] Falha ao aplicar filtro para a Superintendência: {superintendencia}")
+            if not encontrar_e_clicar(driver, By.XPATH, xpath_mostrar_como_tabela, timeout=10):
+                print("      [ERRO] Não foi possível clicar em 'Mostrar como uma tabela'.")
+                log_print("      [ERRO] Não foi possível clicar em 'Mostrar como uma tabela'.")
                 continue
+            print("     [SUCESSO] Mudou para visualização de tabela.")
+            log_print("     [SUCESSO] Mudou para visualização de tabela.")
+            
+            # Espera inteligente pela tabela
+            tabela = wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'pivotTable')]")))
+
+            # --- ETAPA 5: EXTRAÇÃO DE DADOS ---
+            # Tabela inteira numa chamada só; se falhar, volta à leitura célula a célula com rolagem
+            tabela_js = extrair_tabela_js(driver, tabela)
+            if tabela_js:
+                cabecalho_texto, todas_as_linhas = tabela_js
+            else:
+                celulas_cabecalho = tabela.find_elements(By.XPATH, ".//div[@role='row' and @aria-rowindex='1']//div[@role='columnheader']")
+                cabecalho_texto = [c.text.strip() for c in celulas_cabecalho]
+                todas_as_linhas = extrair_dados_tabela_com_scroll(driver, tabela)
+
+            if cabecalho is None:
+                cabecalho = ['Superintendencia', 'Gráfico'] + cabecalho_texto
+            linhas.extend([superintendencia, nome_grafico] + valores_linha for valores_linha in todas_as_linhas)
+
+            print(f"     [INFO] {len(todas_as_linhas)} linhas de dados extraídas.")
+            log_print(f"     [INFO] {len(todas_as_linhas)} linhas de dados extraídas.")
+
+            botao_voltar = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[@data-testid='back-to-report-button']")))
+            botao_voltar.click()
+            print("     [INFO] Voltou ao relatório.")
+            log_print("     [INFO] Voltou ao relatório.")
+            esperar_painel_pronto(driver, 'voltar_relatorio')  # Espera a tela principal recarregar
+
+        except TimeoutException:
+            print(f"      [AVISO] Gráfico '{nome_grafico}' não encontrado para esta superintendência. Pulando.")
+            log_print(f"      [AVISO] Gráfico '{nome_grafico}' não encontrado para esta superintendência. Pulando.")
+        except Exception as e:
+            print(f"      [ERRO] Falha crítica ao interagir com o gráfico '{nome_grafico}': {e}")
+            log_print(f"      [ERRO] Falha crítica ao interagir com o gráfico '{nome_grafico}': {e}")
+            # Tenta voltar para não travar o processo
+            try:
+                driver.find_element(By.XPATH, "//button[@data-testid='back-to-report-button']").click()
+            except:
+                pass
+    return cabecalho, linhas
+
+
+def preparar_pagina_painel_3(driver, url_painel, pagina_3):
+    """
+    Abre o Painel 3 e navega até a página dos gráficos.
 
-            time.sleep(5)  # Aguarda atualização do painel
-
-            # --- HOVER PARA REVELAR O MENU ---
-            container_visual = encontrar_elemento(driver, By.XPATH, xpath_container_visual, timeout=30)
-            if not container_visual:
-                print("[ERRO] Não foi possível encontrar o container do visual para fazer o hover.")
-                log_print("[ERRO] Não foi possível encontrar o container do visual para fazer o hover.")
-                return False
-
-            actions = ActionChains(driver)
-            actions.move_to_element(container_visual).perform()
-            time.sleep(1)
-
-            # --- CLICAR NOS MENUS DE EXPORTAÇÃO ---
-            if not encontrar_e_clicar(driver, By.XPATH, xpath_tres_pontos, timeout=10):
-                print("[ERRO] Não foi possível clicar nos três pontos.")
-                log_print("[ERRO] Não foi possível clicar nos três pontos.")
-                return False
-            time.sleep(1)
-
-            if not encontrar_e_clicar(driver, By.XPATH, "//button[@title='Exportar dados']", timeout=10):
-                print("[ERRO] Não foi possível clicar no botão de exportação de dados.")
-                log_print("[ERRO] Não foi possível clicar no botão de exportação de dados.")
-                return False
-            time.sleep(1)
-
-            if not encontrar_e_clicar(driver, By.XPATH, xpath_botao_exportar_dados, timeout=10):
-                print("[ERRO] Não foi possível clicar no botão de exportação.")
-                log_print("[ERRO] Não foi possível clicar no botão de exportação.")
-                return False
-            time.sleep(1)
-
-            # --- AGUARDAR DOWNLOAD ---
-            pasta_downloads = os.path.join(os.path.expanduser('~'), 'Downloads')
-            nome_arquivo_download = "data.xlsx"
-
-            if not esperar_download_concluir(pasta_downloads, nome_arquivo_download):
-                print("[ERRO FATAL] Falha ao concluir o download do arquivo.")
-                log_print("[ERRO FATAL] Falha ao concluir o download do arquivo.")
-                return False
-
-            # --- RENOMEAR E MOVER O ARQUIVO ---
-            if not renomear_e_mover_arquivo_exportado(pagina, superintendencia, pasta_downloads):
-                print("[ERRO FATAL] Falha ao renomear ou mover o arquivo exportado.")
-                log_print("[ERRO FATAL] Falha ao renomear ou mover o arquivo exportado.")
-                return False
+    Returns:
+        True se a página está pronta, "LOGIN_REQUIRED" se a sessão expirou, False em caso de falha.
+    """
+    driver.get(url_painel)
+    
+    # --- ETAPA 1: TRATAMENTO INTELIGENTE DE IFRAME ---
+    #print("[INFO] Verificando a presença de um iframe...")
+    # try:
+    #     iframe = wait.until(EC.presence_of_element_located((By.TAG_NAME, 'iframe')))
+    #     driver.switch_to.frame(iframe)
+    #     print("[INFO] Foco alterado para o iframe do painel.")
+    # except TimeoutException:
+    #     print("[INFO] Nenhum iframe encontrado. Continuando na página principal.")
+
+    # --- ETAPA 2: VERIFICAÇÃO DE SESSÃO E NAVEGAÇÃO ---
+    if esperar_abertura_painel(driver) == 'login':
+        return "LOGIN_REQUIRED"
+    print("[INFO] Sessão ativa.")
+    log_print("[INFO] Sessão ativa.")
+    esperar_painel_pronto(driver, 'abrir_painel')
+
+    return navegar_para_pagina_especifica(driver, pagina_3)
+
+
+def extrair_superintendencia_painel_3(driver, captura, xpath_mostrar_como_tabela, superintendencia):
+    """
+    Filtra a superintendência na página já aberta e lê os gráficos.
 
-        return True
+    Args:
+        captura: Estado de iniciar_captura_querydata (modo 'querydata') ou None (modo 'tabela').
 
-    except Exception as e:
-        print(f"[ERRO] Ocorreu um erro ao acessar o Painel 2: {e}")
-        log_print(f"[ERRO] Ocorreu um erro ao acessar o Painel 2: {e}")
-        return False
+    Returns:
+        tuple: (cabecalho, linhas), ou None se não foi possível filtrar a superintendência.
+    """
+    print(f"\n[INFO] Iniciando para a Superintendência: {superintendencia}")
+
+    if not limpar_filtro_diretoria(driver) or not limpar_filtro_municipio(driver):
+        return None
+    if captura:
+        # Só interessam as respostas desenhadas com o filtro desta superintendência
+        descartar_respostas(captura)
+    if not aplicar_filtro_diretoria_regional(driver, superintendencia):
+        return None
+
+    # Espera os filtros serem aplicados antes de prosseguir
+    esperar_painel_pronto(driver, 'aplicar_filtro')
+
+    nomes_dos_graficos = list(MEDIDAS_GRAFICOS_PAINEL_3)
+    if not captura:
+        return _extrair_graficos_como_tabela(driver, xpath_mostrar_como_tabela, superintendencia, nomes_dos_graficos)
+
+    cabecalho, linhas, faltando = _extrair_graficos_querydata(captura, superintendencia, nomes_dos_graficos)
+    if faltando:
+        # Gráfico sem resposta querydata reconhecida: lê pelo caminho antigo em vez de deixá-lo fora do CSV
+        print(f"      [INFO] Lendo {len(faltando)} gráfico(s) por 'Mostrar como uma tabela': {', '.join(faltando)}")
+        log_print(f"      [INFO] Lendo {len(faltando)} gráfico(s) por 'Mostrar como uma tabela': {', '.join(faltando)}")
+        cabecalho_tabela, linhas_tabela = _extrair_graficos_como_tabela(
+            driver, xpath_mostrar_como_tabela, superintendencia, faltando
+        )
+        cabecalho = cabecalho or cabecalho_tabela
+        linhas.extend(linhas_tabela)
+    return cabecalho, linhas
+
+
+def salvar_csv_painel_3(resultados, caminho_arquivo=CAMINHO_CSV_PAINEL_3):
+    """
+    Grava o CSV do Painel 3 com os resultados das superintendências, na ordem recebida.
 
+    Args:
+        resultados (list): (cabecalho, linhas) de cada superintendência; None para as que falharam.
+    """
+    cabecalho = next((resultado[0] for resultado in resultados if resultado and resultado[0]), None)
+    with open(caminho_arquivo, mode="w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=';')
+        if cabecalho:
+            writer.writerow(cabecalho)
+        total_linhas = 0
+        for resultado in resultados:
+            if resultado:
+                writer.writerows(resultado[1])
+                total_linhas += len(resultado[1])
+    print(f"[SUCESSO] {total_linhas} linhas do Painel 3 salvas em '{caminho_arquivo}'.")
+    log_print(f"[SUCESSO] {total_linhas} linhas do Painel 3 salvas em '{caminho_arquivo}'.")
+
+
+def iniciar_exportacao_painel_3(driver, url_painel, xpath_mostrar_como_tabela, pagina_3, modo=MODO_PAINEL_3_TABELA):
+    """
+    Extrai os gráficos do Painel 3 para cada superintendência e salva em dados_extraidos.csv.
 
-def iniciar_exportacao_painel_3(driver, url_painel, xpath_mostrar_como_tabela, pagina_3):
+    Args:
+        modo (str): MODO_PAINEL_3_QUERYDATA (respostas capturadas pelo DevTools) ou
+                    MODO_PAINEL_3_TABELA ("Mostrar como uma tabela" + rolagem).
+    """
     try:
-        driver.get(url_painel)
-        
-        # --- ETAPA 1: TRATAMENTO INTELIGENTE DE IFRAME ---
-        #print("[INFO] Verificando a presença de um iframe...")
-        
-        wait = WebDriverWait(driver, 20) # Espera no máximo 20 segundos
-        # try:
-        #     iframe = wait.until(EC.presence_of_element_located((By.TAG_NAME, 'iframe')))
-        #     driver.switch_to.frame(iframe)
-        #     print("[INFO] Foco alterado para o iframe do painel.")
-        # except TimeoutException:
-        #     print("[INFO] Nenhum iframe encontrado. Continuando na página principal.")
-
-        # --- ETAPA 2: VERIFICAÇÃO DE SESSÃO E NAVEGAÇÃO ---
-        if encontrar_elemento(driver, By.XPATH, "//input[@id='email' or @type='email']", timeout=3):
-            return "LOGIN_REQUIRED"
-        print("[INFO] Sessão ativa.")
-        log_print("[INFO] Sessão ativa.")
-        esperar_carregamento_invisivel(driver,timeout=60)
+        captura = iniciar_captura_querydata(driver) if modo == MODO_PAINEL_3_QUERYDATA else None
 
-        if not navegar_para_pagina_especifica(driver, pagina_3):
-            return False
-            
-        lista_superintendencias = [
-            "BAIXADA SANTISTA E VALE DO RIBEIRA", "BAIXO E ALTO PARANAPANEMA", "CAPIVAI, JUNDIAÍ, PARDO E GRANDE",
-            "CENTRO", "LESTE", "MÉDIO E BAIXO TIETÊ", "NORTE", "OESTE", "SUL", "VALE DO PARAÍBA E LITORAL NORTE"
-        ]
-        
-        nomes_dos_graficos = [
-            "Incremento de Água - Urbano", "Incremento de Água - Rural + Informal",
-            "Incremento de Esgoto - Urbano", "Incremento de Esgoto Rural + Informal"
+        preparada = preparar_pagina_painel_3(driver, url_painel, pagina_3)
+        if preparada is not True:
+            return preparada
+
+        resultados = [
+            extrair_superintendencia_painel_3(driver, captura, xpath_mostrar_como_tabela, superintendencia)
+            for superintendencia in SUPERINTENDENCIAS_PAINEIS_2_E_3
         ]
-        
-        
-        caminho_arquivo = r"C:\Users\lcastro.eficien\Desktop\PAINEL ACOMPANHAMENTO\DADOS\Export Painel 3\dados_extraidos.csv"
+        salvar_csv_painel_3(resultados)
 
-        with open(caminho_arquivo, mode="w", newline="", encoding="utf-8-sig") as f:
-            writer = csv.writer(f, delimiter=';')
-            cabecalho_escrito = False
-            
-            for superintendencia in lista_superintendencias:
-                print(f"\n[INFO] Iniciando para a Superintendência: {superintendencia}")
-                
-                if not limpar_filtro_diretoria(driver) or not limpar_filtro_municipio(driver):
-                    continue
-                if not aplicar_filtro_diretoria_regional(driver, superintendencia):
-                    continue
-                
-                # Pausa para garantir que os filtros sejam aplicados antes de prosseguir
-                time.sleep(5) 
-
-                for nome_grafico in nomes_dos_graficos:
-                    print(f"  [INFO] Processando gráfico: {nome_grafico}")
-                    log_print(f"  [INFO] Processando gráfico: {nome_grafico}")
-                    try:
-                        # --- ETAPA 3: ESPERA INTELIGENTE PELO GRÁFICO ---
-                        xpath_container = gerar_xpath_container_grafico(nome_grafico)
-                        
-                        # O Selenium vai esperar ATÉ 30 segundos o elemento aparecer
-                        container_grafico = wait.until(EC.presence_of_element_located((By.XPATH, xpath_container)))
-                        
-                        # --- ETAPA 4: INTERAÇÃO RELATIVA (HOVER E CLIQUE) ---
-                        area_hover = container_grafico.find_element(By.XPATH, ".//visual-modern")
-                        ActionChains(driver).move_to_element(area_hover).perform()
-                        time.sleep(1)
-
-                        botao_opcoes = container_grafico.find_element(By.XPATH, ".//button[@data-testid='visual-more-options-btn']")
-                        botao_opcoes.click()
-                        time.sleep(1)
-
-                        if not encontrar_e_clicar(driver, By.XPATH, xpath_mostrar_como_tabela, timeout=10):
-                            print("      [ERRO] Não foi possível clicar em 'Mostrar como uma tabela'.")
-                            log_print("      [ERRO] Não foi possível clicar em 'Mostrar como uma tabela'.")
-                            continue
-                        print("     [SUCESSO] Mudou para visualização de tabela.")
-                        log_print("     [SUCESSO] Mudou para visualização de tabela.")
-                        
-                        # Espera inteligente pela tabela
-                        tabela = wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'pivotTable')]")))
-
-                        # --- ETAPA 5: EXTRAÇÃO DE DADOS ---
-                        cabecalho = tabela.find_elements(By.XPATH, ".//div[@role='row' and @aria-rowindex='1']//div[@role='columnheader']")
-                        cabecalho_texto = [c.text.strip() for c in cabecalho]
-
-                        if not cabecalho_escrito:
-                            writer.writerow(['Superintendencia', 'Gráfico'] + cabecalho_texto)
-                            cabecalho_escrito = True
-
-                        # --- Bloco novo com a função de rolagem ---
-                        # Chama a nova função para extrair todas as linhas, lidando com a rolagem
-                        todas_as_linhas = extrair_dados_tabela_com_scroll(driver, tabela)
-
-                        # Itera sobre os dados retornados e escreve no CSV
-                        for valores_linha in todas_as_linhas:
-                            writer.writerow([superintendencia, nome_grafico] + valores_linha)
-
-                        print(f"     [INFO] {len(todas_as_linhas)} linhas de dados extraídas e salvas.")
-                        log_print(f"     [INFO] {len(todas_as_linhas)} linhas de dados extraídas e salvas.")
-
-                        botao_voltar = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[@data-testid='back-to-report-button']")))
-                        botao_voltar.click()
-                        print("     [INFO] Voltou ao relatório.")
-                        log_print("     [INFO] Voltou ao relatório.")
-                        time.sleep(2) # Espera a tela principal recarregar
-
-                    except TimeoutException:
-                        print(f"      [AVISO] Gráfico '{nome_grafico}' não encontrado para esta superintendência. Pulando.")
-                        log_print(f"      [AVISO] Gráfico '{nome_grafico}' não encontrado para esta superintendência. Pulando.")
-                    except Exception as e:
-                        print(f"      [ERRO] Falha crítica ao interagir com o gráfico '{nome_grafico}': {e}")
-                        log_print(f"      [ERRO] Falha crítica ao interagir com o gráfico '{nome_grafico}': {e}")
-                        # Tenta voltar para não travar o processo
-                        try:
-                            driver.find_element(By.XPATH, "//button[@data-testid='back-to-report-button']").click()
-                        except:
-                            pass
-                            
-            # Ao final de tudo, retorna o driver ao conteúdo principal da página
-            driver.switch_to.default_content()
-            return True
+        # Ao final de tudo, retorna o driver ao conteúdo principal da página
+        driver.switch_to.default_content()
+        return True
 
     except Exception as e:
         print(f"[ERRO] Ocorreu um erro geral e fatal ao acessar o Painel 3: {e}")
         log_print(f"[ERRO] Ocorreu um erro geral e fatal ao acessar o Painel 3: {e}")
          # Garante que o foco seja resetado em caso de erro
         driver.switch_to.default_content() # Garante que o foco seja resetado em caso de erro
-        return False
\ No newline at end of file
+        return False
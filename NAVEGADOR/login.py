@@ -4,16 +4,33 @@ import time
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from DADOS.sistema_log import log_print
+from NAVEGADOR.captura_querydata import habilitar_captura_rede
+from NAVEGADOR.downloads import PASTA_DOWNLOADS_PRINCIPAL, configurar_pasta_downloads
 
 DIRETORIO_PERFIL_CHROME = r"C:\Users\lcastro.eficien\Desktop\PAINEL ACOMPANHAMENTO\NAVEGADOR\chrome_session_profile"
 
-def configurar_perfil():
-    """Configura as opções do Chrome para usar o perfil de sessão."""
+def configurar_perfil(capturar_rede=False, diretorio_perfil=DIRETORIO_PERFIL_CHROME, pasta_downloads=None, headless=False):
+    """
+    Configura as opções do Chrome para usar o perfil de sessão.
+    Com capturar_rede=True, liga a captura das respostas de rede pelo DevTools (Painel 3 em modo 'querydata').
+    diretorio_perfil, pasta_downloads e headless são usados pelos navegadores em paralelo (trabalhadores.py).
+    """
     chrome_options = Options()
-    chrome_options.add_argument(f"user-data-dir={os.path.abspath(DIRETORIO_PERFIL_CHROME)}")
+    chrome_options.add_argument(f"user-data-dir={os.path.abspath(diretorio_perfil)}")
     chrome_options.add_argument("--disable-session-crashed-bubble")
     chrome_options.add_argument("--disable-infobars")
     #chrome_options.add_argument("--")
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1920,1080")
+    if pasta_downloads:
+        chrome_options.add_experimental_option("prefs", {
+            "download.default_directory": os.path.abspath(pasta_downloads),
+            "download.prompt_for_download": False,
+            "download.directory_upgrade": True,
+        })
+    if capturar_rede:
+        habilitar_captura_rede(chrome_options)
     return chrome_options
 
 def deletar_perfil_sessao():
@@ -39,8 +56,8 @@ def deletar_perfil_sessao():
         print("[INFO] Nenhum perfil de sessão para apagar.")
         return True
 
-def iniciar_sessao_existente():
-    """Inicia o navegador usando um perfil de sessão existente."""
+def iniciar_sessao_existente(capturar_rede=False, pasta_downloads=PASTA_DOWNLOADS_PRINCIPAL):
+    """Inicia o navegador usando um perfil de sessão existente, com os downloads numa pasta exclusiva."""
     if not os.path.exists(DIRETORIO_PERFIL_CHROME):
         print(f"\n[ERRO] Perfil de sessão '{DIRETORIO_PERFIL_CHROME}' não encontrado.")
         log_print(f"\n[ERRO] Perfil de sessão '{DIRETORIO_PERFIL_CHROME}' não encontrado.")
@@ -49,10 +66,19 @@ def iniciar_sessao_existente():
     print("[INFO] A usar perfil de sessão existente para iniciar o navegador...")
     log_print("[INFO] A usar perfil de sessão existente para iniciar o navegador...")
     
-    driver = webdriver.Chrome(options=configurar_perfil())
+    driver = webdriver.Chrome(options=configurar_perfil(capturar_rede, pasta_downloads=pasta_downloads))
+    configurar_pasta_downloads(driver, pasta_downloads)
     driver.maximize_window()
     return driver
 
+def iniciar_sessao_trabalhador(diretorio_perfil, pasta_downloads, capturar_rede=False):
+    """Inicia um navegador headless com uma cópia do perfil de sessão e pasta de downloads própria."""
+    driver = webdriver.Chrome(options=configurar_perfil(
+        capturar_rede, diretorio_perfil=diretorio_perfil, pasta_downloads=pasta_downloads, headless=True
+    ))
+    configurar_pasta_downloads(driver, pasta_downloads)
+    return driver
+
 def criar_nova_sessao_manual(url_inicial):
     """
     Abre o navegador para que o utilizador crie uma nova sessão.
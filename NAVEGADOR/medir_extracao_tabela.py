@@ -0,0 +1,82 @@
+# ===================================================================
+# ARQUIVO: medir_extracao_tabela.py
+# Compara a extração da tabela do Power BI célula a célula com rolagem
+# (extrair_dados_tabela_com_scroll) e a extração numa única chamada JavaScript
+# (extrair_tabela_js), sobre a tabela salva em fixtures_tabela/pivot_table.html,
+# que reproduz a rolagem virtual do relatório. Mostra o tempo, o número de
+# chamadas ao WebDriver e se cada uma trouxe todas as linhas.
+# Usa o Chrome em modo headless, sem o perfil de sessão (não acessa o Power BI).
+# Execute a partir da raiz do projeto: python -m NAVEGADOR.medir_extracao_tabela
+# ===================================================================
+import contextlib
+import io
+import time
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+
+from NAVEGADOR.selenium_utils import extrair_tabela_js, extrair_dados_tabela_com_scroll
+
+FIXTURE_TABELA = Path(__file__).resolve().parent / "fixtures_tabela" / "pivot_table.html"
+QUANTIDADES_LINHAS = (30, 120, 500)
+
+
+def _contar_comandos(driver):
+    """Conta as chamadas HTTP ao WebDriver (todas passam por driver.execute, inclusive as dos elementos)."""
+    contagem = {'comandos': 0}
+    executar = driver.execute
+
+    def _execute(comando, params=None):
+        contagem['comandos'] += 1
+        return executar(comando, params)
+
+    driver.execute = _execute
+    return contagem
+
+
+def _medir(driver, contagem, num_linhas, extrair):
+    """Abre a fixture com num_linhas e mede uma extração. Retorna (segundos, comandos, linhas, esperadas)."""
+    driver.get(f"{FIXTURE_TABELA.as_uri()}#linhas={num_linhas}")
+    tabela = driver.find_element(By.CSS_SELECTOR, "div.pivotTable")
+    esperadas = driver.execute_script("return window.__dadosTabela;")
+
+    contagem['comandos'] = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        linhas = extrair(driver, tabela)
+        segundos = time.perf_counter() - inicio
+    return segundos, contagem['comandos'], linhas, esperadas
+
+
+def medir():
+    opcoes = Options()
+    opcoes.add_argument("--headless=new")
+    opcoes.add_argument("--window-size=1280,900")
+    driver = webdriver.Chrome(options=opcoes)
+    contagem = _contar_comandos(driver)
+
+    print(f"{'linhas':>6} | {'célula a célula (s)':>19} | {'chamadas':>8} | {'completa':>8} | "
+          f"{'JavaScript (s)':>14} | {'chamadas':>8} | {'ganho':>6}")
+    print("-" * 90)
+    try:
+        for num_linhas in QUANTIDADES_LINHAS:
+            tempo_antigo, comandos_antigo, linhas_antigo, esperadas = _medir(
+                driver, contagem, num_linhas, extrair_dados_tabela_com_scroll
+            )
+            tempo_js, comandos_js, resultado_js, _ = _medir(
+                driver, contagem, num_linhas, lambda d, t: extrair_tabela_js(d, t)[1]
+            )
+            if resultado_js != esperadas:
+                raise AssertionError(f"Extração JavaScript diferente do esperado com {num_linhas} linhas")
+
+            completa = 'sim' if linhas_antigo == esperadas else f"{len(linhas_antigo)}/{num_linhas}"
+            print(f"{num_linhas:>6} | {tempo_antigo:>19.2f} | {comandos_antigo:>8} | {completa:>8} | "
+                  f"{tempo_js:>14.2f} | {comandos_js:>8} | {tempo_antigo / tempo_js:>5.1f}x")
+    finally:
+        driver.quit()
+
+
+if __name__ == '__main__':
+    medir()
@@ -3,37 +3,39 @@
 # Atualizado para passar o XPath do container do visual.
 # ===================================================================
 
+import os
 import time
 from NAVEGADOR.login import iniciar_sessao_existente
-from NAVEGADOR.extracao_dados import iniciar_exportacao_painel_1, iniciar_exportacao_painel_2, iniciar_exportacao_painel_3
+from NAVEGADOR.extracao_dados import (
+    iniciar_exportacao_painel_1, iniciar_exportacao_painel_2, iniciar_exportacao_painel_3,
+    MODO_PAINEL_3_QUERYDATA, MODO_PAINEL_3_TABELA
+)
+from NAVEGADOR.trabalhadores import executar_paineis_2_e_3_em_paralelo
+from NAVEGADOR.esperas import iniciar_relatorio_esperas, exibir_relatorio_esperas
+from NAVEGADOR.downloads import PASTA_DOWNLOADS_PRINCIPAL, preparar_pasta_downloads
 from DADOS.sistema_log import log_print
 
+# Painel 3 lido por "Mostrar como uma tabela". MODO_PAINEL_3_QUERYDATA (respostas capturadas
+# pelo DevTools) só foi conferido com as respostas montadas à mão de fixtures_querydata/;
+# troque depois de gravar lá respostas reais do painel e conferir com NAVEGADOR.decodificador_dsr.
+# Mesmo nesse modo, gráfico sem resposta capturada é lido pela tabela.
+MODO_PAINEL_3 = MODO_PAINEL_3_TABELA
+
+# Navegadores headless em paralelo para os Painéis 2 e 3 (1 = um navegador só, em sequência)
+NUM_TRABALHADORES = int(os.environ.get('NAVEGADOR_TRABALHADORES', 1))
 
 
 def main():
     print("--- Iniciando processo de extração de dados ---")
+    iniciar_relatorio_esperas()
 
-    # Excluir arquivo residual  "data.xslx" se existir
-    try:
-        import os
-        from pathlib import Path
-        downloads_folder = str(Path.home() / "Downloads")
-        file_path = os.path.join(downloads_folder, "data.xlsx")
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"[INFO] Arquivo '{file_path}' removido.")
-            log_print(f"[INFO] Arquivo '{file_path}' removido.")    
-        else:
-            print("[INFO] Arquivo 'data.xlsx' não encontrado, nada a remover.")
-            log_print("[INFO] Arquivo 'data.xlsx' não encontrado, nada a remover.")
-    except Exception as e:
-        print(f"[ERRO] Não foi possível remover 'data.xlsx': {e}")
-        log_print(f"[ERRO] Não foi possível remover 'data.xlsx': {e}")
-
-
-
+    # Pasta exclusiva dos downloads deste navegador, vazia a cada execução
+    # (os trabalhadores em paralelo têm cada um a sua)
+    preparar_pasta_downloads(PASTA_DOWNLOADS_PRINCIPAL)
+    print(f"[INFO] Downloads em: {PASTA_DOWNLOADS_PRINCIPAL}")
+    log_print(f"[INFO] Downloads em: {PASTA_DOWNLOADS_PRINCIPAL}")
 
-    driver = iniciar_sessao_existente()
+    driver = iniciar_sessao_existente(capturar_rede=MODO_PAINEL_3 == MODO_PAINEL_3_QUERYDATA)
     if driver is None:
         print("Execute 'atualizar_login.py' para criar a sessão.")
         log_print("Execute 'atualizar_login.py' para criar a sessão.")
@@ -95,13 +97,52 @@ def main():
             'Tabela de Incremento Tratamento Água',
             'Tabela de Incremento Esgoto'
         ]
+        url_painel_2 = "https://app.powerbi.com/groups/me/reports/8f55c63e-74cf-46ac-aa4d-247c6be2e061/ReportSection7e65b0c060b06dc103b3?experience=power-bi"
+        xpath_container_painel_2 = "/html/body/div[1]/root/mat-sidenav-container/mat-sidenav-content/tri-shell-panel-outlet/tri-item-renderer-panel/tri-extension-panel-outlet/mat-sidenav-container/mat-sidenav-content/div/div/div[1]/tri-shell/tri-item-renderer/tri-extension-page-outlet/div[2]/report/exploration-container/div/div/docking-container/div/div/div/div/exploration-host/div/div/exploration/div/explore-canvas/div/div[2]/div/div[2]/div[2]/visual-container-repeat/visual-container[4]/transform/div/div[3]/div/div/visual-modern"
+        xpath_tres_pontos_painel_2 = "/html/body/div[1]/root/mat-sidenav-container/mat-sidenav-content/tri-shell-panel-outlet/tri-item-renderer-panel/tri-extension-panel-outlet/mat-sidenav-container/mat-sidenav-content/div/div/div[1]/tri-shell/tri-item-renderer/tri-extension-page-outlet/div[2]/report/exploration-container/div/div/docking-container/div/div/div/div/exploration-host/div/div/exploration/div/explore-canvas/div/div[2]/div/div[2]/div[2]/visual-container-repeat/visual-container[4]/transform/div/visual-container-header/div/div/div/visual-container-options-menu/visual-header-item-container/div/button"
+        xpath_botao_exportar_dados_painel_2 = "//mat-dialog-actions//button[contains(., 'Exportar')]"
 
-        for pagina in paginas:
-            url_painel_2 = "https://app.powerbi.com/groups/me/reports/8f55c63e-74cf-46ac-aa4d-247c6be2e061/ReportSection7e65b0c060b06dc103b3?experience=power-bi"
-            xpath_container_painel_2 = "/html/body/div[1]/root/mat-sidenav-container/mat-sidenav-content/tri-shell-panel-outlet/tri-item-renderer-panel/tri-extension-panel-outlet/mat-sidenav-container/mat-sidenav-content/div/div/div[1]/tri-shell/tri-item-renderer/tri-extension-page-outlet/div[2]/report/exploration-container/div/div/docking-container/div/div/div/div/exploration-host/div/div/exploration/div/explore-canvas/div/div[2]/div/div[2]/div[2]/visual-container-repeat/visual-container[4]/transform/div/div[3]/div/div/visual-modern"
-            xpath_tres_pontos_painel_2 = "/html/body/div[1]/root/mat-sidenav-container/mat-sidenav-content/tri-shell-panel-outlet/tri-item-renderer-panel/tri-extension-panel-outlet/mat-sidenav-container/mat-sidenav-content/div/div/div[1]/tri-shell/tri-item-renderer/tri-extension-page-outlet/div[2]/report/exploration-container/div/div/docking-container/div/div/div/div/exploration-host/div/div/exploration/div/explore-canvas/div/div[2]/div/div[2]/div[2]/visual-container-repeat/visual-container[4]/transform/div/visual-container-header/div/div/div/visual-container-options-menu/visual-header-item-container/div/button"
-            xpath_botao_exportar_dados_painel_2 = "//mat-dialog-actions//button[contains(., 'Exportar')]"
+        # --- PAINEL 3 ---
+        url_painel_3 = "https://app.powerbi.com/groups/me/reports/8f55c63e-74cf-46ac-aa4d-247c6be2e061/ReportSection7e65b0c060b06dc103b3?experience=power-bi"
+        pagina_3 = 'Evolução de Economias por Recorte 2025'
+        #xpath_graficos = "//visual-container[.//div[contains(@class, 'visual-lineChart')]]"
+        xpath_mostrar_como_tabela = "//button[@data-testid='pbimenu-item.Mostrar como uma tabela']"
+
+        if NUM_TRABALHADORES > 1:
+            # Os trabalhadores usam cópias do perfil de sessão: o navegador principal é fechado
+            # antes, para o Chrome liberar os arquivos do perfil (no Windows, arquivos abertos
+            # não podem ser copiados) e gravar os cookies renovados durante o Painel 1.
+            print("[INFO] Fechando o navegador principal antes de iniciar os trabalhadores.")
+            log_print("[INFO] Fechando o navegador principal antes de iniciar os trabalhadores.")
+            driver.quit()
+            driver = None
+            resultado_paralelo = executar_paineis_2_e_3_em_paralelo(NUM_TRABALHADORES, {
+                'painel_2': {
+                    'url': url_painel_2,
+                    'paginas': paginas,
+                    'xpath_container': xpath_container_painel_2,
+                    'xpath_tres_pontos': xpath_tres_pontos_painel_2,
+                    'xpath_exportar': xpath_botao_exportar_dados_painel_2,
+                },
+                'painel_3': {
+                    'url': url_painel_3,
+                    'pagina': pagina_3,
+                    'xpath_mostrar_como_tabela': xpath_mostrar_como_tabela,
+                    'modo': MODO_PAINEL_3,
+                },
+            })
+            if resultado_paralelo['login_expirado']:
+                print("\n[AÇÃO NECESSÁRIA] A sua sessão do Power BI expirou.")
+                log_print("\n[AÇÃO NECESSÁRIA] A sua sessão do Power BI expirou.")
+                return 'LOGIN_REQUIRED'
+            for falha in resultado_paralelo['falhas']:
+                print(f"[AVISO] Falha em todas as tentativas: {falha}")
+                log_print(f"[AVISO] Falha em todas as tentativas: {falha}")
+            if resultado_paralelo['falhas']:
+                return False
+            return
 
+        for pagina in paginas:
             resultado_2 = iniciar_exportacao_painel_2(
                 driver,
                 url_painel_2,
@@ -123,17 +164,12 @@ def main():
         
         
         
-        # --- PAINEL 3 ---
-        url_painel_3 = "https://app.powerbi.com/groups/me/reports/8f55c63e-74cf-46ac-aa4d-247c6be2e061/ReportSection7e65b0c060b06dc103b3?experience=power-bi"
-        pagina_3 = 'Evolução de Economias por Recorte 2025'
-        #xpath_graficos = "//visual-container[.//div[contains(@class, 'visual-lineChart')]]"
-        xpath_mostrar_como_tabela = "//button[@data-testid='pbimenu-item.Mostrar como uma tabela']"
-        
         resultado_3 = iniciar_exportacao_painel_3(
             driver, 
             url_painel_3, 
             xpath_mostrar_como_tabela, 
-            pagina_3
+            pagina_3,
+            modo=MODO_PAINEL_3
         )
 
         if resultado_3 == "LOGIN_REQUIRED":
@@ -148,6 +184,8 @@ def main():
 
 
     finally:
+        # Tempo gasto esperando o Power BI x trabalhando, por etapa
+        exibir_relatorio_esperas()
         print("[INFO] Fechando o navegador.")
         log_print("[INFO] Fechando o navegador.")
          # Fecha o navegador
@@ -7,10 +7,13 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 import time
 import os
 import shutil
+from NAVEGADOR.esperas import (
+    esperar_painel_pronto, esperar_dom_estavel, esperar_elemento_visivel, registrar_espera
+)
 
 
 ######################################################################################
@@ -29,6 +32,7 @@ def esperar_carregamento_invisivel(driver, timeout=60):
         bool: True se o carregamento desapareceu, False se o tempo esgotou.
     """
     print("[INFO] Verificando a tela de carregamento...")
+    inicio = time.perf_counter()
     try:
         # Define o XPath para o contêiner do spinner de carregamento
         xpath_carregamento = "//*[@id='pbi-svg-loading']"
@@ -39,10 +43,12 @@ def esperar_carregamento_invisivel(driver, timeout=60):
         # Espera até que o elemento se torne INVISÍVEL.
         # O Selenium verificará continuamente e só prosseguirá quando a condição for atendida.
         wait.until(EC.invisibility_of_element_located((By.XPATH, xpath_carregamento)))
+        registrar_espera('carregamento', time.perf_counter() - inicio)
         
         print("[SUCESSO] Tela de carregamento desapareceu. Continuando o script.")
         return True
     except TimeoutException:
+        registrar_espera('carregamento', time.perf_counter() - inicio, sucesso=False)
         print(f"[ERRO] A tela de carregamento não desapareceu após {timeout} segundos.")
         return False
     except Exception as e:
@@ -50,6 +56,109 @@ def esperar_carregamento_invisivel(driver, timeout=60):
         return False
 
 
+# Extrai a tabela inteira dentro do navegador, numa única chamada do WebDriver:
+# lê o cabeçalho e as linhas renderizadas, rola o viewport virtual da pivotTable
+# e acumula as linhas pelo aria-rowindex até o fim (ou até o tempo limite).
+# arguments[0]: elemento da tabela; arguments[1]: tempo limite em ms.
+_JS_EXTRAIR_TABELA = """
+const tabela = arguments[0];
+const limiteMs = arguments[1];
+const concluir = arguments[arguments.length - 1];
+const inicio = performance.now();
+const linhas = new Map();
+
+function textos(elementos) {
+    return Array.from(elementos, el => el.innerText.trim());
+}
+
+function coletar() {
+    let novas = 0;
+    for (const linha of tabela.querySelectorAll("[role='row']")) {
+        const indice = Number(linha.getAttribute('aria-rowindex'));
+        if (!(indice > 1) || linhas.has(indice)) continue;
+        const valores = textos(linha.querySelectorAll("[role='rowheader'], [role='gridcell']"));
+        if (valores.length) { linhas.set(indice, valores); novas++; }
+    }
+    return novas;
+}
+
+function acharViewport() {
+    for (const el of [tabela, ...tabela.querySelectorAll('*')]) {
+        if (/(auto|scroll)/.test(getComputedStyle(el).overflowY) && el.scrollHeight > el.clientHeight + 1) return el;
+    }
+    return null;
+}
+
+// Espera o grid redesenhar: a primeira mutação em até primeiraMs e depois quietoMs sem mutações
+function esperarRedesenho(quietoMs, primeiraMs, maximoMs) {
+    return new Promise(resolve => {
+        let espera;
+        const terminar = () => { clearTimeout(espera); clearTimeout(limite); observador.disconnect(); resolve(); };
+        const limite = setTimeout(terminar, maximoMs);
+        const observador = new MutationObserver(() => { clearTimeout(espera); espera = setTimeout(terminar, quietoMs); });
+        observador.observe(tabela, {childList: true, subtree: true, characterData: true});
+        espera = setTimeout(terminar, primeiraMs);
+    });
+}
+
+async function extrair() {
+    const cabecalho = textos(tabela.querySelectorAll("[role='row'][aria-rowindex='1'] [role='columnheader']"));
+    const viewport = acharViewport();
+    let completo = true;
+    coletar();
+    if (viewport && viewport.scrollTop > 0) {
+        viewport.scrollTop = 0;
+        await esperarRedesenho(100, 400, 3000);
+        coletar();
+    }
+    while (viewport) {
+        if (performance.now() - inicio > limiteMs) { completo = false; break; }
+        if (viewport.scrollTop + viewport.clientHeight >= viewport.scrollHeight - 1) {
+            // No fim: o Power BI pode carregar mais um bloco de linhas e aumentar a altura
+            await esperarRedesenho(100, 400, 3000);
+            if (!coletar() && viewport.scrollTop + viewport.clientHeight >= viewport.scrollHeight - 1) break;
+            continue;
+        }
+        viewport.scrollTop += Math.max(1, Math.floor(viewport.clientHeight * 0.9));
+        await esperarRedesenho(100, 400, 3000);
+        coletar();
+    }
+    const indices = [...linhas.keys()].sort((a, b) => a - b);
+    return {cabecalho: cabecalho, linhas: indices.map(i => linhas.get(i)), completo: completo};
+}
+
+extrair().then(concluir, erro => concluir({erro: String(erro)}));
+"""
+
+
+def extrair_tabela_js(driver, tabela_element, limite_segundos=20):
+    """
+    Extrai cabeçalho e linhas de uma tabela com rolagem virtual do Power BI numa
+    única chamada (execute_async_script), em vez de um find_elements por linha e
+    um .text por célula.
+
+    Returns:
+        tuple: (cabecalho, linhas), ou None se a extração no navegador falhou
+               (quem chama usa extrair_dados_tabela_com_scroll como alternativa).
+    """
+    inicio = time.perf_counter()
+    try:
+        driver.set_script_timeout(limite_segundos + 10)
+        resultado = driver.execute_async_script(_JS_EXTRAIR_TABELA, tabela_element, limite_segundos * 1000)
+    except WebDriverException as e:
+        print(f"   [AVISO] Extração da tabela via JavaScript falhou: {e.msg}")
+        return None
+    if not resultado or 'erro' in resultado:
+        print(f"   [AVISO] Extração da tabela via JavaScript falhou: {(resultado or {}).get('erro')}")
+        return None
+
+    if not resultado['completo']:
+        print(f"   [AVISO] Tempo limite de {limite_segundos}s na rolagem da tabela: linhas podem estar faltando.")
+    print(f"   [SUCESSO] Extração via JavaScript finalizada em {time.perf_counter() - inicio:.1f}s. "
+          f"Total de {len(resultado['linhas'])} linhas.")
+    return resultado['cabecalho'], resultado['linhas']
+
+
 def extrair_dados_tabela_com_scroll(driver, tabela_element):
     """
     Extrai todas as linhas de uma tabela com rolagem virtual no Power BI.
@@ -107,7 +216,8 @@ def extrair_dados_tabela_com_scroll(driver, tabela_element):
         try:
             ultima_linha_visivel = linhas_visiveis[-1]
             ActionChains(driver).move_to_element(ultima_linha_visivel).perform()
-            time.sleep(0.7) # Pausa para a renderização após o movimento
+            # Espera as linhas novas serem desenhadas (DOM sem mutações)
+            esperar_dom_estavel(driver, 'rolar_tabela')
         except IndexError:
             # Isso pode acontecer se a tabela ficar vazia ou não tiver linhas.
             print("   [AVISO] Não foi possível encontrar a última linha visível para mover. Finalizando.")
@@ -160,36 +270,45 @@ def encontrar_e_clicar(driver, by, value, timeout=10):
     Returns:
         True se o clique for bem-sucedido, False caso contrário.
     """
+    inicio = time.perf_counter()
     try:
         wait = WebDriverWait(driver, timeout)
         elemento = wait.until(EC.element_to_be_clickable((by, value)))
+        registrar_espera('clique', time.perf_counter() - inicio)
         elemento.click()
         return True
     except TimeoutException:
+        registrar_espera('clique', time.perf_counter() - inicio, sucesso=False)
         print(f"[ERRO DE CLIQUE] Tempo esgotado. Elemento não era clicável ou não foi encontrado com {by} = '{value}'")
         return False
     except Exception as e:
         print(f"[ERRO DE CLIQUE] Erro inesperado ao clicar no elemento: {e}")
         return False
     
-def renomear_e_mover_arquivo_exportado(pagina, superintendencia, caminho_download):
+def renomear_e_mover_arquivo_exportado(pagina, superintendencia, caminho_download, arquivo_baixado=None):
     """
-    Encontra o arquivo .xlsx mais recente na pasta de downloads,
-    renomeia-o com base na página e superintendência, e o move para a pasta de destino.
+    Renomeia o arquivo exportado com base na página e superintendência e o move para a pasta de destino.
+
+    Args:
+        arquivo_baixado (str, opcional): Caminho exato do download (devolvido por esperar_download).
+            Sem ele, usa o arquivo .xlsx mais recente da pasta de downloads.
     """
     try:
         print(f"\n--- GERENCIANDO ARQUIVO PARA: {pagina} / {superintendencia} ---")
 
-        # 1. Encontrar o arquivo mais recente na pasta de downloads
-        print(f"[INFO] Procurando o arquivo .xlsx mais recente em: {caminho_download}")
-        arquivos_xlsx = [f for f in os.listdir(caminho_download) if f.endswith('.xlsx')]
-        if not arquivos_xlsx:
-            print("[ERRO] Nenhum arquivo .xlsx encontrado na pasta de downloads.")
-            return False
+        # 1. O arquivo baixado (ou, sem ele, o mais recente na pasta de downloads)
+        if arquivo_baixado:
+            arquivo_mais_recente = arquivo_baixado
+        else:
+            print(f"[INFO] Procurando o arquivo .xlsx mais recente em: {caminho_download}")
+            arquivos_xlsx = [f for f in os.listdir(caminho_download) if f.endswith('.xlsx')]
+            if not arquivos_xlsx:
+                print("[ERRO] Nenhum arquivo .xlsx encontrado na pasta de downloads.")
+                return False
 
-        caminho_completo_arquivos = [os.path.join(caminho_download, f) for f in arquivos_xlsx]
-        arquivo_mais_recente = max(caminho_completo_arquivos, key=os.path.getctime)
-        print(f"[INFO] Arquivo mais recente encontrado: {os.path.basename(arquivo_mais_recente)}")
+            caminho_completo_arquivos = [os.path.join(caminho_download, f) for f in arquivos_xlsx]
+            arquivo_mais_recente = max(caminho_completo_arquivos, key=os.path.getctime)
+        print(f"[INFO] Arquivo exportado: {os.path.basename(arquivo_mais_recente)}")
 
         # 2. Definir o novo nome e a pasta de destino
         if pagina and "Tabela de Incremento Tratamento Água" in pagina:
@@ -270,8 +389,7 @@ def aplicar_filtros_superintendencia(driver, lista_superintendencias):
         menu_principal_xpath = "//div[@aria-label='DS_CD_SUPERINTENDENCIA']"
         if not encontrar_e_clicar(driver, By.XPATH, menu_principal_xpath):
             return False
-        
-        time.sleep(1) # Pequena pausa para a animação do menu
+        # A espera pela presença de cada opção (abaixo) cobre a animação do menu
 
         # PASSO 2: Clicar em cada opção da lista, com rolagem e verificação
         for nome_opcao in lista_superintendencias:
@@ -283,9 +401,8 @@ def aplicar_filtros_superintendencia(driver, lista_superintendencias):
                     EC.presence_of_element_located((By.XPATH, xpath_container))
                 )
                 
-                # LÓGICA DE ROLAGEM COM JAVASCRIPT
+                # LÓGICA DE ROLAGEM COM JAVASCRIPT (síncrona: sem animação de rolagem)
                 driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", container_elemento)
-                time.sleep(0.5)
                 
                 # VERIFICAÇÃO: Checa se já está selecionado
                 if container_elemento.get_attribute('aria-selected') == 'true':
@@ -311,27 +428,6 @@ def aplicar_filtros_superintendencia(driver, lista_superintendencias):
         print(f"[ERRO] Ocorreu um erro inesperado ao aplicar os filtros: {e}")
         return False
 
-def esperar_download_concluir(pasta_download, nome_arquivo_esperado, timeout=120):
-    """
-    Espera um arquivo ser completamente baixado em uma pasta, monitorando
-    a ausência de arquivos temporários (.crdownload).
-    """
-    print(f"\n[INFO] Aguardando o download de '{nome_arquivo_esperado}'...")
-    print(f"       Pasta de destino: {pasta_download}")
-    
-    tempo_inicial = time.time()
-    caminho_arquivo_final = os.path.join(pasta_download, nome_arquivo_esperado)
-    caminho_arquivo_temp = caminho_arquivo_final + '.crdownload' # Para Chrome/Edge
-
-    while time.time() - tempo_inicial < timeout:
-        if os.path.exists(caminho_arquivo_final) and not os.path.exists(caminho_arquivo_temp):
-            print(f"[SUCESSO] Download de '{nome_arquivo_esperado}' concluído.")
-            return True
-        time.sleep(1)
-
-    print(f"[ERRO] O download não foi concluído dentro do tempo limite de {timeout} segundos.")
-    return False
-
 def limpar_todos_os_filtros(driver):
     """
     Encontra e clica no botão 'LIMPAR FILTROS' para resetar o painel.
@@ -343,8 +439,8 @@ def limpar_todos_os_filtros(driver):
     # Tenta encontrar e clicar no botão. Se não encontrar, avisa e continua.
     if encontrar_e_clicar(driver, By.XPATH, limpar_filtros_xpath, timeout=15):
         print("[SUCESSO] Filtros foram limpos.")
-        # Espera um tempo para o painel processar o reset dos filtros.
-        time.sleep(5)
+        # Espera o painel processar o reset dos filtros.
+        esperar_painel_pronto(driver, 'limpar_filtros')
         return True
     else:
         print("[AVISO] Botão 'LIMPAR FILTROS' não encontrado ou não foi possível clicar. Prosseguindo...")
@@ -370,12 +466,22 @@ def navegar_para_pagina_especifica(driver, nome_da_pagina):
     if encontrar_e_clicar(driver, By.XPATH, xpath_pagina, timeout=60):
         print(f"[SUCESSO] Navegou para a página '{nome_da_pagina}'.")
         # Espera a nova página carregar seus elementos
-        time.sleep(10)
+        esperar_painel_pronto(driver, 'navegar_pagina')
         return True
     else:
         print(f"[ERRO] Não foi possível encontrar ou clicar na página '{nome_da_pagina}'.")
         return False
 
+def _esperar_botao_limpar(driver, container_filtro):
+    """Espera o botão 'Limpar seleções' do filtro ficar visível após o hover (None se não aparecer)."""
+    def _localizar(d):
+        botoes = container_filtro.find_elements(By.XPATH, ".//span[@aria-label='Limpar seleções']")
+        if not botoes:
+            botoes = d.find_elements(By.XPATH, "//span[@aria-label='Limpar seleções']")
+        return next((botao for botao in botoes if botao.is_displayed()), None)
+
+    return esperar_elemento_visivel(driver, 'revelar_botao', _localizar)
+
 def limpar_filtro_diretoria(driver):
     """
     Passa o mouse sobre o filtro 'DIRETORIA REGIONAL' para revelar o botão
@@ -396,17 +502,16 @@ def limpar_filtro_diretoria(driver):
         print("[INFO] Passando o mouse sobre o filtro para revelar opções...")
         actions = ActionChains(driver)
         actions.move_to_element(container_filtro).perform()
-        time.sleep(1) # Pausa para o botão aparecer
 
-        # PASSO 3: Encontrar e clicar no botão de limpar, se ele estiver visível
-        xpath_botao_limpar = "//span[@aria-label='Limpar seleções']"
-        botao_limpar = encontrar_elemento(driver, By.XPATH, xpath_botao_limpar)
+        # PASSO 3: Esperar o botão de limpar aparecer e clicar nele. Se não houver seleção,
+        # o botão não aparece e a espera termina no tempo limite curto de 'revelar_botao'.
+        botao_limpar = _esperar_botao_limpar(driver, container_filtro)
 
-        if botao_limpar and botao_limpar.is_displayed():
+        if botao_limpar:
             print("[INFO] Botão 'Limpar seleções' encontrado e visível. Clicando...")
             botao_limpar.click()
             print("[SUCESSO] Filtro 'DIRETORIA REGIONAL' foi limpo.")
-            time.sleep(5)
+            esperar_painel_pronto(driver, 'limpar_filtros')
         else:
             print("[INFO] Botão 'Limpar seleções' não está visível. Nenhum filtro para limpar.")
         
@@ -436,17 +541,16 @@ def limpar_filtro_municipio(driver):
         print("[INFO] Passando o mouse sobre o filtro para revelar opções...")
         actions = ActionChains(driver)
         actions.move_to_element(container_filtro).perform()
-        time.sleep(1) # Pausa para o botão aparecer
 
-        # PASSO 3: Encontrar e clicar no botão de limpar, se ele estiver visível
-        xpath_botao_limpar = "//span[@aria-label='Limpar seleções']"
-        botao_limpar = encontrar_elemento(driver, By.XPATH, xpath_botao_limpar)
+        # PASSO 3: Esperar o botão de limpar aparecer e clicar nele. Se não houver seleção,
+        # o botão não aparece e a espera termina no tempo limite curto de 'revelar_botao'.
+        botao_limpar = _esperar_botao_limpar(driver, container_filtro)
 
-        if botao_limpar and botao_limpar.is_displayed():
+        if botao_limpar:
             print("[INFO] Botão 'Limpar seleções' encontrado e visível. Clicando...")
             botao_limpar.click()
             print("[SUCESSO] Filtro 'Município' foi limpo.")
-            time.sleep(5)
+            esperar_painel_pronto(driver, 'limpar_filtros')
         else:
             print("[INFO] Botão 'Limpar seleções' não está visível. Nenhum filtro para limpar.")
         
@@ -472,8 +576,7 @@ def aplicar_filtro_diretoria_regional(driver, superintendencia):
         if not encontrar_e_clicar(driver, By.XPATH, menu_principal_xpath):
             print("[ERRO] Não foi possível abrir o menu de Superintendência.")
             return False
-
-        time.sleep(1)  # Pequena pausa para a animação do menu
+        # A espera pela presença da opção (abaixo) cobre a animação do menu
 
         try:
             # Busca o item da lista pelo título
@@ -483,7 +586,6 @@ def aplicar_filtro_diretoria_regional(driver, superintendencia):
             )
 
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", container_elemento)
-            time.sleep(0.5)
 
             # Verifica se já está selecionado
             if container_elemento.get_attribute('aria-selected') == 'true':
@@ -0,0 +1,247 @@
+# ===================================================================
+# ARQUIVO: trabalhadores.py
+# Modo paralelo dos Painéis 2 e 3: os itens superintendência x página são
+# distribuídos entre N navegadores headless, cada um com a sua cópia do perfil
+# de sessão (o Chrome não abre o mesmo perfil duas vezes) e a sua pasta de
+# downloads. Os arquivos do Painel 2 vão para as mesmas pastas de sempre e as
+# linhas do Painel 3 são juntadas num único CSV, na ordem das superintendências.
+# Um item que falha volta para a fila e é tentado de novo em outro navegador.
+# ===================================================================
+import os
+import shutil
+import threading
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from DADOS.sistema_log import log_print
+from NAVEGADOR.login import DIRETORIO_PERFIL_CHROME, iniciar_sessao_trabalhador
+from NAVEGADOR.captura_querydata import iniciar_captura_querydata
+from NAVEGADOR.extracao_dados import (
+    SUPERINTENDENCIAS_PAINEIS_2_E_3, MODO_PAINEL_3_QUERYDATA,
+    preparar_pagina_painel_2, exportar_superintendencia_painel_2,
+    preparar_pagina_painel_3, extrair_superintendencia_painel_3, salvar_csv_painel_3
+)
+
+PASTA_TRABALHADORES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trabalhadores")
+
+# Tentativas de cada item (a primeira + as repetições em outros navegadores)
+MAX_TENTATIVAS = 3
+
+# Não copiados do perfil: travas da instância original (inclusive as dos bancos LevelDB
+# e os journals do SQLite) e caches que o Chrome recria
+_IGNORAR_NO_PERFIL = shutil.ignore_patterns(
+    'Singleton*', 'lockfile', 'LOCK', '*-journal', 'Cache', 'Code Cache', 'GPUCache', 'DawnCache',
+    'ShaderCache', 'GrShaderCache', 'Crashpad'
+)
+
+
+def _preparar_pastas_trabalhador(indice):
+    """
+    Cria (do zero) a cópia do perfil e a pasta de downloads do trabalhador.
+    O perfil original não pode estar aberto por outro Chrome (navegador.py fecha o principal antes).
+    """
+    pasta_base = os.path.join(PASTA_TRABALHADORES, f"trabalhador_{indice}")
+    shutil.rmtree(pasta_base, ignore_errors=True)
+    pasta_perfil = os.path.join(pasta_base, "perfil")
+    pasta_downloads = os.path.join(pasta_base, "downloads")
+    shutil.copytree(DIRETORIO_PERFIL_CHROME, pasta_perfil, ignore=_IGNORAR_NO_PERFIL)
+    os.makedirs(pasta_downloads)
+    return pasta_perfil, pasta_downloads
+
+
+# ===================================================================
+# FILA DE ITENS
+# ===================================================================
+def _proximo_item(estado, indice):
+    """
+    Tira da fila um item que este trabalhador ainda não tentou (a não ser que todos
+    os trabalhadores vivos já tenham falhado nele). Espera enquanto houver itens em
+    andamento que podem voltar para a fila. Retorna None quando não há mais trabalho.
+    """
+    with estado['condicao']:
+        while True:
+            if estado['login_expirado']:
+                return None
+            for item in estado['pendentes']:
+                if indice not in item['falhou_em'] or len(item['falhou_em']) >= estado['vivos']:
+                    estado['pendentes'].remove(item)
+                    estado['em_andamento'] += 1
+                    return item
+            if not estado['pendentes'] and not estado['em_andamento']:
+                return None
+            estado['condicao'].wait(timeout=1)
+
+
+def _concluir_item(estado, item, indice, sucesso):
+    with estado['condicao']:
+        estado['em_andamento'] -= 1
+        if sucesso:
+            estado['concluidos'].append(item)
+        else:
+            item['tentativas'] += 1
+            item['falhou_em'].add(indice)
+            if item['tentativas'] < MAX_TENTATIVAS and not estado['login_expirado']:
+                print(f"[AVISO] [T{indice}] {_descrever(item)} falhou. Voltando para a fila "
+                      f"(tentativa {item['tentativas']}/{MAX_TENTATIVAS}).")
+                log_print(f"[AVISO] [T{indice}] {_descrever(item)} falhou. Voltando para a fila "
+                          f"(tentativa {item['tentativas']}/{MAX_TENTATIVAS}).")
+                estado['pendentes'].append(item)
+            else:
+                estado['falhas'].append(item)
+        estado['condicao'].notify_all()
+
+
+def _descrever(item):
+    return f"Painel {item['painel']} / {item['pagina']} / {item['superintendencia']}"
+
+
+# ===================================================================
+# TRABALHADOR
+# ===================================================================
+def _executar_item(driver, captura, item, pasta_downloads, configuracao):
+    """Processa um item na página já aberta. Retorna True se deu certo."""
+    if item['painel'] == 2:
+        painel_2 = configuracao['painel_2']
+        return exportar_superintendencia_painel_2(
+            driver, painel_2['xpath_container'], painel_2['xpath_tres_pontos'], painel_2['xpath_exportar'],
+            item['pagina'], item['superintendencia'], pasta_downloads
+        )
+
+    resultado = extrair_superintendencia_painel_3(
+        driver, captura, configuracao['painel_3']['xpath_mostrar_como_tabela'], item['superintendencia']
+    )
+    item['resultado'] = resultado
+    # Sem nenhum gráfico lido também conta como falha, para tentar em outro navegador
+    return bool(resultado and resultado[0])
+
+
+def _preparar_pagina(driver, item, configuracao):
+    if item['painel'] == 2:
+        return preparar_pagina_painel_2(driver, configuracao['painel_2']['url'], item['pagina'])
+    return preparar_pagina_painel_3(driver, configuracao['painel_3']['url'], item['pagina'])
+
+
+def _trabalhador(indice, estado, configuracao):
+    """Abre um navegador e processa itens da fila até acabar (ou o navegador cair)."""
+    driver = None
+    try:
+        pasta_perfil, pasta_downloads = _preparar_pastas_trabalhador(indice)
+        capturar_rede = configuracao['painel_3']['modo'] == MODO_PAINEL_3_QUERYDATA
+        driver = iniciar_sessao_trabalhador(pasta_perfil, pasta_downloads, capturar_rede)
+        captura = iniciar_captura_querydata(driver) if capturar_rede else None
+        print(f"[INFO] [T{indice}] Navegador iniciado.")
+        log_print(f"[INFO] [T{indice}] Navegador iniciado.")
+
+        pagina_aberta = None
+        while True:
+            item = _proximo_item(estado, indice)
+            if item is None:
+                break
+            print(f"[INFO] [T{indice}] {_descrever(item)}")
+            log_print(f"[INFO] [T{indice}] {_descrever(item)}")
+
+            sucesso = False
+            navegador_caiu = False
+            try:
+                chave_pagina = (item['painel'], item['pagina'])
+                if pagina_aberta != chave_pagina:
+                    preparada = _preparar_pagina(driver, item, configuracao)
+                    if preparada == "LOGIN_REQUIRED":
+                        with estado['condicao']:
+                            estado['login_expirado'] = True
+                    pagina_aberta = chave_pagina if preparada is True else None
+                if pagina_aberta == chave_pagina:
+                    sucesso = _executar_item(driver, captura, item, pasta_downloads, configuracao)
+            except WebDriverException as e:
+                print(f"[ERRO] [T{indice}] Erro do navegador em {_descrever(item)}: {e.msg}")
+                log_print(f"[ERRO] [T{indice}] Erro do navegador em {_descrever(item)}: {e.msg}")
+                try:
+                    driver.current_url
+                except WebDriverException:
+                    navegador_caiu = True
+            except Exception as e:
+                print(f"[ERRO] [T{indice}] Falha em {_descrever(item)}: {e}")
+                log_print(f"[ERRO] [T{indice}] Falha em {_descrever(item)}: {e}")
+            finally:
+                _concluir_item(estado, item, indice, sucesso)
+
+            if not sucesso:
+                # Reabre a página do zero no próximo item, sem herdar filtros ou menus abertos
+                pagina_aberta = None
+            if navegador_caiu:
+                print(f"[ERRO] [T{indice}] O navegador parou de responder. Trabalhador encerrado.")
+                log_print(f"[ERRO] [T{indice}] O navegador parou de responder. Trabalhador encerrado.")
+                break
+
+    except Exception as e:
+        print(f"[ERRO] [T{indice}] Não foi possível iniciar o trabalhador: {e}")
+        log_print(f"[ERRO] [T{indice}] Não foi possível iniciar o trabalhador: {e}")
+    finally:
+        with estado['condicao']:
+            estado['vivos'] -= 1
+            estado['condicao'].notify_all()
+        if driver:
+            driver.quit()
+
+
+# ===================================================================
+# EXECUÇÃO
+# ===================================================================
+def executar_paineis_2_e_3_em_paralelo(num_trabalhadores, configuracao):
+    """
+    Distribui os itens dos Painéis 2 e 3 entre num_trabalhadores navegadores e grava o CSV do Painel 3.
+
+    Args:
+        configuracao (dict): {'painel_2': {'url', 'paginas', 'xpath_container', 'xpath_tres_pontos',
+                              'xpath_exportar'}, 'painel_3': {'url', 'pagina', 'xpath_mostrar_como_tabela', 'modo'}}
+
+    Returns:
+        dict: {'login_expirado': bool, 'falhas': [descrição dos itens que falharam em todas as tentativas]}
+    """
+    itens = [
+        {'painel': 2, 'pagina': pagina, 'superintendencia': superintendencia}
+        for pagina in configuracao['painel_2']['paginas']
+        for superintendencia in SUPERINTENDENCIAS_PAINEIS_2_E_3
+    ] + [
+        {'painel': 3, 'pagina': configuracao['painel_3']['pagina'], 'superintendencia': superintendencia}
+        for superintendencia in SUPERINTENDENCIAS_PAINEIS_2_E_3
+    ]
+    for item in itens:
+        item.update({'tentativas': 0, 'falhou_em': set(), 'resultado': None})
+
+    estado = {
+        'condicao': threading.Condition(),
+        'pendentes': list(itens),
+        'em_andamento': 0,
+        'vivos': num_trabalhadores,
+        'login_expirado': False,
+        'concluidos': [],
+        'falhas': [],
+    }
+
+    inicio = time.perf_counter()
+    print(f"\n[INFO] Painéis 2 e 3 em paralelo: {len(itens)} itens em {num_trabalhadores} navegadores.")
+    log_print(f"[INFO] Painéis 2 e 3 em paralelo: {len(itens)} itens em {num_trabalhadores} navegadores.")
+    threads = [
+        threading.Thread(target=_trabalhador, args=(indice, estado, configuracao), name=f"trabalhador_{indice}")
+        for indice in range(1, num_trabalhadores + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Itens que ficaram na fila porque todos os navegadores caíram também são falhas
+    falhas = estado['falhas'] + estado['pendentes']
+
+    # Painel 3: um único CSV, na ordem das superintendências, como na execução sequencial
+    itens_painel_3 = [item for item in itens if item['painel'] == 3]
+    if not estado['login_expirado'] and any(item['resultado'] for item in itens_painel_3):
+        salvar_csv_painel_3([item['resultado'] for item in itens_painel_3])
+
+    print(f"[INFO] Painéis 2 e 3 em paralelo: {len(estado['concluidos'])}/{len(itens)} itens concluídos "
+          f"em {time.perf_counter() - inicio:.0f}s.")
+    log_print(f"[INFO] Painéis 2 e 3 em paralelo: {len(estado['concluidos'])}/{len(itens)} itens concluídos "
+              f"em {time.perf_counter() - inicio:.0f}s.")
+    return {'login_expirado': estado['login_expirado'], 'falhas': [_descrever(item) for item in falhas]}
@@ -0,0 +1,226 @@
+# ===================================================================
+# ARQUIVO: api.py
+# API JSON do dashboard (/api/...), construída sobre as funções fetch_* do database.
+# Cada seção é serializada uma única vez por versão dos dados e reaproveitada
+# por todos os clientes. O JavaScript das páginas consulta /api/version e só
+# busca as seções cujo hash mudou. Em /api/eventos (Server-Sent Events) as páginas
+# são avisadas quando uma nova carga do ETL é publicada, sem precisar consultar.
+# ===================================================================
+import hashlib
+import json
+import threading
+import time
+
+from flask import Blueprint, Response, abort, request
+
+from banco.database import (
+    fetch_kpi_data, fetch_ranking_data, fetch_ranking_nla_nle, fetch_dados_graficos,
+    fetch_update_dates_separately, escopo_requisicao, versao_dados_atual, coletar_falhas_consulta
+)
+
+VERSAO_API = 1
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+# Rankings expostos em /api/rankings/<dataset>
+RANKINGS = {
+    'agua': lambda: fetch_ranking_data('tb_agua'),
+    'esgoto': lambda: fetch_ranking_data('tb_esgoto'),
+    'nla_nle': lambda: fetch_ranking_nla_nle(),
+}
+
+
+def _tabela_compacta(df):
+    """DataFrame -> {'colunas': [...], 'linhas': [[...], ...]} (sem repetir os nomes das colunas)."""
+    return {'colunas': list(df.columns), 'linhas': json.loads(df.to_json(orient='values'))}
+
+
+def _kpis():
+    return {chave: int(valor) for chave, valor in fetch_kpi_data().items()}
+
+
+def _datas():
+    data_nla_nle, data_agua, data_esgoto = fetch_update_dates_separately()
+    return {'nla_nle': data_nla_nle, 'agua': data_agua, 'esgoto': data_esgoto}
+
+
+# Seção -> função que monta o conteúdo
+SECOES = {
+    'kpis': _kpis,
+    'graficos': lambda: fetch_dados_graficos(),
+    'datas': _datas,
+    **{f'rankings/{dataset}': (lambda busca=busca: _tabela_compacta(busca())) for dataset, busca in RANKINGS.items()},
+}
+
+# Seção -> (versão dos dados, JSON já serializado, hash do JSON)
+_PAYLOADS = {}
+_TRAVA_PAYLOADS = threading.Lock()
+
+
+def _payload(secao, versao):
+    """
+    Retorna (json_bytes, hash) da seção, serializando só quando a versão dos dados muda.
+    Seções montadas com falha de consulta (valores substitutos) ou sem a versão dos dados
+    não são guardadas: a próxima requisição consulta de novo.
+    """
+    with _TRAVA_PAYLOADS:
+        entrada = _PAYLOADS.get(secao)
+    if entrada and entrada[0] == versao and versao is not None:
+        return entrada[1], entrada[2]
+
+    with coletar_falhas_consulta() as falhas:
+        dados = SECOES[secao]()
+    corpo = json.dumps(
+        {'api': VERSAO_API, 'versao': versao, 'dados': dados},
+        ensure_ascii=False, separators=(',', ':'), default=str
+    ).encode('utf-8')
+    hash_corpo = hashlib.sha1(corpo).hexdigest()[:12]
+    if versao is not None and not falhas:
+        with _TRAVA_PAYLOADS:
+            _PAYLOADS[secao] = (versao, corpo, hash_corpo)
+    return corpo, hash_corpo
+
+
+def aquecer_payloads():
+    """
+    Monta todas as seções da versão atual (e, com elas, o cache das consultas).
+    Usado pelo servidor de produção antes de criar os processos de atendimento.
+
+    Returns:
+        str: Versão dos dados aquecida (None se o banco não respondeu).
+    """
+    versao = versao_dados_atual()
+    with escopo_requisicao():
+        for secao in SECOES:
+            _payload(secao, versao)
+    return versao
+
+
+def _resposta_json(corpo, etag):
+    """Resposta JSON com ETag; devolve 304 se o cliente já tem esse conteúdo."""
+    resposta = Response(corpo, mimetype='application/json')
+    resposta.set_etag(etag, weak=True)
+    resposta.headers['Cache-Control'] = 'no-cache'
+    return resposta.make_conditional(request)
+
+
+@api.route('/version')
+def version():
+    """Versão dos dados e hash de cada seção (o cliente busca só as seções que mudaram)."""
+    versao = versao_dados_atual()
+    with escopo_requisicao():
+        secoes = {secao: _payload(secao, versao)[1] for secao in SECOES}
+    corpo = json.dumps({'api': VERSAO_API, 'versao': versao, 'secoes': secoes},
+                       ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return _resposta_json(corpo, hashlib.sha1(corpo).hexdigest()[:12])
+
+
+def _servir_secao(secao):
+    with escopo_requisicao():
+        corpo, hash_corpo = _payload(secao, versao_dados_atual())
+    return _resposta_json(corpo, hash_corpo)
+
+
+@api.route('/kpis')
+def kpis():
+    return _servir_secao('kpis')
+
+
+@api.route('/rankings/<dataset>')
+def rankings(dataset):
+    if dataset not in RANKINGS:
+        abort(404)
+    return _servir_secao(f'rankings/{dataset}')
+
+
+@api.route('/graficos')
+def graficos():
+    return _servir_secao('graficos')
+
+
+@api.route('/datas')
+def datas():
+    return _servir_secao('datas')
+
+
+# ===================================================================
+# EVENTOS (SERVER-SENT EVENTS)
+# ===================================================================
+# Um único observador por processo consulta a versão dos dados (tb_metadados_carga)
+# e acorda todas as conexões abertas quando ela muda. As conexões ficam paradas em
+# uma Condition; servidas pelo gevent (veja app.py) cada uma é um greenlet, e
+# centenas de telas conectadas não ocupam uma thread cada.
+INTERVALO_OBSERVADOR_SEGUNDOS = 15
+INTERVALO_KEEPALIVE_SEGUNDOS = 25
+
+_ESTADO_EVENTOS = {'versao': None, 'sequencia': 0, 'conexoes': 0, 'observador': None}
+_CONDICAO_EVENTOS = threading.Condition()
+
+
+def _observar_versao():
+    """Laço do observador: avisa as conexões quando a versão dos dados muda."""
+    while True:
+        versao = versao_dados_atual()
+        with _CONDICAO_EVENTOS:
+            if versao is not None and versao != _ESTADO_EVENTOS['versao']:
+                if _ESTADO_EVENTOS['versao'] is not None:
+                    print(f"[INFO] Nova carga do ETL ({versao}). Avisando {_ESTADO_EVENTOS['conexoes']} conexão(ões).")
+                _ESTADO_EVENTOS['versao'] = versao
+                _ESTADO_EVENTOS['sequencia'] += 1
+                _CONDICAO_EVENTOS.notify_all()
+        time.sleep(INTERVALO_OBSERVADOR_SEGUNDOS)
+
+
+def _garantir_observador():
+    """Inicia o observador na primeira conexão (uma vez por processo)."""
+    with _CONDICAO_EVENTOS:
+        observador = _ESTADO_EVENTOS['observador']
+        if observador is None or not observador.is_alive():
+            observador = threading.Thread(target=_observar_versao, name='observador-versao', daemon=True)
+            observador.start()
+            _ESTADO_EVENTOS['observador'] = observador
+
+
+def _evento(nome, dados):
+    return f"event: {nome}\ndata: {json.dumps(dados, separators=(',', ':'))}\n\n"
+
+
+def _fluxo_eventos():
+    """Gera o stream SSE de uma conexão: a versão atual e, depois, cada nova versão publicada."""
+    with _CONDICAO_EVENTOS:
+        _ESTADO_EVENTOS['conexoes'] += 1
+        sequencia_vista = _ESTADO_EVENTOS['sequencia']
+        versao = _ESTADO_EVENTOS['versao']
+    try:
+        # Em caso de queda, o navegador reconecta sozinho após 10 s
+        yield "retry: 10000\n\n"
+        if versao is not None:
+            yield _evento('versao', {'versao': versao})
+        while True:
+            with _CONDICAO_EVENTOS:
+                mudou = _CONDICAO_EVENTOS.wait_for(
+                    lambda: _ESTADO_EVENTOS['sequencia'] != sequencia_vista, timeout=INTERVALO_KEEPALIVE_SEGUNDOS
+                )
+                sequencia_vista = _ESTADO_EVENTOS['sequencia']
+                versao = _ESTADO_EVENTOS['versao']
+            # Comentário SSE periódico mantém a conexão aberta em proxies e detecta clientes desconectados
+            yield _evento('versao', {'versao': versao}) if mudou else ": keepalive\n\n"
+    finally:
+        with _CONDICAO_EVENTOS:
+            _ESTADO_EVENTOS['conexoes'] -= 1
+
+
+@api.route('/eventos')
+def eventos():
+    """Stream SSE: envia o evento 'versao' a cada nova carga do ETL publicada."""
+    _garantir_observador()
+    resposta = Response(_fluxo_eventos(), mimetype='text/event-stream')
+    resposta.headers['Cache-Control'] = 'no-cache'
+    resposta.headers['X-Accel-Buffering'] = 'no'
+    return resposta
+
+
+def estatisticas_eventos():
+    """Quantidade de conexões SSE abertas e a última versão anunciada."""
+    with _CONDICAO_EVENTOS:
+        return {'conexoes': _ESTADO_EVENTOS['conexoes'], 'versao': _ESTADO_EVENTOS['versao']}
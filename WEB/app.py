@@ -2,11 +2,34 @@
 # ARQUIVO: app.py (MODIFICADO)
 # Adicionada a nova rota /graficos.
 # ===================================================================
-from flask import Flask, render_template
-from datetime import datetime
+# Executado diretamente, o servidor usa o gevent quando instalado: cada conexão
+# (inclusive as de /api/eventos, que ficam abertas) vira um greenlet em vez de uma thread.
+# O patch precisa acontecer antes de qualquer outro import.
+if __name__ == '__main__':
+    try:
+        from gevent import monkey
+        monkey.patch_all()
+    except ImportError:
+        monkey = None
+
+from flask import Flask, render_template, jsonify, request, make_response, Response
+from datetime import datetime, timezone
+import functools
+import gzip
+import hashlib
 import locale
+import os
+import threading
 # Importa a nova função do database
 from banco.database import fetch_kpi_data, fetch_ranking_data, fetch_ranking_nla_nle, fetch_dados_graficos , fetch_update_dates_separately
+from banco.database import estatisticas_cache, limpar_cache, escopo_requisicao, versao_dados_atual, falhas_da_requisicao
+from api import api, estatisticas_eventos
+
+# Brotli é opcional: sem o pacote, as respostas são comprimidas só com gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # --- Configurações Iniciais ---
 try:
@@ -15,21 +38,201 @@ except locale.Error:
     print("Aviso: Localidade 'pt_BR.UTF-8' não encontrada.")
 
 app = Flask(__name__)
+app.register_blueprint(api)
+
+# Intervalo com que as páginas consultam /api/version para atualizar os dados sem recarregar
+INTERVALO_ATUALIZACAO_SEGUNDOS = 60
+
+# --- Cache HTTP e Compressão ---
+# Estáticos com ?v=<hash do conteúdo> podem ficar um ano no cache do navegador.
+CACHE_ESTATICOS_SEGUNDOS = 365 * 24 * 3600
+# Respostas menores que isso não compensam a compressão.
+TAMANHO_MINIMO_COMPRESSAO = 500
+TIPOS_COMPRIMIVEIS = {'text/html', 'text/css', 'application/javascript', 'text/javascript', 'application/json'}
+# Níveis de compressão: as respostas com validador (páginas e API por versão dos dados,
+# estáticos por conteúdo) são comprimidas uma vez por processo e guardadas, então podem
+# usar um nível alto; as demais são comprimidas a cada requisição, com um nível barato.
+QUALIDADE_BROTLI = {'guardada': 11, 'por_requisicao': 5}
+NIVEL_GZIP = {'guardada': 9, 'por_requisicao': 6}
+# Quantidade máxima de respostas comprimidas guardadas por processo
+MAX_COMPRIMIDAS = 256
+
+# (caminho com a query, ETag, codificação) -> corpo comprimido
+_COMPRIMIDAS = {}
+_TRAVA_COMPRIMIDAS = threading.Lock()
+
+
+def _hash_pasta(pasta):
+    """Hash do conteúdo de todos os arquivos da pasta (igual em todos os processos do servidor)."""
+    sha = hashlib.sha1()
+    for raiz, _, arquivos in sorted(os.walk(pasta)):
+        for nome in sorted(arquivos):
+            caminho = os.path.join(raiz, nome)
+            sha.update(os.path.relpath(caminho, pasta).encode('utf-8'))
+            with open(caminho, 'rb') as f:
+                sha.update(f.read())
+    return sha.hexdigest()[:12]
+
+
+# Muda a cada alteração dos templates, invalidando os ETags das páginas
+VERSAO_TEMPLATES = _hash_pasta(os.path.join(app.root_path, app.template_folder))
+_FINGERPRINTS_ESTATICOS = {}
+
+
+def _fingerprint_estatico(filename):
+    """Hash curto do conteúdo de um arquivo de static/, calculado uma vez por processo."""
+    if filename not in _FINGERPRINTS_ESTATICOS:
+        try:
+            with open(os.path.join(app.static_folder, filename), 'rb') as f:
+                _FINGERPRINTS_ESTATICOS[filename] = hashlib.sha1(f.read()).hexdigest()[:10]
+        except OSError:
+            _FINGERPRINTS_ESTATICOS[filename] = None
+    return _FINGERPRINTS_ESTATICOS[filename]
+
+
+@app.url_defaults
+def _adicionar_fingerprint_estatico(endpoint, values):
+    """Faz url_for('static', ...) gerar /static/<arquivo>?v=<hash>."""
+    if endpoint == 'static' and 'filename' in values and 'v' not in values:
+        fingerprint = _fingerprint_estatico(values['filename'])
+        if fingerprint:
+            values['v'] = fingerprint
+
+
+def _data_da_versao(versao):
+    """Converte a versão dos dados (data/hora local em texto) para datetime UTC, sem microssegundos."""
+    try:
+        return datetime.fromisoformat(versao).replace(microsecond=0).astimezone(timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def pagina_condicional(funcao):
+    """
+    Decorador das páginas do dashboard: gera ETag/Last-Modified a partir da última carga do ETL
+    e responde 304 Not Modified antes de qualquer consulta quando o navegador já tem a página.
+    Se alguma consulta falhou e a página saiu com valores substitutos, ela é enviada sem
+    validadores e com 'no-store', para não ser reaproveitada depois que o banco voltar.
+    """
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        versao = versao_dados_atual()
+        if versao is None:
+            # Sem a versão dos dados não há como validar: responde a página completa
+            return funcao(*args, **kwargs)
+
+        etag = hashlib.sha1(f"{request.endpoint}|{versao}|{VERSAO_TEMPLATES}".encode('utf-8')).hexdigest()
+        ultima_modificacao = _data_da_versao(versao)
+
+        if request.if_none_match:
+            nao_modificada = request.if_none_match.contains_weak(etag)
+        else:
+            nao_modificada = bool(ultima_modificacao and request.if_modified_since and
+                                  ultima_modificacao <= request.if_modified_since)
+        if nao_modificada:
+            resposta = Response(status=304)
+        else:
+            # O escopo aberto aqui é o mesmo usado pela página, para ler as falhas depois de renderizar
+            with escopo_requisicao():
+                resposta = make_response(funcao(*args, **kwargs))
+                falhas = falhas_da_requisicao()
+            if falhas:
+                print(f"[AVISO] {request.path} montada com falhas de consulta ({', '.join(falhas)}); enviada sem cache.")
+                resposta.headers['Cache-Control'] = 'no-store'
+                return resposta
+
+        # ETag fraco: o mesmo conteúdo pode ser enviado com ou sem compressão
+        resposta.set_etag(etag, weak=True)
+        if ultima_modificacao:
+            resposta.last_modified = ultima_modificacao
+        # O navegador guarda a página, mas sempre revalida (barato: 304 sem consultar o banco)
+        resposta.headers['Cache-Control'] = 'no-cache'
+        return resposta
+
+    return envoltorio
+
+
+def _comprimir(dados, codificacao, etag):
+    """
+    Comprime o corpo da resposta. Com ETag o conteúdo é o mesmo até a próxima carga do ETL
+    (ou mudança do arquivo): é comprimido uma vez e reaproveitado nas requisições seguintes.
+    """
+    if not etag:
+        if codificacao == 'br':
+            return brotli.compress(dados, quality=QUALIDADE_BROTLI['por_requisicao'])
+        return gzip.compress(dados, compresslevel=NIVEL_GZIP['por_requisicao'])
+
+    chave = (request.full_path, etag, codificacao)
+    with _TRAVA_COMPRIMIDAS:
+        comprimido = _COMPRIMIDAS.get(chave)
+    if comprimido is None:
+        if codificacao == 'br':
+            comprimido = brotli.compress(dados, quality=QUALIDADE_BROTLI['guardada'])
+        else:
+            comprimido = gzip.compress(dados, compresslevel=NIVEL_GZIP['guardada'])
+        with _TRAVA_COMPRIMIDAS:
+            if len(_COMPRIMIDAS) >= MAX_COMPRIMIDAS:
+                # Versões antigas dos dados não voltam: recomeça do zero em vez de controlar a idade
+                _COMPRIMIDAS.clear()
+            _COMPRIMIDAS[chave] = comprimido
+    return comprimido
+
+
+@app.after_request
+def _cache_e_compressao(resposta):
+    """Cabeçalhos de cache dos estáticos versionados e compressão gzip/brotli das respostas de texto."""
+    if request.endpoint == 'static' and request.args.get('v'):
+        resposta.headers['Cache-Control'] = f"public, max-age={CACHE_ESTATICOS_SEGUNDOS}, immutable"
+
+    if resposta.status_code != 200 or 'Content-Encoding' in resposta.headers or \
+            resposta.mimetype not in TIPOS_COMPRIMIVEIS:
+        return resposta
+
+    codificacoes = request.accept_encodings
+    if brotli is not None and codificacoes['br']:
+        codificacao = 'br'
+    elif codificacoes['gzip']:
+        codificacao = 'gzip'
+    else:
+        return resposta
+
+    # Arquivos estáticos vêm como stream; lê o conteúdo para poder comprimir
+    resposta.direct_passthrough = False
+    dados = resposta.get_data()
+    if len(dados) < TAMANHO_MINIMO_COMPRESSAO:
+        return resposta
+
+    etag, fraco = resposta.get_etag()
+    resposta.set_data(_comprimir(dados, codificacao, etag))
+    resposta.headers['Content-Encoding'] = codificacao
+    if etag and not fraco:
+        resposta.set_etag(etag, weak=True)
+    resposta.vary.add('Accept-Encoding')
+    return resposta
+
+
+@app.context_processor
+def _variaveis_templates():
+    return {'intervalo_atualizacao': INTERVALO_ATUALIZACAO_SEGUNDOS}
+
 
 @app.route('/')
+@pagina_condicional
 def index():
     """
     Rota principal que busca os dados e renderiza a página do dashboard.
     """
-    kpi_data = fetch_kpi_data()
-    ranking_agua = fetch_ranking_data('tb_agua', 'total_jan__atual_2025')
-    ranking_esgoto = fetch_ranking_data('tb_esgoto', 'total_jan__atual_2025')
-    ranking_nla_nle = fetch_ranking_nla_nle()
-    
-    #data_atualizacao = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+    # Dentro do escopo, os rankings usados nas tabelas e nos KPIs são consultados uma única vez
+    with escopo_requisicao():
+        ranking_agua = fetch_ranking_data('tb_agua')
+        ranking_esgoto = fetch_ranking_data('tb_esgoto')
+        ranking_nla_nle = fetch_ranking_nla_nle()
+        kpi_data = fetch_kpi_data()
 
-    # Chama a nova função e desempacota os 3 valores em variáveis separadas
-    data_nla_nle, data_agua, data_esgoto = fetch_update_dates_separately()
+        #data_atualizacao = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+
+        # Chama a nova função e desempacota os 3 valores em variáveis separadas
+        data_nla_nle, data_agua, data_esgoto = fetch_update_dates_separately()
 
     return render_template(
         'dashboard.html', 
@@ -44,6 +247,7 @@ def index():
     )
 
 @app.route('/graficos')
+@pagina_condicional
 def graficos():
     """
     Nova rota para a página de gráficos.
@@ -59,10 +263,30 @@ def graficos():
         data_atualizacao=data_esgoto
     )
 
+@app.route('/admin/cache')
+def admin_cache():
+    """
+    Mostra a taxa de acerto do cache das consultas e a idade de cada entrada.
+    """
+    return jsonify({**estatisticas_cache(), 'eventos': estatisticas_eventos()})
+
+@app.route('/admin/cache/limpar', methods=['POST'])
+def admin_cache_limpar():
+    """
+    Descarta o cache das consultas (a próxima página busca tudo no banco).
+    """
+    limpar_cache()
+    return jsonify({'status': 'cache limpo'})
+
 if __name__ == '__main__':
     print("--- Dashboard Web Local ---")
     print("Para visualizar, abra seu navegador e acesse:")
     print("[http://127.0.0.1:5000](http://127.0.0.1:5000) (no seu computador)")
     print("http://SEU_IP_LOCAL:5000 (em outros dispositivos na mesma rede)")
     print("Pressione CTRL+C para encerrar o servidor.")
-    app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
+    if monkey is not None:
+        from gevent.pywsgi import WSGIServer
+        WSGIServer(('0.0.0.0', 5000), app).serve_forever()
+    else:
+        print("[AVISO] gevent não instalado: usando o servidor de desenvolvimento (uma thread por conexão).")
+        app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
\ No newline at end of file
@@ -0,0 +1,125 @@
+# ===================================================================
+# ARQUIVO: contar_consultas.py
+# Conta os comandos SQL enviados ao banco por renderização de / e confere que
+# cada consulta distinta roda uma única vez por página (os KPIs reaproveitam os
+# rankings já buscados) e que, com o cache aquecido, nenhuma consulta é feita.
+# Não acessa o MySQL: troca o engine de banco/database.py por um SQLite em memória
+# (com o banco 'sandbox' anexado) preenchido com as tabelas de resumo do ETL.
+# Termina com código 1 se a contagem for diferente da esperada.
+# Execute a partir da pasta WEB: python -m banco.contar_consultas
+# ===================================================================
+import sqlite3
+import sys
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+from banco import database
+from banco.database import limpar_cache, versao_dados_atual
+
+# Por renderização de / com as tabelas de resumo publicadas:
+#   ano padrão de Água e de Esgoto: tb_metadados_carga, numa consulta para as duas (1)
+#   ranking de Água e de Esgoto: resumo (1 cada)
+#   ranking de Novas Ligações: resumo (1); KPIs: nenhuma (reaproveitam os rankings)
+#   datas de atualização: tb_metadados_carga (1)
+CONSULTAS_ESPERADAS_FRIO = 5
+CONSULTAS_ESPERADAS_QUENTE = 0
+
+_TABELAS_EXEMPLO = [
+    "CREATE TABLE tb_metadados_carga (tabela VARCHAR(64), data_extracao_etl TIMESTAMP, ano_mais_recente SMALLINT, "
+    "atualizado_em TIMESTAMP)",
+    "CREATE TABLE tb_incremento_mensal (tipo VARCHAR(32), sup VARCHAR(255), municipio VARCHAR(255), "
+    "mes DATE, ano SMALLINT, quantidade INT)",
+    "CREATE TABLE tb_resumo_ranking_incrementos (dataset VARCHAR(64), ano SMALLINT, posicao INT, "
+    "sup VARCHAR(255), total BIGINT)",
+    "CREATE TABLE tb_resumo_ranking_nla_nle (posicao INT, superintendencia VARCHAR(255), total_agua BIGINT, "
+    "total_esgoto BIGINT, total_geral BIGINT)",
+]
+
+
+def criar_banco_exemplo():
+    """SQLite em memória com algumas SUPs nas tabelas lidas por /."""
+    engine = create_engine(
+        'sqlite://', poolclass=StaticPool, connect_args={'detect_types': sqlite3.PARSE_DECLTYPES}
+    )
+
+    @event.listens_for(engine, "connect")
+    def _preparar_conexao(conexao, _):
+        conexao.execute("ATTACH ':memory:' AS sandbox")
+        conexao.create_function('YEAR', 1, lambda valor: None if valor is None else int(str(valor)[:4]))
+
+    with engine.begin() as conexao:
+        for comando in _TABELAS_EXEMPLO:
+            conexao.exec_driver_sql(comando)
+        for tabela, ano in (('tb_nla_nle', None), ('tb_agua', 2025), ('tb_esgoto', 2025)):
+            conexao.exec_driver_sql(
+                "INSERT INTO tb_metadados_carga VALUES (?, '2025-05-01 10:00:00', ?, '2025-05-01 10:05:00')",
+                (tabela, ano)
+            )
+        for tipo in ('ÁGUA', 'ESGOTO'):
+            for posicao in range(1, 11):
+                conexao.exec_driver_sql(
+                    "INSERT INTO tb_incremento_mensal VALUES (?, ?, 'MUNICIPIO', '2025-04-01', 2025, ?)",
+                    (tipo, f"SUP {posicao}", 1000 - posicao)
+                )
+                conexao.exec_driver_sql(
+                    "INSERT INTO tb_resumo_ranking_incrementos VALUES (?, 2025, ?, ?, ?)",
+                    (tipo, posicao, f"SUP {posicao}", 1000 - posicao)
+                )
+        for posicao in range(1, 11):
+            conexao.exec_driver_sql(
+                "INSERT INTO tb_resumo_ranking_nla_nle VALUES (?, ?, ?, ?, ?)",
+                (posicao, f"SUP {posicao}", 100 - posicao, 50 - posicao, 150 - 2 * posicao)
+            )
+    return engine
+
+
+def contar_renderizacao(cliente, engine):
+    """Renderiza / e devolve (resposta, comandos SQL emitidos durante a requisição)."""
+    # A versão dos dados é conferida antes, fora da página (no máximo a cada 30 s)
+    versao_dados_atual()
+    comandos = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        comandos.append((" ".join(statement.split()), repr(parameters)))
+
+    event.listen(engine, "before_cursor_execute", _registrar)
+    try:
+        resposta = cliente.get('/')
+    finally:
+        event.remove(engine, "before_cursor_execute", _registrar)
+    return resposta, comandos
+
+
+def conferir_contagens():
+    """Imprime a contagem fria e quente de / e retorna a lista de divergências."""
+    database.engine = criar_banco_exemplo()
+    from app import app
+
+    cliente = app.test_client()
+    divergencias = []
+    limpar_cache()
+    for cenario, esperado in (("cache frio", CONSULTAS_ESPERADAS_FRIO), ("cache quente", CONSULTAS_ESPERADAS_QUENTE)):
+        resposta, comandos = contar_renderizacao(cliente, database.engine)
+        print(f"[INFO] / com {cenario}: status {resposta.status_code}, {len(comandos)} comando(s) SQL "
+              f"(esperado: {esperado})")
+        for comando, parametros in comandos:
+            print(f"        {comando[:90]} {parametros}")
+
+        if resposta.status_code != 200 or not resposta.headers.get('ETag'):
+            divergencias.append(f"{cenario}: página com falha de consulta (status {resposta.status_code}, sem ETag)")
+        if len(comandos) != esperado:
+            divergencias.append(f"{cenario}: {len(comandos)} comandos SQL, esperado {esperado}")
+        if len(set(comandos)) != len(comandos):
+            divergencias.append(f"{cenario}: a mesma consulta rodou mais de uma vez na página")
+    return divergencias
+
+
+if __name__ == "__main__":
+    divergencias = conferir_contagens()
+    if divergencias:
+        print(f"\n[ERRO] {len(divergencias)} divergência(s):")
+        for divergencia in divergencias:
+            print(f"  - {divergencia}")
+        sys.exit(1)
+    print("\n[SUCESSO] Cada consulta de / roda uma única vez e o cache quente não consulta o banco.")
@@ -1,9 +1,14 @@
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, event
 import urllib.parse
-from datetime import datetime
+from datetime import date, datetime
 import locale
 import os
+import time
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
 
 # --- Configuração do Banco de Dados ---
 MYSQL_HOST = '10.51.109.226'
@@ -16,80 +21,375 @@ db_connection_str = (
 )
 engine = create_engine(db_connection_str,pool_recycle=3600 )
 
+# Quantidade de comandos SQL enviados ao banco desde o início do servidor
+# (exibido em /admin/cache para conferir quantas consultas cada página gera).
+_CONTADOR_CONSULTAS = {'total': 0}
 
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    _CONTADOR_CONSULTAS['total'] += 1
+
+
+# ===================================================================
+# CACHE EM MEMÓRIA DOS RESULTADOS DAS CONSULTAS
+# ===================================================================
+# Os dados só mudam quando o ETL roda. Os resultados ficam em memória por até
+# CACHE_TTL_SEGUNDOS e são descartados assim que a versão dos dados (última
+# carga registrada em tb_metadados_carga) muda. A versão é consultada no máximo a cada
+# INTERVALO_VERIFICACAO_VERSAO segundos.
+CACHE_TTL_SEGUNDOS = 600
+INTERVALO_VERIFICACAO_VERSAO = 30
+
+_CACHE = {}
+_ESTADO_CACHE = {'versao': None, 'verificado_em': 0.0, 'acertos': 0, 'falhas': 0}
+_TRAVA_CACHE = threading.Lock()
+
+
+def buscar_versao_dados():
+    """
+    Retorna a versão atual dos dados: o horário da última carga registrada em
+    tb_metadados_carga (leitura de poucas linhas). Enquanto a tabela de metadados não
+    existir, usa a maior data_extracao_etl entre as tabelas do ETL.
+    """
+    try:
+        with engine.connect() as connection:
+            versao = connection.execute(text("SELECT MAX(atualizado_em) FROM tb_metadados_carga")).scalar()
+        if versao is not None:
+            return str(versao)
+    except Exception:
+        pass
+
+    query = text("""
+        SELECT GREATEST(
+            COALESCE((SELECT MAX(data_extracao_etl) FROM sandbox.tb_nla_nle), '1900-01-01'),
+            COALESCE((SELECT MAX(data_extracao_etl) FROM sandbox.tb_agua), '1900-01-01'),
+            COALESCE((SELECT MAX(data_extracao_etl) FROM sandbox.tb_esgoto), '1900-01-01'),
+            COALESCE((SELECT MAX(data_extracao_etl) FROM sandbox.tb_dados_realizados), '1900-01-01')
+        ) AS versao
+    """)
+    with engine.connect() as connection:
+        return str(connection.execute(query).scalar())
+
+
+def _verificar_versao_cache():
+    """Consulta a versão dos dados (respeitando o intervalo) e limpa o cache se ela mudou."""
+    agora = time.time()
+    with _TRAVA_CACHE:
+        if agora - _ESTADO_CACHE['verificado_em'] < INTERVALO_VERIFICACAO_VERSAO:
+            return
+        _ESTADO_CACHE['verificado_em'] = agora
+
+    try:
+        versao = buscar_versao_dados()
+    except Exception as e:
+        print(f"[AVISO] Não foi possível verificar a versão dos dados: {e}")
+        return
+
+    with _TRAVA_CACHE:
+        if versao != _ESTADO_CACHE['versao']:
+            if _ESTADO_CACHE['versao'] is not None:
+                print(f"[INFO] Nova carga do ETL detectada ({versao}). Limpando o cache do dashboard.")
+            _CACHE.clear()
+            _ESTADO_CACHE['versao'] = versao
+
+
+def versao_dados_atual():
+    """
+    Retorna a versão dos dados em uso (texto com a data/hora da última carga), ou None se
+    ela ainda não pôde ser consultada. Consulta o banco no máximo a cada INTERVALO_VERIFICACAO_VERSAO.
+    """
+    _verificar_versao_cache()
+    with _TRAVA_CACHE:
+        return _ESTADO_CACHE['versao']
+
+
+# Memo da requisição atual: dentro de escopo_requisicao(), cada consulta distinta
+# roda no máximo uma vez, mesmo que o cache global esteja expirado ou desligado.
+_MEMO_REQUISICAO = contextvars.ContextVar('memo_requisicao', default=None)
+# Falhas de consulta da requisição atual: as funções fetch_* que devolvem valores
+# substitutos (ranking vazio, KPIs zerados, "Erro na consulta") registram aqui,
+# para a página não ser guardada pelo navegador nem pela API como se estivesse correta.
+_FALHAS_REQUISICAO = contextvars.ContextVar('falhas_requisicao', default=None)
+
+
+@contextmanager
+def escopo_requisicao():
+    """
+    Abre o memo de consultas da requisição (uso: with escopo_requisicao(): ...).
+    Dentro de um escopo já aberto, continua usando o mesmo memo e as mesmas falhas.
+    """
+    if _MEMO_REQUISICAO.get() is not None:
+        yield
+        return
+    token_memo = _MEMO_REQUISICAO.set({})
+    token_falhas = _FALHAS_REQUISICAO.set([])
+    try:
+        yield
+    finally:
+        _FALHAS_REQUISICAO.reset(token_falhas)
+        _MEMO_REQUISICAO.reset(token_memo)
+
+
+def registrar_falha_consulta(descricao):
+    """Anota, no escopo da requisição, que uma consulta falhou e um valor substituto foi usado."""
+    falhas = _FALHAS_REQUISICAO.get()
+    if falhas is not None:
+        falhas.append(descricao)
+
+
+@contextmanager
+def coletar_falhas_consulta():
+    """Coleta as falhas de consulta registradas dentro do bloco (e as repassa ao escopo de fora)."""
+    falhas = []
+    token = _FALHAS_REQUISICAO.set(falhas)
+    try:
+        yield falhas
+    finally:
+        _FALHAS_REQUISICAO.reset(token)
+        for falha in falhas:
+            registrar_falha_consulta(falha)
+
+
+def falhas_da_requisicao():
+    """Consultas que falharam no escopo atual, sem repetições (lista vazia fora de escopo_requisicao)."""
+    return list(dict.fromkeys(_FALHAS_REQUISICAO.get() or ()))
+
+
+def com_cache(funcao):
+    """
+    Decorador que guarda em memória o resultado da função, por combinação de argumentos.
+    Resultados vazios e os montados com alguma falha de consulta não são guardados.
+    """
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        chave = (funcao.__name__, args, tuple(sorted(kwargs.items())))
+        memo = _MEMO_REQUISICAO.get()
+        if memo is None or chave not in memo:
+            entrada = _buscar_com_cache(funcao, chave, args, kwargs)
+            if memo is not None:
+                memo[chave] = entrada
+        else:
+            entrada = memo[chave]
+        resultado, falhas = entrada
+        # Repassa as falhas também nas leituras do memo: quem chamou (ex.: fetch_kpi_data,
+        # que reaproveita os rankings) montou o seu resultado a partir de um valor substituto
+        for falha in falhas:
+            registrar_falha_consulta(falha)
+        return resultado
+
+    return envoltorio
+
+
+def _buscar_com_cache(funcao, chave, args, kwargs):
+    """
+    Consulta o cache global e, em caso de falha, executa a função e guarda o resultado.
+    Retorna (resultado, falhas de consulta registradas durante a execução).
+    """
+    _verificar_versao_cache()
+    agora = time.time()
+    with _TRAVA_CACHE:
+        entrada = _CACHE.get(chave)
+        if entrada and agora - entrada[1] < CACHE_TTL_SEGUNDOS:
+            _ESTADO_CACHE['acertos'] += 1
+            return entrada[0], []
+        _ESTADO_CACHE['falhas'] += 1
+
+    # As falhas desta execução são coletadas à parte: um valor substituto não pode
+    # ficar no cache como se fosse o resultado da consulta
+    falhas = []
+    token = _FALHAS_REQUISICAO.set(falhas)
+    try:
+        resultado = funcao(*args, **kwargs)
+    finally:
+        _FALHAS_REQUISICAO.reset(token)
+
+    vazio = resultado is None or (hasattr(resultado, 'empty') and resultado.empty) or \
+        (isinstance(resultado, dict) and not resultado)
+    if not vazio and not falhas:
+        with _TRAVA_CACHE:
+            _CACHE[chave] = (resultado, time.time())
+    return resultado, falhas
+
+
+def limpar_cache():
+    """Descarta todos os resultados em cache (a próxima requisição consulta o banco)."""
+    with _TRAVA_CACHE:
+        _CACHE.clear()
+        _ESTADO_CACHE['verificado_em'] = 0.0
+
+
+def estatisticas_cache():
+    """Retorna a taxa de acerto, a versão dos dados e a idade de cada entrada do cache."""
+    agora = time.time()
+    with _TRAVA_CACHE:
+        total = _ESTADO_CACHE['acertos'] + _ESTADO_CACHE['falhas']
+        return {
+            'versao_dados': _ESTADO_CACHE['versao'],
+            'acertos': _ESTADO_CACHE['acertos'],
+            'falhas': _ESTADO_CACHE['falhas'],
+            'taxa_acerto': round(_ESTADO_CACHE['acertos'] / total, 3) if total else 0.0,
+            'ttl_segundos': CACHE_TTL_SEGUNDOS,
+            'consultas_sql': _CONTADOR_CONSULTAS['total'],
+            'entradas': [
+                {'consulta': f"{chave[0]}{chave[1] or ''}{dict(chave[2]) or ''}", 'idade_segundos': round(agora - criado_em, 1)}
+                for chave, (_, criado_em) in _CACHE.items()
+            ],
+        }
+
+
+def _diferenca_primeiro_segundo(ranking, coluna):
+    """Diferença entre o 1º e o 2º lugar de um ranking já ordenado (0 se houver menos de 2 linhas)."""
+    if len(ranking) < 2:
+        return 0
+    return ranking[coluna].iloc[0] - ranking[coluna].iloc[1]
+
+
+@com_cache
 def fetch_kpi_data():
     """
     Busca os dados agregados para os cards de KPI.
-    Para Água e Esgoto, calcula a diferença entre o 1º e 2º lugar do ranking.
+    Para Água, Esgoto e NLA/NLE, calcula a diferença entre o 1º e 2º lugar do ranking.
+    Os KPIs são derivados dos mesmos rankings top-10 exibidos na página, então dentro de
+    escopo_requisicao() nenhuma consulta extra é feita para os cards.
     """
     kpis = {'total_agua': 0, 'total_esgoto': 0, 'nla': 0, 'nle': 0, 'total_nla_nle': 0}
     try:
-        # --- KPI Incrementos Água: Diferença entre 1º e 2º lugar ---
-        print("[INFO] Calculando KPI de diferença para Incrementos Água...")
-        
-        ranking_agua_top2 = fetch_ranking_data('tb_agua','total_jan__atual_2025', limit=2)
-        
-        if len(ranking_agua_top2) >= 2:
-            
-            primeiro_lugar_agua = ranking_agua_top2.iloc[0]['total']
-            segundo_lugar_agua = ranking_agua_top2.iloc[1]['total']
-            # O valor do KPI agora é a diferença
-            kpis['total_agua'] = primeiro_lugar_agua - segundo_lugar_agua
-        
-        else:
-            # Se houver menos de 2 superintendências, a diferença é 0.
-            kpis['total_agua'] = 0
-        # --- KPI Incrementos Esgoto: Diferença entre 1º e 2º lugar ---
-        print("[INFO] Calculando KPI de diferença para Incrementos Esgoto...")
-        
-        ranking_esgoto_top2 = fetch_ranking_data('tb_esgoto','total_jan__atual_2025', limit=2)
-        
-        if len(ranking_esgoto_top2) >= 2:
-            
-            primeiro_lugar_esgoto = ranking_esgoto_top2.iloc[0]['total']
-            segundo_lugar_esgoto = ranking_esgoto_top2.iloc[1]['total']
-            # O valor do KPI agora é a diferença
-            kpis['total_esgoto'] = primeiro_lugar_esgoto - segundo_lugar_esgoto
-        
-        else:
-            kpis['total_esgoto'] = 0
-
-        #RESULTADO DO INCREMENTOS ESTÃO CORRETOs, AGORA VAMOS TRABALAHAR O NLA NLE
-        ranking_nla_nle = fetch_ranking_nla_nle()
+        # --- KPI Incrementos Água / Esgoto: Diferença entre 1º e 2º lugar ---
+        print("[INFO] Calculando KPIs de diferença para Incrementos Água e Esgoto...")
+        ranking_agua = fetch_ranking_data('tb_agua')
+        kpis['total_agua'] = _diferenca_primeiro_segundo(ranking_agua, 'total')
 
-        if not ranking_nla_nle.empty:
-            primeiro_lugar_nla = ranking_nla_nle['total_agua'].iloc[0]
-            segundo_lugar_nla = ranking_nla_nle['total_agua'].iloc[1]
-            kpis['nla'] = primeiro_lugar_nla - segundo_lugar_nla
+        ranking_esgoto = fetch_ranking_data('tb_esgoto')
+        kpis['total_esgoto'] = _diferenca_primeiro_segundo(ranking_esgoto, 'total')
 
-            primeiro_lugar_nle = ranking_nla_nle['total_esgoto'].iloc[0]
-            segundo_lugar_nle = ranking_nla_nle['total_esgoto'].iloc[1]
-            kpis['nle'] = primeiro_lugar_nle - segundo_lugar_nle
-            kpis['total_nla_nle'] = kpis['nla'] + kpis['nle']
-        else:
-            kpis['nla'] = 0
-            kpis['nle'] = 0
+        # --- KPI NLA / NLE ---
+        ranking_nla_nle = fetch_ranking_nla_nle()
+        kpis['nla'] = _diferenca_primeiro_segundo(ranking_nla_nle, 'total_agua')
+        kpis['nle'] = _diferenca_primeiro_segundo(ranking_nla_nle, 'total_esgoto')
+        kpis['total_nla_nle'] = kpis['nla'] + kpis['nle']
         return kpis
     except Exception as e:
         print(f"[ERRO] Falha ao buscar dados de KPI: {e}")
+        registrar_falha_consulta('fetch_kpi_data')
         return kpis
     
-def fetch_ranking_data(table_name, value_col, limit=10):
+def _ler_resumo(query, params=None):
+    """
+    Lê uma tabela de resumo/metadados gerada pelo ETL. Retorna None se ela ainda não existe
+    ou está vazia, para que a função chamadora consulte direto as tabelas brutas.
+    """
+    try:
+        df = pd.read_sql(query, engine, params=params)
+    except Exception as e:
+        print(f"[AVISO] Tabela de resumo indisponível, agregando as tabelas brutas: {e}")
+        return None
+    return None if df.empty else df
+
+
+@com_cache
+def _anos_publicados():
+    """
+    {tabela: ano mais recente com dados} gravado pelo ETL em tb_metadados_carga, numa consulta
+    só para todas as tabelas. Vazio se a tabela ou a coluna ano_mais_recente ainda não existirem.
+    """
+    metadados = _ler_resumo(text("""
+        SELECT tabela, ano_mais_recente FROM tb_metadados_carga
+        WHERE ano_mais_recente IS NOT NULL
+    """))
+    if metadados is None:
+        return {}
+    return {tabela: int(ano) for tabela, ano in zip(metadados['tabela'], metadados['ano_mais_recente'])}
+
+
+def _ano_padrao(tabela_carga, tabela, filtro='', params=None):
+    """
+    Ano exibido quando a página não informa um: o mais recente com dados, publicado pelo ETL
+    em tb_metadados_carga para a carga `tabela_carga`. Cargas anteriores a essa coluna caem no
+    YEAR(MAX(mes)) da tabela bruta. É o mesmo ano para a leitura da tabela de resumo e para a
+    agregação das tabelas brutas, para as duas nunca mostrarem anos diferentes. None se não houver dados.
+    """
+    ano = _anos_publicados().get(tabela_carga)
+    if ano is not None:
+        return ano
+
+    try:
+        with engine.connect() as conn:
+            ano = conn.execute(text(f"SELECT YEAR(MAX(mes)) FROM {tabela} {filtro}"), params or {}).scalar()
+    except Exception as e:
+        print(f"[ERRO] Falha ao buscar o ano mais recente com dados em '{tabela}': {e}")
+        registrar_falha_consulta(f"_ano_padrao({tabela})")
+        return None
+    return None if ano is None else int(ano)
+
 
-    """Busca dados para as tabelas de ranking de Água e Esgoto."""
-    # value_col já deve ser 'total_jan__atual_2025' agora
-    query = text(f"SELECT sup, SUM(`{value_col}`) as total FROM {table_name} GROUP BY sup ORDER BY total DESC LIMIT {limit}")
+def _intervalo_ano(ano):
+    """Parâmetros do filtro por intervalo de meses (índice em `mes`) de um ano."""
+    return {'inicio_ano': date(ano, 1, 1), 'inicio_ano_seguinte': date(ano + 1, 1, 1)}
+
+
+# Tabela de incremento exibida no dashboard -> tipo em tb_incremento_mensal
+TIPOS_INCREMENTO = {'tb_agua': 'ÁGUA', 'tb_esgoto': 'ESGOTO'}
+
+
+@com_cache
+def fetch_ranking_data(table_name, ano=None, limit=10):
+    """
+    Busca dados para as tabelas de ranking de Água e Esgoto: total de janeiro até o último
+    mês publicado do ano, por SUP. Sem `ano`, usa o ano mais recente com dados.
+    """
+    tipo = TIPOS_INCREMENTO[table_name]
+    if ano is None:
+        # As linhas de cada tipo em tb_incremento_mensal vêm da carga de tb_agua / tb_esgoto
+        ano = _ano_padrao(table_name, 'tb_incremento_mensal', "WHERE tipo = :tipo", {'tipo': tipo})
+        if ano is None:
+            return pd.DataFrame(columns=['sup', 'total'])
+
+    resumo = _ler_resumo(
+        text("""
+            SELECT sup, total FROM tb_resumo_ranking_incrementos
+            WHERE dataset = :dataset AND ano = :ano AND posicao <= :limite
+            ORDER BY posicao
+        """),
+        params={'dataset': tipo, 'ano': ano, 'limite': limit}
+    )
+    if resumo is not None:
+        return resumo
+
+    query = text("""
+        SELECT sup, SUM(quantidade) AS total
+        FROM tb_incremento_mensal
+        WHERE tipo = :tipo AND mes >= :inicio_ano AND mes < :inicio_ano_seguinte
+        GROUP BY sup
+        ORDER BY total DESC
+        LIMIT :limite
+    """)
     try:
-        return pd.read_sql(query, engine)
+        return pd.read_sql(query, engine, params={'tipo': tipo, 'limite': limit, **_intervalo_ano(ano)})
     except Exception as e:
         print(f"[ERRO] Falha ao buscar dados de ranking para '{table_name}': {e}")
+        registrar_falha_consulta(f"fetch_ranking_data({table_name})")
         return pd.DataFrame(columns=['sup', 'total'])
 
+@com_cache
 def fetch_ranking_nla_nle(limit=10):
     """
     Busca os dados de Novas Ligações, somando a coluna `quantidade`,
     e gera o ranking geral, ignorando superintendências vazias.
     """
+    resumo = _ler_resumo(
+        text("""
+            SELECT superintendencia, total_agua, total_esgoto, total_geral
+            FROM tb_resumo_ranking_nla_nle
+            WHERE posicao <= :limite
+            ORDER BY posicao
+        """),
+        params={'limite': limit}
+    )
+    if resumo is not None:
+        resumo[['total_agua', 'total_esgoto', 'total_geral']] = resumo[['total_agua', 'total_esgoto', 'total_geral']].astype(int)
+        return resumo
+
     query = text(f"""
         SELECT
             ds_cd_superintendencia,
@@ -116,53 +416,131 @@ def fetch_ranking_nla_nle(limit=10):
         return ranking_df
     except Exception as e:
         print(f"[ERRO] Falha ao criar ranking geral a partir de 'tb_nla_nle': {e}")
+        registrar_falha_consulta('fetch_ranking_nla_nle')
         print("[AVISO] Verifique se as colunas 'ds_cd_superintendencia', 'tipo_ligacao' e 'quantidade' existem na tabela.")
         return pd.DataFrame()
     
-def fetch_dados_graficos():
+# Categorias dos gráficos, na ordem em que são exibidas: gráfico correspondente em
+# tb_dados_realizados e coluna da meta em tb_meta_<ano>
+MAPA_CATEGORIAS_GRAFICOS = pd.DataFrame(
+    [
+        ('AGUA_FORMAL', 'Incremento de Água - Urbano', 'meta_formal_agua'),
+        ('AGUA_INFORMAL', 'Incremento de Água - Rural + Informal', 'meta_informal_agua'),
+        ('ESGOTO_FORMAL', 'Incremento de Esgoto - Urbano', 'meta_formal_esgoto'),
+        ('ESGOTO_INFORMAL', 'Incremento de Esgoto Rural + Informal', 'meta_informal_esgoto'),
+    ],
+    columns=['categoria', 'grafico', 'coluna_meta'],
+)
+CATEGORIAS_GRAFICOS = tuple(MAPA_CATEGORIAS_GRAFICOS['categoria'])
+
+
+@com_cache
+def fetch_dados_graficos(ano=None):
+    """
+    Busca meta x realizado acumulado no ano por superintendência e categoria para os gráficos,
+    ordenados pelo percentual médio de atingimento das metas. Sem `ano`, usa o mais recente.
+    Lê a tabela de resumo tb_resumo_graficos gerada pelo ETL; se ela ainda não existir,
+    agrega direto de tb_dados_realizados e tb_meta_<ano>.
+    """
+    if ano is None:
+        ano = _ano_padrao('tb_dados_realizados', 'sandbox.tb_dados_realizados')
+        if ano is None:
+            return {}
+
+    resumo = _ler_resumo(
+        text("""
+            SELECT superintendencia, categoria, meta, realizado FROM tb_resumo_graficos
+            WHERE ano = :ano
+        """),
+        params={'ano': ano}
+    )
+    if resumo is None:
+        tabelas = _agregar_dados_graficos(ano)
+        if tabelas is None:
+            return {}
+        metas, realizado = tabelas
+    else:
+        print(f"[INFO] {len(resumo)} registros de meta x realizado lidos de tb_resumo_graficos")
+        metas = _pivotar_por_categoria(resumo, 'superintendencia', 'meta')
+        realizado = _pivotar_por_categoria(resumo, 'superintendencia', 'realizado')
+
+    return _montar_dados_graficos(metas, realizado)
+
+
+def _pivotar_por_categoria(df, coluna_sup, coluna_valor):
+    """Formato longo (sup, categoria, valor) -> uma linha por SUP (na ordem em que aparecem) e uma coluna por categoria."""
+    return df.pivot_table(index=coluna_sup, columns='categoria', values=coluna_valor, aggfunc='last', sort=False)
+
+
+def _metas_por_categoria(df_metas, mapa=MAPA_CATEGORIAS_GRAFICOS):
+    """tb_meta_<ano> (uma coluna por meta) -> uma linha por SUP e uma coluna por categoria."""
+    colunas_meta = list(mapa['coluna_meta'])
+    return (
+        df_metas.reindex(columns=['sup', *colunas_meta])
+        .groupby('sup', sort=False)[colunas_meta].last()
+        .rename(columns=dict(zip(mapa['coluna_meta'], mapa['categoria'])))
+    )
+
+
+def _realizado_por_categoria(df_realizado, mapa=MAPA_CATEGORIAS_GRAFICOS):
+    """Realizado acumulado por (SUP, gráfico) -> uma linha por SUP e uma coluna por categoria."""
+    categorias = df_realizado['grafico'].map(mapa.set_index('grafico')['categoria'])
+    return _pivotar_por_categoria(
+        df_realizado.assign(categoria=categorias).dropna(subset=['categoria']),
+        'superintendencia', 'realizado_acumulado'
+    )
+
+
+def _agregar_dados_graficos(ano):
     """
     Busca dados para os gráficos usando CTE para calcular realizado acumulado e inclui as metas.
-    Combina dados de realizado (sandbox.tb_dados_realizados) com metas da tabela tb_meta_2025.
-    Só inclui superintendências que têm metas definidas.
+    Combina dados de realizado (sandbox.tb_dados_realizados) no ano informado
+    com as metas da tabela do mesmo ano (tb_meta_<ano>).
+
+    Returns:
+        tuple: (metas, realizado), DataFrames com uma linha por SUP e uma coluna por
+               categoria, ou None se não houver metas ou a consulta falhar.
     """
-    # Query para buscar as metas da tabela
-    query_metas = text("""
+    # Query para buscar as metas da tabela do ano
+    query_metas = text(f"""
         SELECT 
             sup,
             meta_formal_agua,
             meta_informal_agua,
             meta_formal_esgoto,
             meta_informal_esgoto
-        FROM tb_meta_2025
+        FROM tb_meta_{int(ano)}
         WHERE sup IS NOT NULL
     """)
     
-    # Query para buscar o realizado acumulado (mantém a CTE original)
+    # Realizado acumulado no ano até o último mês de cada (SUP, gráfico). Usa a chave
+    # cronológica `mes` (DATE): a ordem é a do calendário, e não a alfabética de 'março 2025',
+    # e o filtro por intervalo e as partições seguem o índice (superintendencia, grafico, mes).
     query_realizado = text("""
         WITH RealizadoAcumulado AS (
             SELECT
                 superintendencia,
                 grafico,
-                mes_ano,
-                SUM(calculo) OVER (PARTITION BY superintendencia, grafico ORDER BY mes_ano) AS realizado_2025_acumulado
+                mes,
+                SUM(calculo) OVER (PARTITION BY superintendencia, grafico ORDER BY mes) AS realizado_acumulado
             FROM
                 sandbox.tb_dados_realizados
             WHERE
-                mes_ano LIKE '%2025%'
+                mes >= :inicio_ano AND mes < :inicio_ano_seguinte
         ),
         RankingMeses AS (
             SELECT
                 superintendencia,
                 grafico,
-                realizado_2025_acumulado,
-                ROW_NUMBER() OVER (PARTITION BY superintendencia, grafico ORDER BY mes_ano DESC) as rn
+                realizado_acumulado,
+                ROW_NUMBER() OVER (PARTITION BY superintendencia, grafico ORDER BY mes DESC) as rn
             FROM
                 RealizadoAcumulado
         )
         SELECT
             superintendencia,
             grafico,
-            realizado_2025_acumulado
+            realizado_acumulado
         FROM
             RankingMeses
         WHERE
@@ -180,80 +558,72 @@ def fetch_dados_graficos():
         print(f"[INFO] {len(df_metas)} registros de metas encontrados")
         
         # Buscar realizado acumulado
-        df_realizado = pd.read_sql(query_realizado, engine)
+        df_realizado = pd.read_sql(query_realizado, engine, params=_intervalo_ano(ano))
         print(f"[INFO] {len(df_realizado)} registros de realizado encontrados")
         
         if df_metas.empty:
-            print("[AVISO] Nenhuma meta encontrada na tabela tb_meta_2025.")
-            return {}
-        
-        # Organizar os dados no formato esperado pelos gráficos
-        dados_finais = {}
-        
-        # Processar apenas superintendências que têm metas definidas
-        for _, row in df_metas.iterrows():
-            sup_nome = row['sup']
-            dados_finais[sup_nome] = {
-                'AGUA_FORMAL': {'meta': int(row.get('meta_formal_agua', 0)), 'realizado': 0},
-                'AGUA_INFORMAL': {'meta': int(row.get('meta_informal_agua', 0)), 'realizado': 0},
-                'ESGOTO_FORMAL': {'meta': int(row.get('meta_formal_esgoto', 0)), 'realizado': 0},
-                'ESGOTO_INFORMAL': {'meta': int(row.get('meta_informal_esgoto', 0)), 'realizado': 0}
-            }
-        
-        # Processar realizado acumulado apenas para superintendências que têm metas
-        for _, row in df_realizado.iterrows():
-            sup_nome = row['superintendencia']
-            grafico = row['grafico']
-            realizado = int(row['realizado_2025_acumulado'])
-            
-            # Só adicionar realizado se a superintendência tem metas definidas
-            if sup_nome in dados_finais:
-                # Mapear o tipo de gráfico para a chave correta
-                if grafico == 'Incremento de Água - Urbano':
-                    dados_finais[sup_nome]['AGUA_FORMAL']['realizado'] = realizado
-                elif grafico == 'Incremento de Água - Rural + Informal':
-                    dados_finais[sup_nome]['AGUA_INFORMAL']['realizado'] = realizado
-                elif grafico == 'Incremento de Esgoto - Urbano':
-                    dados_finais[sup_nome]['ESGOTO_FORMAL']['realizado'] = realizado
-                elif grafico == 'Incremento de Esgoto Rural + Informal':
-                    dados_finais[sup_nome]['ESGOTO_INFORMAL']['realizado'] = realizado
-        
-        # Calcular ranking de desempenho e ordenar as superintendências
-        ranking_sups = []
-        for sup_nome, dados_sup in dados_finais.items():
-            percentuais = []
-            for categoria, dados in dados_sup.items():
-                meta = dados['meta']
-                realizado = dados['realizado']
-                if meta > 0:
-                    percentual = (realizado / meta) * 100
-                    percentuais.append(percentual)
-            
-            # Calcular percentual médio de todas as metas
-            if percentuais:
-                percentual_medio = sum(percentuais) / len(percentuais)
-                ranking_sups.append((sup_nome, percentual_medio, dados_sup))
-        
-        # Ordenar por percentual médio (do melhor para o pior)
-        ranking_sups.sort(key=lambda x: x[1], reverse=True)
-        
-        # Reconstruir o dicionário ordenado
-        dados_finais_ordenados = {}
-        for sup_nome, percentual_medio, dados_sup in ranking_sups:
-            dados_finais_ordenados[sup_nome] = dados_sup
-        
-        print(f"[SUCESSO] Dados para gráficos processados. {len(dados_finais_ordenados)} superintendências com metas encontradas.")
-        print(f"[INFO] Ranking de desempenho: {[f'{sup} ({percentual:.1f}%)' for sup, percentual, _ in ranking_sups]}")
-        return dados_finais_ordenados
+            print(f"[AVISO] Nenhuma meta encontrada na tabela tb_meta_{ano}.")
+            return None
         
+        return _metas_por_categoria(df_metas), _realizado_por_categoria(df_realizado)
+
     except Exception as e:
         print(f"[ERRO] Falha ao buscar dados para os gráficos: {e}")
-        return {}
+        registrar_falha_consulta('fetch_dados_graficos')
+        return None
+
+
+def _montar_dados_graficos(metas, realizado, categorias=CATEGORIAS_GRAFICOS):
+    """
+    Monta o dicionário dos gráficos ({sup: {categoria: {'meta', 'realizado'}}}), ordenado
+    pelo percentual médio de atingimento das metas (do melhor para o pior).
+    Só entram as superintendências de `metas` com ao menos uma meta maior que zero;
+    em caso de empate, mantém a ordem em que aparecem em `metas`.
+    """
+    categorias = list(categorias)
+    metas = metas.reindex(columns=categorias).fillna(0).astype('int64')
+    realizado = realizado.reindex(index=metas.index, columns=categorias).fillna(0).astype('int64')
+
+    # Percentual de cada meta (NaN onde a meta é zero) e média por superintendência
+    percentuais = realizado.div(metas.where(metas > 0)) * 100
+    percentual_medio = percentuais.mean(axis=1).dropna().sort_values(ascending=False, kind='stable')
+
+    ordem = percentual_medio.index
+    valores_meta = metas.loc[ordem].to_numpy().tolist()
+    valores_realizado = realizado.loc[ordem].to_numpy().tolist()
+    dados_finais_ordenados = {
+        sup_nome: {
+            categoria: {'meta': meta, 'realizado': valor_realizado}
+            for categoria, meta, valor_realizado in zip(categorias, linha_meta, linha_realizado)
+        }
+        for sup_nome, linha_meta, linha_realizado in zip(ordem, valores_meta, valores_realizado)
+    }
+
+    print(f"[SUCESSO] Dados para gráficos processados. {len(dados_finais_ordenados)} superintendências com metas encontradas.")
+    print(f"[INFO] Ranking de desempenho: {[f'{sup} ({percentual:.1f}%)' for sup, percentual in percentual_medio.items()]}")
+    return dados_finais_ordenados
+
 
 def fetch_update_dates_separately():
     """
     Busca a data de extração mais recente de cada tabela e retorna
     como três variáveis separadas.
+    Se a consulta falhar, retorna "Erro na consulta" nas três, fora do cache.
+    """
+    try:
+        return _buscar_datas_atualizacao()
+    except Exception as e:
+        print(f"Erro ao buscar datas de atualização: {e}")
+        registrar_falha_consulta('fetch_update_dates_separately')
+        return "Erro na consulta", "Erro na consulta", "Erro na consulta"
+
+
+@com_cache
+def _buscar_datas_atualizacao():
+    """
+    As datas vêm de tb_metadados_carga em uma única consulta; se a tabela de metadados
+    ainda não existir, consulta o MAX(data_extracao_etl) de cada tabela.
+    Falhas de consulta são propagadas, para o valor substituto nunca entrar no cache.
     """
     # A ordem nesta lista determinará a ordem do retorno
     tabelas = [
@@ -261,27 +631,37 @@ def fetch_update_dates_separately():
         ('ÁGUA', 'tb_agua'),
         ('ESGOTO', 'tb_esgoto')
     ]
-    
-    datas_extracao = []
 
-    try:
-        with engine.connect() as connection:
-            for nome_display, nome_tabela in tabelas:
-                query = text(f"SELECT MAX(data_extracao_etl) as ultima_data FROM sandbox.{nome_tabela};")
-                resultado = connection.execute(query).fetchone()
-                
-                if resultado and resultado.ultima_data:
-                    data_formatada = resultado.ultima_data.strftime('%d/%m/%Y %H:%M:%S')
-                    datas_extracao.append(data_formatada)
-                else:
-                    datas_extracao.append("Data não disponível")
-        
-        # Retorna os três valores na ordem definida
+    metadados = _ler_resumo(text("""
+        SELECT tabela, data_extracao_etl FROM tb_metadados_carga
+        WHERE tabela IN ('tb_nla_nle', 'tb_agua', 'tb_esgoto')
+    """))
+    if metadados is not None:
+        datas_por_tabela = dict(zip(metadados['tabela'], metadados['data_extracao_etl']))
+        datas_extracao = []
+        for nome_display, nome_tabela in tabelas:
+            ultima_data = datas_por_tabela.get(nome_tabela)
+            if ultima_data is not None and not pd.isna(ultima_data):
+                datas_extracao.append(ultima_data.strftime('%d/%m/%Y %H:%M:%S'))
+            else:
+                datas_extracao.append("Data não disponível")
         return datas_extracao[0], datas_extracao[1], datas_extracao[2]
 
-    except Exception as e:
-        print(f"Erro ao buscar datas de atualização: {e}")
-        return "Erro na consulta", "Erro na consulta", "Erro na consulta"
+    datas_extracao = []
+
+    with engine.connect() as connection:
+        for nome_display, nome_tabela in tabelas:
+            query = text(f"SELECT MAX(data_extracao_etl) as ultima_data FROM sandbox.{nome_tabela};")
+            resultado = connection.execute(query).fetchone()
+            
+            if resultado and resultado.ultima_data:
+                data_formatada = resultado.ultima_data.strftime('%d/%m/%Y %H:%M:%S')
+                datas_extracao.append(data_formatada)
+            else:
+                datas_extracao.append("Data não disponível")
+    
+    # Retorna os três valores na ordem definida
+    return datas_extracao[0], datas_extracao[1], datas_extracao[2]
 
 
 
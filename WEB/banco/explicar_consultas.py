@@ -0,0 +1,84 @@
+# ===================================================================
+# ARQUIVO: explicar_consultas.py
+# Confere, com EXPLAIN, se as consultas do dashboard usam índice nas tabelas de dados.
+# Captura o SQL real emitido pelas funções fetch_* (com o cache limpo) e roda
+# EXPLAIN em cada comando. Termina com código 1 se alguma consulta fizer varredura
+# completa em uma tabela de dados.
+# Execute a partir da pasta WEB: python -m banco.explicar_consultas
+# ===================================================================
+import sys
+
+import pymysql
+from sqlalchemy import event
+
+from banco.database import (
+    engine, escopo_requisicao, limpar_cache,
+    fetch_kpi_data, fetch_ranking_data, fetch_ranking_nla_nle, fetch_dados_graficos, fetch_update_dates_separately
+)
+
+# Tabelas que crescem a cada carga: nelas uma varredura completa (type = ALL) é falha.
+# Resumos e metadados têm poucas linhas e podem ser lidos inteiros.
+TABELAS_DE_DADOS = ('tb_agua', 'tb_esgoto', 'tb_incremento_mensal', 'tb_nla_nle', 'tb_dados_realizados')
+
+
+def capturar_consultas():
+    """Executa as consultas de uma renderização de / e /graficos e devolve os SELECTs emitidos."""
+    consultas = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            consultas.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _registrar)
+    try:
+        limpar_cache()
+        with escopo_requisicao():
+            fetch_ranking_data('tb_agua')
+            fetch_ranking_data('tb_esgoto')
+            fetch_ranking_nla_nle()
+            fetch_kpi_data()
+            fetch_update_dates_separately()
+            fetch_dados_graficos()
+    finally:
+        event.remove(engine, "before_cursor_execute", _registrar)
+    return consultas
+
+
+def explicar(statement, parameters):
+    """Roda EXPLAIN para o comando e devolve as linhas do plano como dicionários."""
+    conexao = engine.raw_connection()
+    try:
+        cursor = conexao.cursor(pymysql.cursors.DictCursor)
+        cursor.execute(f"EXPLAIN {statement}", parameters)
+        return cursor.fetchall()
+    finally:
+        conexao.close()
+
+
+def verificar_planos():
+    """
+    Imprime o plano de cada consulta do dashboard e retorna a lista de falhas
+    (varreduras completas em TABELAS_DE_DADOS).
+    """
+    falhas = []
+    for statement, parameters in capturar_consultas():
+        resumo_sql = " ".join(statement.split())[:90]
+        for linha in explicar(statement, parameters):
+            tabela = linha.get('table') or ''
+            varredura_completa = linha.get('type') == 'ALL' and tabela in TABELAS_DE_DADOS
+            status = "FALHA" if varredura_completa else "OK"
+            print(f"[EXPLAIN] {status:<5} | {tabela:<22} | type={linha.get('type')} "
+                  f"key={linha.get('key')} rows={linha.get('rows')} | {resumo_sql}")
+            if varredura_completa:
+                falhas.append((tabela, resumo_sql))
+    return falhas
+
+
+if __name__ == "__main__":
+    falhas = verificar_planos()
+    if falhas:
+        print(f"\n[ERRO] {len(falhas)} consulta(s) sem índice em tabelas de dados:")
+        for tabela, resumo_sql in falhas:
+            print(f"  - {tabela}: {resumo_sql}")
+        sys.exit(1)
+    print("\n[SUCESSO] Todas as consultas do dashboard usam índice nas tabelas de dados.")
@@ -0,0 +1,119 @@
+# ===================================================================
+# ARQUIVO: medir_graficos.py
+# Compara a montagem dos dados dos gráficos (meta x realizado por SUP e categoria)
+# feita linha a linha com iterrows (implementação anterior) e a versão vetorizada
+# de banco/database.py, com dados sintéticos de centenas a milhares de SUPs e
+# dezenas de categorias. Antes de medir, confere que as duas geram o mesmo
+# dicionário, na mesma ordem. Não acessa o banco.
+# Execute a partir da pasta WEB: python -m banco.medir_graficos
+# ===================================================================
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from banco.database import (
+    MAPA_CATEGORIAS_GRAFICOS, _metas_por_categoria, _realizado_por_categoria, _montar_dados_graficos
+)
+
+QUANTIDADES_SUPS = (100, 500, 2000, 8000)
+QUANTIDADES_CATEGORIAS = (4, 16, 64)
+REPETICOES = 3
+
+
+def _mapa_sintetico(num_categorias):
+    """As 4 categorias reais, completadas com categorias fictícias até num_categorias."""
+    extras = pd.DataFrame({
+        'categoria': [f'CATEGORIA_{i}' for i in range(len(MAPA_CATEGORIAS_GRAFICOS), num_categorias)],
+        'grafico': [f'Gráfico {i}' for i in range(len(MAPA_CATEGORIAS_GRAFICOS), num_categorias)],
+        'coluna_meta': [f'meta_{i}' for i in range(len(MAPA_CATEGORIAS_GRAFICOS), num_categorias)],
+    })
+    return pd.concat([MAPA_CATEGORIAS_GRAFICOS, extras], ignore_index=True).head(num_categorias)
+
+
+def _dados_sinteticos(num_sups, mapa, semente=0):
+    """Gera (df_metas, df_realizado) no formato das consultas de tb_meta_2025 e tb_dados_realizados."""
+    gerador = np.random.default_rng(semente)
+    sups = [f'SUP {i:05d}' for i in range(num_sups)]
+
+    df_metas = pd.DataFrame({'sup': sups})
+    for coluna_meta in mapa['coluna_meta']:
+        # ~10% das metas zeradas e algumas SUPs sem nenhuma meta
+        df_metas[coluna_meta] = gerador.integers(1, 5000, num_sups) * (gerador.random(num_sups) > 0.1)
+    df_metas.loc[::50, list(mapa['coluna_meta'])] = 0
+
+    # Realizado só para parte das combinações, mais SUPs sem meta e um gráfico desconhecido
+    sups_realizado = sups + [f'SEM META {i}' for i in range(num_sups // 10)]
+    graficos = list(mapa['grafico']) + ['Gráfico fora do mapa']
+    combinacoes = pd.MultiIndex.from_product([sups_realizado, graficos], names=['superintendencia', 'grafico'])
+    df_realizado = combinacoes.to_frame(index=False).sample(frac=0.8, random_state=semente)
+    df_realizado['realizado_acumulado'] = gerador.integers(0, 6000, len(df_realizado))
+    return df_metas, df_realizado.sort_values(['superintendencia', 'grafico'], ignore_index=True)
+
+
+def montar_com_loops(df_metas, df_realizado, mapa):
+    """Implementação anterior (iterrows + mapeamento gráfico -> categoria + ordenação em Python)."""
+    categoria_da_meta = dict(zip(mapa['coluna_meta'], mapa['categoria']))
+    categoria_do_grafico = dict(zip(mapa['grafico'], mapa['categoria']))
+
+    dados_finais = {}
+    for _, row in df_metas.iterrows():
+        dados_finais[row['sup']] = {
+            categoria: {'meta': int(row.get(coluna_meta, 0)), 'realizado': 0}
+            for coluna_meta, categoria in categoria_da_meta.items()
+        }
+    for _, row in df_realizado.iterrows():
+        sup_nome = row['superintendencia']
+        categoria = categoria_do_grafico.get(row['grafico'])
+        if sup_nome in dados_finais and categoria is not None:
+            dados_finais[sup_nome][categoria]['realizado'] = int(row['realizado_acumulado'])
+
+    ranking_sups = []
+    for sup_nome, dados_sup in dados_finais.items():
+        percentuais = [(d['realizado'] / d['meta']) * 100 for d in dados_sup.values() if d['meta'] > 0]
+        if percentuais:
+            ranking_sups.append((sup_nome, sum(percentuais) / len(percentuais), dados_sup))
+    ranking_sups.sort(key=lambda x: x[1], reverse=True)
+    return {sup_nome: dados_sup for sup_nome, _, dados_sup in ranking_sups}
+
+
+def montar_vetorizado(df_metas, df_realizado, mapa):
+    return _montar_dados_graficos(
+        _metas_por_categoria(df_metas, mapa), _realizado_por_categoria(df_realizado, mapa), mapa['categoria']
+    )
+
+
+def _tempo(funcao, *args):
+    """Menor tempo (s) entre REPETICOES execuções, sem as mensagens de log."""
+    melhor = float('inf')
+    for _ in range(REPETICOES):
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            resultado = funcao(*args)
+            melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def medir():
+    print(f"{'SUPs':>6} | {'categorias':>10} | {'linhas':>8} | {'iterrows (ms)':>13} | "
+          f"{'vetorizado (ms)':>15} | {'µs/linha vet.':>13} | {'ganho':>6}")
+    print("-" * 90)
+    for num_categorias in QUANTIDADES_CATEGORIAS:
+        mapa = _mapa_sintetico(num_categorias)
+        for num_sups in QUANTIDADES_SUPS:
+            df_metas, df_realizado = _dados_sinteticos(num_sups, mapa)
+            tempo_loops, esperado = _tempo(montar_com_loops, df_metas, df_realizado, mapa)
+            tempo_vetorizado, obtido = _tempo(montar_vetorizado, df_metas, df_realizado, mapa)
+            if obtido != esperado or list(obtido) != list(esperado):
+                raise AssertionError(f"Resultado diferente com {num_sups} SUPs e {num_categorias} categorias")
+
+            linhas = len(df_metas) * num_categorias + len(df_realizado)
+            print(f"{num_sups:>6} | {num_categorias:>10} | {linhas:>8} | {tempo_loops * 1000:>13.1f} | "
+                  f"{tempo_vetorizado * 1000:>15.1f} | {tempo_vetorizado / linhas * 1e6:>13.2f} | "
+                  f"{tempo_loops / tempo_vetorizado:>5.0f}x")
+
+
+if __name__ == '__main__':
+    medir()
@@ -0,0 +1,54 @@
+# ===================================================================
+# ARQUIVO: medir_respostas.py
+# Mede bytes transferidos e CPU do servidor por atualização de /, /graficos e de um
+# arquivo estático, comparando a resposta completa sem compressão, comprimida com
+# gzip e com brotli, e a revalidação com If-None-Match (304).
+# Usa o cliente de testes do Flask contra o banco configurado em banco/database.py.
+# Execute a partir da pasta WEB: python medir_respostas.py
+# ===================================================================
+import time
+
+from app import app
+
+PAGINAS = ('/', '/graficos', '/static/js/graficos.js')
+REPETICOES = 20
+
+
+def _medir(cliente, caminho, headers):
+    """Faz REPETICOES requisições e retorna (status, média de bytes, média de CPU em ms)."""
+    total_bytes = 0
+    total_cpu = 0.0
+    status = None
+    for _ in range(REPETICOES):
+        inicio = time.process_time()
+        resposta = cliente.get(caminho, headers=headers)
+        total_cpu += time.process_time() - inicio
+        total_bytes += len(resposta.get_data())
+        status = resposta.status_code
+    return status, total_bytes / REPETICOES, total_cpu / REPETICOES * 1000
+
+
+def medir_paginas():
+    cliente = app.test_client()
+    print(f"{'página':<24} | {'cenário':<28} | {'status':>6} | {'bytes':>9} | {'CPU (ms)':>8}")
+    print("-" * 88)
+    for caminho in PAGINAS:
+        # Aquece o cache de consultas, para medir só o custo HTTP
+        primeira = cliente.get(caminho, headers={'Accept-Encoding': 'gzip, br'})
+        etag = primeira.headers.get('ETag')
+
+        cenarios = [
+            ("completa, sem compressão", {}),
+            ("completa, gzip", {'Accept-Encoding': 'gzip'}),
+            ("completa, br", {'Accept-Encoding': 'gzip, br'}),
+        ]
+        if etag:
+            cenarios.append(("revalidação (If-None-Match)", {'Accept-Encoding': 'gzip, br', 'If-None-Match': etag}))
+
+        for nome, headers in cenarios:
+            status, media_bytes, media_cpu = _medir(cliente, caminho, headers)
+            print(f"{caminho:<24} | {nome:<28} | {status:>6} | {media_bytes:>9.0f} | {media_cpu:>8.2f}")
+
+
+if __name__ == "__main__":
+    medir_paginas()
@@ -0,0 +1,139 @@
+# ===================================================================
+# ARQUIVO: servidor.py
+# Ponto de entrada de produção do dashboard (substitui o app.run de desenvolvimento).
+#
+# Linux: gunicorn com vários processos gevent e o app pré-carregado. O processo
+# principal aquece o cache das consultas antes de criar os workers, que já nascem
+# com o cache pronto (copy-on-write). Quando o ETL publica uma nova carga, o
+# processo principal aquece o cache da nova versão e troca os workers de forma
+# graciosa (SIGHUP), sem derrubar as requisições em andamento.
+#
+# Windows (sem gunicorn): recurso reduzido, um único processo gevent.pywsgi com o
+# cache aquecido na subida. Não há vários processos nem troca de workers a cada
+# carga: a nova versão dos dados é percebida pelo próprio cache (versao_dados_atual)
+# e a primeira requisição depois da carga consulta o banco.
+#
+# Vazão e latência medidas até agora (fora da produção): veja o cabeçalho de teste_carga.py.
+#
+# Execute a partir da pasta WEB: python servidor.py
+# ===================================================================
+# O patch do gevent precisa acontecer antes de qualquer outro import (o app é
+# carregado no processo principal, antes dos workers gevent).
+from gevent import monkey
+monkey.patch_all()
+
+import multiprocessing
+import os
+import signal
+import time
+
+from app import app
+from api import aquecer_payloads
+from banco.database import engine, versao_dados_atual
+
+# --- Configuração do Servidor ---
+ENDERECO = os.environ.get('PAINEL_ENDERECO', '0.0.0.0:5000')
+NUM_WORKERS = int(os.environ.get('PAINEL_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Conexões simultâneas por worker (cada uma é um greenlet; inclui as conexões SSE abertas)
+CONEXOES_POR_WORKER = 1000
+# Tempo para os workers antigos terminarem as requisições ao trocar de versão
+TEMPO_TROCA_GRACIOSA = 30
+# Intervalo com que o processo principal verifica se há uma nova carga do ETL
+INTERVALO_VERIFICACAO_CARGA = 30
+
+# O observador de cargas roda numa thread nativa, e não num greenlet: greenlets pendentes
+# do processo principal continuariam agendados nos workers criados com fork
+_iniciar_thread_nativa = monkey.get_original('_thread', 'start_new_thread')
+_dormir = monkey.get_original('time', 'sleep')
+
+
+def _aquecer():
+    """Aquece o cache no processo principal. Uma falha não impede o servidor de subir."""
+    inicio = time.perf_counter()
+    try:
+        versao = aquecer_payloads()
+        print(f"[INFO] Cache aquecido para a versão {versao} em {time.perf_counter() - inicio:.2f}s.")
+    except Exception as e:
+        versao = None
+        print(f"[AVISO] Falha ao aquecer o cache (os workers vão consultar o banco): {e}")
+    # As conexões abertas no aquecimento não podem ser herdadas pelos workers
+    engine.dispose()
+    return versao
+
+
+def _observar_cargas(versao_inicial, pid_principal):
+    """
+    No processo principal: a cada nova carga do ETL, aquece o cache e troca os workers.
+    Só roda enquanto estiver no processo pid_principal (nunca num worker).
+    """
+    versao_atual = versao_inicial
+    while os.getpid() == pid_principal:
+        _dormir(INTERVALO_VERIFICACAO_CARGA)
+        versao = versao_dados_atual()
+        if versao is None or versao == versao_atual or os.getpid() != pid_principal:
+            continue
+        print(f"[INFO] Nova carga do ETL detectada ({versao}). Trocando os workers.")
+        versao_atual = _aquecer()
+        os.kill(pid_principal, signal.SIGHUP)
+
+
+def _quando_pronto(server):
+    # when_ready é chamado pelo gunicorn no processo principal, depois de abrir o socket
+    versao = _aquecer()
+    _iniciar_thread_nativa(_observar_cargas, (versao, os.getpid()))
+
+
+def _apos_fork(server, worker):
+    # Descarta (sem fechar) as conexões herdadas do processo principal
+    engine.dispose(close=False)
+
+
+def servir_gunicorn():
+    from gunicorn.app.base import BaseApplication
+
+    class ServidorPainel(BaseApplication):
+        def load_config(self):
+            opcoes = {
+                'bind': ENDERECO,
+                'workers': NUM_WORKERS,
+                'worker_class': 'gevent',
+                'worker_connections': CONEXOES_POR_WORKER,
+                'preload_app': True,
+                'graceful_timeout': TEMPO_TROCA_GRACIOSA,
+                # Conexões SSE ficam abertas indefinidamente; o gevent não usa o timeout do worker
+                'timeout': 0,
+                'keepalive': 5,
+                'when_ready': _quando_pronto,
+                'post_fork': _apos_fork,
+                'accesslog': None,
+            }
+            for chave, valor in opcoes.items():
+                self.cfg.set(chave, valor)
+
+        def load(self):
+            return app
+
+    print(f"--- Dashboard (produção): {ENDERECO}, {NUM_WORKERS} workers gevent ---")
+    ServidorPainel().run()
+
+
+def servir_gevent():
+    """Recurso do Windows: um processo só, sem troca de workers a cada carga do ETL."""
+    from gevent.pywsgi import WSGIServer
+
+    host, porta = ENDERECO.rsplit(':', 1)
+    _aquecer()
+    print(f"--- Dashboard (produção, processo único gevent, sem troca de workers): {ENDERECO} ---")
+    WSGIServer((host, int(porta)), app, log=None).serve_forever()
+
+
+if __name__ == '__main__':
+    try:
+        import gunicorn  # noqa: F401 (não funciona no Windows)
+    except ImportError:
+        gunicorn = None
+
+    if gunicorn is not None and os.name != 'nt':
+        servir_gunicorn()
+    else:
+        servir_gevent()
@@ -0,0 +1,63 @@
+// ===================================================================
+// ARQUIVO: static/js/atualizacao.js
+// Atualização incremental das páginas do dashboard.
+// Consulta /api/version (a cada aviso de /api/eventos ou periodicamente) e, para
+// cada seção registrada cujo hash mudou, busca /api/<seção> e chama a função que
+// atualiza aquele trecho da página.
+// ===================================================================
+const Atualizacao = (function () {
+    const atualizadores = {};   // seção -> função(dados)
+    const hashes = {};          // seção -> hash da última versão aplicada
+    let etagVersao = null;
+
+    function registrar(secao, funcao) {
+        atualizadores[secao] = funcao;
+    }
+
+    async function buscarJson(url, etag) {
+        const headers = etag ? { 'If-None-Match': etag } : {};
+        const resposta = await fetch(url, { headers: headers, cache: 'no-cache' });
+        if (resposta.status === 304) return { naoModificado: true };
+        if (!resposta.ok) throw new Error(`${url}: HTTP ${resposta.status}`);
+        return { etag: resposta.headers.get('ETag'), corpo: await resposta.json() };
+    }
+
+    async function verificar() {
+        try {
+            const versao = await buscarJson('/api/version', etagVersao);
+            if (versao.naoModificado) return;
+            etagVersao = versao.etag;
+
+            for (const secao in atualizadores) {
+                const hash = versao.corpo.secoes[secao];
+                if (hash === undefined || hashes[secao] === hash) continue;
+                // Na primeira verificação a página já está atualizada (renderizada pelo servidor)
+                if (hashes[secao] !== undefined) {
+                    const resultado = await buscarJson(`/api/${secao}`);
+                    atualizadores[secao](resultado.corpo.dados);
+                }
+                hashes[secao] = hash;
+            }
+        } catch (erro) {
+            console.warn('Falha ao verificar atualização dos dados:', erro);
+        }
+    }
+
+    // Com EventSource, o servidor avisa quando há uma nova carga do ETL (/api/eventos)
+    // e a página fica parada até lá; sem suporte, consulta /api/version periodicamente.
+    function iniciar(intervaloSegundos) {
+        verificar();
+        if (window.EventSource) {
+            const eventos = new EventSource('/api/eventos');
+            eventos.addEventListener('versao', verificar);
+            return eventos;
+        }
+        return setInterval(verificar, (intervaloSegundos || 60) * 1000);
+    }
+
+    function formatarNumero(valor) {
+        return Math.round(valor || 0).toLocaleString('pt-BR');
+    }
+
+    return { registrar: registrar, iniciar: iniciar, verificar: verificar, formatarNumero: formatarNumero };
+})();
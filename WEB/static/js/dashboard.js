@@ -0,0 +1,83 @@
+// ===================================================================
+// ARQUIVO: static/js/dashboard.js
+// Atualiza as tabelas de ranking e as datas do painel principal a partir da API,
+// sem recarregar a página (veja atualizacao.js).
+// ===================================================================
+
+// Ícones da coluna "Ranking" da tabela de Novas Ligações (3 primeiros em verde)
+const ICONE_TOP3 = '<svg class="w-4 h-4 text-green-500" fill="currentColor" viewBox="0 0 20 20"><path fill-rule="evenodd" d="M10 18a8 8 0 100-16 8 8 0 000 16zm3.707-8.707l-3-3a1 1 0 00-1.414 0l-3 3a1 1 0 001.414 1.414L9 9.414V13a1 1 0 102 0V9.414l1.293 1.293a1 1 0 001.414-1.414z" clip-rule="evenodd"></path></svg>';
+const ICONE_DEMAIS = '<svg class="w-4 h-4 text-gray-400" fill="currentColor" viewBox="0 0 20 20"><path fill-rule="evenodd" d="M10 18a8 8 0 100-16 8 8 0 000 16zM9 9a1 1 0 002 0V7a1 1 0 10-2 0v2zm1 4a1 1 0 100-2 1 1 0 000 2z" clip-rule="evenodd"></path></svg>';
+
+function criarCelula(texto, classes) {
+    const celula = document.createElement('td');
+    celula.className = classes || 'p-4 text-base';
+    celula.textContent = texto;
+    return celula;
+}
+
+function criarCelulaPosicao(posicao, icone) {
+    const celula = document.createElement('td');
+    celula.className = 'p-4 text-base flex items-center space-x-1';
+    const numero = document.createElement('span');
+    numero.className = 'font-bold';
+    numero.textContent = `${posicao}°`;
+    celula.appendChild(numero);
+    if (icone) celula.insertAdjacentHTML('beforeend', icone);
+    return celula;
+}
+
+// tabela: {colunas: [...], linhas: [[...], ...]} (formato de /api/rankings/<dataset>)
+function linhasComoObjetos(tabela) {
+    return tabela.linhas.map(linha => Object.fromEntries(tabela.colunas.map((coluna, i) => [coluna, linha[i]])));
+}
+
+function atualizarRankingIncremento(idCorpo) {
+    return function (tabela) {
+        const corpo = document.getElementById(idCorpo);
+        if (!corpo) return;
+        const linhas = linhasComoObjetos(tabela).map((registro, i) => {
+            const tr = document.createElement('tr');
+            tr.className = 'border-t';
+            tr.append(
+                criarCelula(registro.sup),
+                criarCelula(Atualizacao.formatarNumero(registro.total), 'p-4 text-base font-bold'),
+                criarCelulaPosicao(i + 1)
+            );
+            return tr;
+        });
+        corpo.replaceChildren(...linhas);
+    };
+}
+
+function atualizarRankingNlaNle(tabela) {
+    const corpo = document.getElementById('ranking-nla_nle');
+    if (!corpo) return;
+    const linhas = linhasComoObjetos(tabela).map((registro, i) => {
+        const tr = document.createElement('tr');
+        tr.className = 'border-t';
+        tr.append(
+            criarCelula(registro.superintendencia),
+            criarCelula(Atualizacao.formatarNumero(registro.total_agua)),
+            criarCelula(Atualizacao.formatarNumero(registro.total_esgoto)),
+            criarCelula(Atualizacao.formatarNumero(registro.total_geral), 'p-4 text-base font-bold'),
+            criarCelulaPosicao(i + 1, i < 3 ? ICONE_TOP3 : ICONE_DEMAIS)
+        );
+        return tr;
+    });
+    corpo.replaceChildren(...linhas);
+}
+
+function atualizarDatas(datas) {
+    for (const dataset in datas) {
+        const elemento = document.getElementById(`data-atualizacao-${dataset}`);
+        if (elemento) elemento.textContent = `DATA DA ATUALIZAÇÃO: ${datas[dataset]}`;
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    Atualizacao.registrar('rankings/agua', atualizarRankingIncremento('ranking-agua'));
+    Atualizacao.registrar('rankings/esgoto', atualizarRankingIncremento('ranking-esgoto'));
+    Atualizacao.registrar('rankings/nla_nle', atualizarRankingNlaNle);
+    Atualizacao.registrar('datas', atualizarDatas);
+    Atualizacao.iniciar(INTERVALO_ATUALIZACAO_SEGUNDOS);
+});
@@ -1,101 +1,58 @@
 // ===================================================================
-// ARQUIVO: static/js/graficos.js (NOVO FICHEIRO)
+// ARQUIVO: static/js/graficos.js
 // Contém toda a lógica JavaScript para criar os gráficos.
+// Na carga da página só inicializa os gráficos do HTML gerado pelo servidor;
+// quando a API informa novos dados, remonta os cards a partir do JSON.
 // ===================================================================
 
-// Esta função será executada assim que a página HTML carregar completamente.
-document.addEventListener('DOMContentLoaded', function () {
-    // A variável 'dadosGraficos' é passada pelo HTML e fica disponível globalmente.
-    // Verificamos se ela existe antes de continuar.
-    if (typeof dadosGraficos === 'undefined' || !dadosGraficos) {
-        console.error("Erro: A variável 'dadosGraficos' não foi encontrada ou está vazia.");
-        return;
-    }
-
-    const chartsContainer = document.getElementById('charts-container');
-    if (!chartsContainer) {
-        console.error("Erro: O elemento 'charts-container' não foi encontrado no HTML.");
-        return;
-    }
+// Mapeia os nomes das categorias para títulos e cores
+const configCategorias = {
+    'AGUA_FORMAL': { titulo: 'Meta FORMAL - ÁGUA', cor: '#3b82f6' }, // Azul
+    'AGUA_INFORMAL': { titulo: 'Meta INFORMAL - ÁGUA', cor: '#22d3ee' }, // Ciano
+    'ESGOTO_FORMAL': { titulo: 'Meta FORMAL - ESGOTO', cor: '#22c55e' }, // Verde
+    'ESGOTO_INFORMAL': { titulo: 'Meta INFORMAL - ESGOTO', cor: '#a3e635' }  // Lima
+};
 
-    // Mapeia os nomes das categorias para títulos e cores
-    const configCategorias = {
-        'AGUA_FORMAL': { titulo: 'Meta FORMAL - ÁGUA', cor: '#3b82f6' }, // Azul
-        'AGUA_INFORMAL': { titulo: 'Meta INFORMAL - ÁGUA', cor: '#22d3ee' }, // Ciano
-        'ESGOTO_FORMAL': { titulo: 'Meta FORMAL - ESGOTO', cor: '#22c55e' }, // Verde
-        'ESGOTO_INFORMAL': { titulo: 'Meta INFORMAL - ESGOTO', cor: '#a3e635' }  // Lima
-    };
+// Gráficos criados (destruídos antes de remontar a página)
+let graficosCriados = [];
 
-    // Itera sobre cada superintendência para criar um grupo de KPIs
-    for (const superintendencia in dadosGraficos) {
-        const dados_sup = dadosGraficos[superintendencia];
-        
-        let cardsHtml = ''; // String para acumular o HTML dos cards para esta SUP
+function criarElemento(tag, classes, texto) {
+    const elemento = document.createElement(tag);
+    if (classes) elemento.className = classes;
+    if (texto !== undefined) elemento.textContent = texto;
+    return elemento;
+}
 
-        // Itera sobre cada categoria para criar um card de KPI
-        for (const categoria in dados_sup) {
-            const config = configCategorias[categoria];
-            if (!config) continue; // Pula se a categoria não estiver configurada
+// Cria os gráficos de rosca para os canvas já presentes na página
+function inicializarGraficos(dadosGraficos) {
+    graficosCriados.forEach(grafico => grafico.destroy());
+    graficosCriados = [];
 
-            const dados = dados_sup[categoria];
-            const meta = dados.meta || 0;
-            const realizado = dados.realizado || 0;
-
-            const restante = meta > realizado ? meta - realizado : 0;
-            const percentualAtingido = meta > 0 ? (realizado / meta) * 100 : 0;
-            
-            // Gera o HTML para um único card de gráfico
-            cardsHtml += `
-                <div class="chart-card flex flex-col items-center">
-                    <h4 class="text-md font-semibold text-gray-600 mb-3">${config.titulo}</h4>
-                    <div class="w-full flex items-center justify-center space-x-4">
-                        <div class="text-sm text-left">
-                            <p>Meta: <span class="font-bold">${meta.toLocaleString('pt-BR')}</span></p>
-                            <p>Realizado: <span class="font-bold">${realizado.toLocaleString('pt-BR')}</span></p>
-                        </div>
-                        <div class="relative w-24 h-24">
-                            <canvas id="chart-${superintendencia.replace(/\s/g, '')}-${categoria}"></canvas>
-                            <div class="absolute inset-0 flex items-center justify-center text-xl font-bold text-gray-800">
-                                ${percentualAtingido.toFixed(0)}%
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            `;
-        }
-
-        // Cria o HTML para o grupo da superintendência e insere os cards
-        const groupHtml = `
-            <div class="kpi-group">
-                <h2 class="text-2xl font-bold text-gray-800 mb-4 text-center">${superintendencia}</h2>
-                <div class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-4">
-                    ${cardsHtml}
-                </div>
-            </div>
-        `;
-        chartsContainer.innerHTML += groupHtml;
-    }
-
-    // Após criar toda a estrutura HTML, inicializa os gráficos
     for (const superintendencia in dadosGraficos) {
         for (const categoria in dadosGraficos[superintendencia]) {
             const config = configCategorias[categoria];
-            if (!config) continue;
-
             const dados = dadosGraficos[superintendencia][categoria];
+
+            // Define o título do card
+            const titleElement = document.getElementById(`title-${superintendencia}-${categoria}`);
+            if (titleElement && config) {
+                titleElement.innerText = config.titulo;
+            }
+
+            // Calcula os dados para o gráfico
             const meta = dados.meta || 0;
             const realizado = dados.realizado || 0;
             const restante = meta > realizado ? meta - realizado : 0;
 
-            const canvasId = `chart-${superintendencia.replace(/\s/g, '')}-${categoria}`;
-            const ctx = document.getElementById(canvasId).getContext('2d');
-            
-            new Chart(ctx, {
+            const canvas = document.getElementById(`chart-${superintendencia}-${categoria}`);
+            if (!canvas) continue;
+
+            graficosCriados.push(new Chart(canvas.getContext('2d'), {
                 type: 'doughnut',
                 data: {
                     datasets: [{
                         data: [realizado, restante],
-                        backgroundColor: [config.cor, '#e5e7eb'],
+                        backgroundColor: [config ? config.cor : '#cccccc', '#e5e7eb'],
                         borderColor: '#FFFFFF',
                         borderWidth: 2
                     }]
@@ -105,7 +62,84 @@ document.addEventListener('DOMContentLoaded', function () {
                     cutout: '75%',
                     plugins: { legend: { display: false }, tooltip: { enabled: false } }
                 }
-            });
+            }));
         }
     }
-});
\ No newline at end of file
+}
+
+// Monta o card de uma categoria (mesma estrutura do template graficos.html)
+function criarCardCategoria(superintendencia, categoria, dados) {
+    const meta = dados.meta || 0;
+    const realizado = dados.realizado || 0;
+    const percentual = meta > 0 ? (realizado / meta) * 100 : 0;
+
+    const card = criarElemento('div', 'chart-card flex flex-col items-center');
+    const titulo = criarElemento('h4', 'text-md font-semibold text-gray-600 mb-3');
+    titulo.id = `title-${superintendencia}-${categoria}`;
+
+    const conteudo = criarElemento('div', 'w-full flex items-center justify-center space-x-4');
+    const valores = criarElemento('div', 'text-sm text-left');
+    const linhaMeta = criarElemento('p', null, 'Meta: ');
+    linhaMeta.appendChild(criarElemento('span', 'font-bold', Atualizacao.formatarNumero(meta)));
+    const linhaRealizado = criarElemento('p', null, 'Realizado: ');
+    linhaRealizado.appendChild(criarElemento('span', 'font-bold', Atualizacao.formatarNumero(realizado)));
+    valores.append(linhaMeta, linhaRealizado);
+
+    const areaGrafico = criarElemento('div', 'relative w-24 h-24');
+    const canvas = document.createElement('canvas');
+    canvas.id = `chart-${superintendencia}-${categoria}`;
+    areaGrafico.append(
+        canvas,
+        criarElemento('div', 'absolute inset-0 flex items-center justify-center text-xl font-bold text-gray-800',
+            `${percentual.toFixed(0)}%`)
+    );
+
+    conteudo.append(valores, areaGrafico);
+    card.append(titulo, conteudo);
+    return card;
+}
+
+// Remonta todos os grupos de superintendência a partir do JSON de /api/graficos
+function renderizarGraficos(dadosGraficos) {
+    const chartsContainer = document.getElementById('charts-container');
+    if (!chartsContainer) {
+        console.error("Erro: O elemento 'charts-container' não foi encontrado no HTML.");
+        return;
+    }
+
+    const grupos = Object.keys(dadosGraficos).map((superintendencia, i) => {
+        const grupo = criarElemento('div', 'kpi-group');
+        const cabecalho = criarElemento('div', 'flex items-center justify-center mb-4');
+        cabecalho.append(
+            criarElemento('div', 'bg-blue-100 text-blue-800 px-3 py-1 rounded-full text-sm font-semibold mr-3',
+                `${i + 1}º Lugar`),
+            criarElemento('h2', 'text-2xl font-bold text-gray-800', superintendencia)
+        );
+        const grade = criarElemento('div', 'grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-4');
+        for (const categoria in dadosGraficos[superintendencia]) {
+            grade.appendChild(criarCardCategoria(superintendencia, categoria, dadosGraficos[superintendencia][categoria]));
+        }
+        grupo.append(cabecalho, grade);
+        return grupo;
+    });
+
+    chartsContainer.replaceChildren(...grupos);
+    inicializarGraficos(dadosGraficos);
+}
+
+// Esta função será executada assim que a página HTML carregar completamente.
+document.addEventListener('DOMContentLoaded', function () {
+    // A variável 'dadosGraficos' é passada pelo HTML e fica disponível globalmente.
+    if (typeof dadosGraficos === 'undefined' || !dadosGraficos) {
+        console.error("Erro: A variável 'dadosGraficos' não foi encontrada ou está vazia.");
+        return;
+    }
+    inicializarGraficos(dadosGraficos);
+
+    Atualizacao.registrar('graficos', renderizarGraficos);
+    Atualizacao.registrar('datas', function (datas) {
+        const rodape = document.getElementById('data-atualizacao');
+        if (rodape) rodape.textContent = `DATA DA ATUALIZAÇÃO: ${datas.esgoto}`;
+    });
+    Atualizacao.iniciar(INTERVALO_ATUALIZACAO_SEGUNDOS);
+});
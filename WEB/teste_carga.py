@@ -0,0 +1,117 @@
+# ===================================================================
+# ARQUIVO: teste_carga.py
+# Teste de carga do dashboard: dispara requisições em / e /graficos com a
+# concorrência escolhida e mostra latência p50/p95/p99 e requisições por segundo.
+# Cada cliente simulado mantém a conexão aberta (keep-alive) e aceita gzip, como um navegador.
+# Os números só valem como capacidade do servidor quando ele roda na máquina de produção,
+# contra o banco real, com este script em outra máquina. Medições com as consultas
+# substituídas por dados em memória ou no mesmo processador servem apenas para comparar versões.
+#
+# Exemplo (com o servidor já rodando):
+#   python teste_carga.py --url http://10.51.109.226:5000 --concorrencia 50 --duracao 30
+#
+# Última medição (18/10/2026), NÃO é a capacidade de produção:
+#   servidor.py (gunicorn, 3 workers gevent, cache aquecido) num contêiner com 1 vCPU
+#   Intel Xeon, com o banco trocado pelo SQLite em memória de banco/contar_consultas.py
+#   (mais tb_resumo_graficos) e este script no mesmo processador, 30 s por cenário:
+#     20 clientes, / e /graficos, gzip:         195 req/s | p50 16 ms | p95 812 ms | p99 1244 ms
+#     50 clientes, / e /graficos, gzip:         195 req/s | p50 16 ms | p95 1962 ms | p99 2912 ms
+#     20 clientes, --condicional (quase só 304): 1182 req/s | p50 2.5 ms | p95 5.0 ms | p99 600 ms
+#   A capacidade na máquina de produção, contra o MySQL real e com o gerador de carga em
+#   outra máquina, ainda precisa ser medida.
+# ===================================================================
+import argparse
+import http.client
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+CAMINHOS_PADRAO = ['/', '/graficos']
+
+
+def _percentil(valores_ordenados, percentual):
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, int(round(percentual / 100 * (len(valores_ordenados) - 1))))
+    return valores_ordenados[indice]
+
+
+def _cliente(url, caminhos, fim, condicional):
+    """Um cliente simulado: faz requisições em sequência até o fim do teste."""
+    destino = urlparse(url)
+    latencias = []
+    status = Counter()
+    conexao = http.client.HTTPConnection(destino.hostname, destino.port or 80, timeout=30)
+    etags = {}
+    i = 0
+    while time.perf_counter() < fim:
+        caminho = caminhos[i % len(caminhos)]
+        i += 1
+        headers = {'Accept-Encoding': 'gzip'}
+        if condicional and caminho in etags:
+            headers['If-None-Match'] = etags[caminho]
+        inicio = time.perf_counter()
+        try:
+            conexao.request('GET', caminho, headers=headers)
+            resposta = conexao.getresponse()
+            resposta.read()
+            latencias.append(time.perf_counter() - inicio)
+            status[resposta.status] += 1
+            if resposta.getheader('ETag'):
+                etags[caminho] = resposta.getheader('ETag')
+        except (OSError, http.client.HTTPException):
+            status['erro'] += 1
+            conexao.close()
+            time.sleep(0.1)
+            conexao = http.client.HTTPConnection(destino.hostname, destino.port or 80, timeout=30)
+    conexao.close()
+    return latencias, status
+
+
+def executar_teste(url, concorrencia=20, duracao=20, caminhos=None, condicional=False):
+    """
+    Executa o teste de carga e retorna um dicionário com as métricas.
+
+    Args:
+        condicional (bool): Se True, reenvia o ETag recebido (como um navegador que já tem a página).
+    """
+    caminhos = caminhos or CAMINHOS_PADRAO
+    inicio = time.perf_counter()
+    fim = inicio + duracao
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        futuros = [executor.submit(_cliente, url, caminhos, fim, condicional) for _ in range(concorrencia)]
+        resultados = [futuro.result() for futuro in futuros]
+    tempo_total = time.perf_counter() - inicio
+
+    latencias = sorted(latencia for lista, _ in resultados for latencia in lista)
+    status = sum((contagem for _, contagem in resultados), Counter())
+    return {
+        'requisicoes': len(latencias),
+        'rps': len(latencias) / tempo_total if tempo_total else 0.0,
+        'p50_ms': _percentil(latencias, 50) * 1000,
+        'p95_ms': _percentil(latencias, 95) * 1000,
+        'p99_ms': _percentil(latencias, 99) * 1000,
+        'status': dict(status),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do dashboard (/ e /graficos).")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concorrencia', type=int, default=20, help="Clientes simultâneos.")
+    parser.add_argument('--duracao', type=float, default=20, help="Duração do teste em segundos.")
+    parser.add_argument('--caminhos', nargs='+', default=CAMINHOS_PADRAO)
+    parser.add_argument('--condicional', action='store_true', help="Reenvia o ETag (respostas 304).")
+    args = parser.parse_args()
+
+    print(f"Testando {args.url} {args.caminhos} com {args.concorrencia} clientes por {args.duracao:.0f}s...")
+    resultado = executar_teste(args.url, args.concorrencia, args.duracao, args.caminhos, args.condicional)
+    print(f"  Requisições: {resultado['requisicoes']} | {resultado['rps']:.1f} req/s")
+    print(f"  Latência: p50 {resultado['p50_ms']:.1f} ms | p95 {resultado['p95_ms']:.1f} ms | "
+          f"p99 {resultado['p99_ms']:.1f} ms")
+    print(f"  Status: {resultado['status']}")
+
+
+if __name__ == '__main__':
+    main()